@@ -0,0 +1,92 @@
+# benchmarks/analytics.py
+"""
+Compare src/analytics.py against the dict-loop equivalents on synthetic data
+(no database needed): --orders orders over --days days, ~2.5 lines each.
+
+    python -m benchmarks.analytics --orders 1000000 --days 365
+"""
+import argparse
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from src import analytics
+
+
+def synthetic(orders: int, days: int, customers: int, products: int, seed: int = 7) -> analytics.SalesData:
+    rng = np.random.default_rng(seed)
+    order_ids = np.arange(1, orders + 1, dtype="int64")
+    lines = rng.integers(1, 5, orders)
+    item_order = np.repeat(order_ids, lines)
+    prod = rng.integers(1, products + 1, len(item_order))
+    qty = rng.integers(1, 6, len(item_order))
+    price = (prod % 97 + 1).astype("float64")
+    totals = np.bincount(item_order, weights=qty * price, minlength=orders + 1)[1:]
+    day = np.datetime64("2025-01-01") + np.sort(rng.integers(0, days, orders)).astype("timedelta64[D]")
+    return analytics.SalesData(
+        {"order_id": order_ids, "cust_id": rng.integers(1, customers + 1, orders), "day": day,
+         "total_amount": totals, "cancelled": rng.random(orders) < 0.02},
+        {"order_id": item_order, "prod_id": prod, "quantity": qty, "price": price},
+    )
+
+
+def _as_dicts(data: analytics.SalesData):
+    orders = [{"order_id": int(o), "cust_id": int(c), "order_date": str(d), "total_amount": float(t)}
+              for o, c, d, t in zip(data.orders["order_id"], data.orders["cust_id"], data.orders["day"], data.orders["total_amount"])]
+    items = [{"order_id": int(o), "prod_id": int(p), "quantity": int(q)}
+             for o, p, q in zip(data.items["order_id"], data.items["prod_id"], data.items["quantity"])]
+    return orders, items
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, round((time.perf_counter() - start) * 1000, 1)
+
+
+def run(orders: int, days: int, customers: int, products: int) -> dict:
+    data = synthetic(orders, days, customers, products)
+    dict_orders, dict_items = _as_dicts(data)
+
+    def loop_top():
+        counter = Counter()
+        for item in dict_items:
+            counter[item["prod_id"]] += item["quantity"]
+        return counter.most_common(5)
+
+    def loop_monthly():
+        revenue = defaultdict(float)
+        for o in dict_orders:
+            revenue[o["order_date"][:7]] += o["total_amount"]
+        return dict(revenue)
+
+    def loop_per_customer():
+        return Counter(o["cust_id"] for o in dict_orders)
+
+    out = {"orders": orders, "lines": len(data.items["order_id"]), "array_mb": round(data.nbytes / 2**20, 1)}
+    for name, vec, loop in [
+        ("top_products", lambda: analytics.top_products(data, 5), loop_top),
+        ("revenue_by_month", lambda: analytics.revenue_by_period(data, "M"), loop_monthly),
+        ("orders_per_customer", lambda: analytics.orders_per_customer(data), loop_per_customer),
+    ]:
+        v, v_ms = _timed(vec)
+        l, l_ms = _timed(loop)
+        out[name] = {"numpy_ms": v_ms, "dict_loop_ms": l_ms, "speedup": round(l_ms / v_ms, 1) if v_ms else None}
+    _, out["quantity_percentiles_ms"] = _timed(lambda: analytics.quantity_percentiles(data, per="order"))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--customers", type=int, default=50_000)
+    parser.add_argument("--products", type=int, default=5_000)
+    args = parser.parse_args()
+    for k, v in run(args.orders, args.days, args.customers, args.products).items():
+        print(f"{k:>24}: {v}")
+
+
+if __name__ == "__main__":
+    main()
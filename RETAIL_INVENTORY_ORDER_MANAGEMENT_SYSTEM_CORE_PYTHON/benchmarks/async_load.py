@@ -0,0 +1,75 @@
+# benchmarks/async_load.py
+"""
+Load-test the asyncio checkout path: place --orders orders with up to --concurrency
+in flight and report orders/sec with p50/p99 latency.
+
+    python -m benchmarks.async_load --customer 1 --product 1 --orders 500 --concurrency 32
+
+Orders are cancelled afterwards (not timed) so stock ends where it started.
+"""
+import argparse
+import asyncio
+import time
+
+from src.services import async_order_service
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    k = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+async def run(customer_id: int, prod_id: int, orders: int, concurrency: int, lines: int) -> dict:
+    gate = asyncio.Semaphore(concurrency)
+    items = [{"prod_id": prod_id, "qty": 1} for _ in range(lines)]
+    latencies, placed, errors = [], [], 0
+
+    async def one():
+        nonlocal errors
+        async with gate:
+            start = time.perf_counter()
+            try:
+                order = await async_order_service.create_order(customer_id, items)
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - start)
+            placed.append(order["order_id"])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(orders)))
+    elapsed = time.perf_counter() - start
+
+    await asyncio.gather(*(async_order_service.cancel_order(oid) for oid in placed))
+
+    latencies.sort()
+    return {
+        "orders": orders,
+        "concurrency": concurrency,
+        "lines_per_order": lines,
+        "placed": len(placed),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "orders_per_sec": round(len(placed) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--customer", type=int, required=True)
+    parser.add_argument("--product", type=int, required=True)
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--items", type=int, default=3)
+    args = parser.parse_args()
+    result = asyncio.run(run(args.customer, args.product, args.orders, args.concurrency, args.items))
+    for k, v in result.items():
+        print(f"{k:>16}: {v}")
+
+
+if __name__ == "__main__":
+    main()
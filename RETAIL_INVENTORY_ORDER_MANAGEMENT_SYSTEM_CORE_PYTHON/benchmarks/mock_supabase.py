@@ -0,0 +1,98 @@
+# benchmarks/mock_supabase.py
+"""
+In-process stand-in for Supabase used by the benchmark suite.
+
+MockSupabase is the SQLite backend's query-compatible client (table()/rpc() with the
+PostgREST subset the DAOs use) plus an injected delay on every request, so round
+trips cost what they would over a network. Responses are also encoded to JSON and
+decoded back, as they would arrive from PostgREST; payload() reports the bytes and
+decode time. install() makes it the shared client returned by src.config.get_supabase().
+"""
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from src import config
+from src.backends.sqlite_backend import SqliteClient
+
+
+class MockSupabase(SqliteClient):
+    def __init__(self, path: str = ":memory:", latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 1):
+        super().__init__(path)
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self._rng = random.Random(seed)
+        self._wire_stats = {"response_bytes": 0, "decode_seconds": 0.0}
+
+    def _on_execute(self, write: bool) -> None:
+        super()._on_execute(write)
+        delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _wire(self, builder):
+        execute = builder.execute
+
+        def over_the_wire():
+            resp = execute()
+            body = json.dumps(resp.data, default=str).encode()
+            start = time.perf_counter()
+            resp.data = json.loads(body)
+            self._wire_stats["decode_seconds"] += time.perf_counter() - start
+            self._wire_stats["response_bytes"] += len(body)
+            return resp
+        builder.execute = over_the_wire
+        return builder
+
+    def table(self, name: str):
+        return self._wire(super().table(name))
+
+    from_ = table
+
+    def rpc(self, name: str, params=None):
+        return self._wire(super().rpc(name, params))
+
+    def payload(self) -> dict:
+        """
+        Response bytes and JSON decode seconds so far.
+        """
+        return dict(self._wire_stats)
+
+
+def install(latency_ms: float = 0.0, jitter_ms: float = 0.0, path: str = ":memory:") -> MockSupabase:
+    client = MockSupabase(path, latency_ms=latency_ms, jitter_ms=jitter_ms)
+    config.set_supabase(client)
+    return client
+
+
+def seed(client: MockSupabase, orders: int, customers: int, products: int, days: int = 365,
+         max_lines: int = 4, low_stock_share: float = 0.05, rng_seed: int = 7) -> None:
+    """
+    Bulk-load synthetic history straight through SQL (no simulated latency):
+    `orders` orders over the last `days` days, each with a pending or paid payment.
+    About low_stock_share of the products start at or below the low-stock threshold.
+    """
+    rng = random.Random(rng_seed)
+    conn = client._conn()
+    now = datetime.utcnow()
+    with client.transaction(conn):
+        conn.executemany("insert into customers (name, email, phone, city) values (?, ?, ?, ?)",
+                         [(f"Customer {i}", f"c{i}@example.com", 9000000000 + i, f"City {i % 50}")
+                          for i in range(1, customers + 1)])
+        conn.executemany("insert into product (name, sku, price, stock, category) values (?, ?, ?, ?, ?)",
+                         [(f"Product {i}", f"SKU-{i:06d}", round(1 + (i % 200) * 0.75, 2),
+                           rng.randint(0, config.LOW_STOCK_THRESHOLD) if rng.random() < low_stock_share else 1_000_000,
+                           f"Category {i % 20}")
+                          for i in range(1, products + 1)])
+        order_rows, item_rows, payment_rows = [], [], []
+        for order_id in range(1, orders + 1):
+            placed = now - timedelta(days=days * (orders - order_id) / max(orders, 1))
+            lines = [(rng.randint(1, products), rng.randint(1, 5)) for _ in range(rng.randint(1, max_lines))]
+            total = sum(qty * round(1 + (prod % 200) * 0.75, 2) for prod, qty in lines)
+            order_rows.append((order_id, rng.randint(1, customers), placed.isoformat(timespec="milliseconds"), total))
+            item_rows.extend((order_id, prod, qty, round(1 + (prod % 200) * 0.75, 2)) for prod, qty in lines)
+            payment_rows.append((order_id, total, "PAID" if rng.random() < 0.7 else "PENDING"))
+        conn.executemany("insert into orders (order_id, cust_id, order_date, total_amount) values (?, ?, ?, ?)", order_rows)
+        conn.executemany("insert into order_items (order_id, prod_id, quantity, price) values (?, ?, ?, ?)", item_rows)
+        conn.executemany("insert into payments (order_id, amount, status) values (?, ?, ?)", payment_rows)
@@ -0,0 +1,64 @@
+# benchmarks/order_round_trips.py
+"""
+Count HTTP round trips spent placing (and cancelling) orders.
+
+    python -m benchmarks.order_round_trips --customer 1 --product 1 --items 5 --orders 10
+
+Each order buys one unit of --product on each of --items lines and is then
+cancelled, so stock ends where it started. Numbers come from
+src.config.client_stats(); "writes" are POST/PATCH/DELETE requests.
+"""
+import argparse
+import time
+
+from src.config import client_stats
+from src.services.order_service import create_order, cancel_order
+
+
+def _delta(before: dict, after: dict) -> dict:
+    return {k: after[k] - before[k] for k in ("requests", "writes")}
+
+
+def run(customer_id: int, prod_id: int, lines: int, orders: int) -> dict:
+    items = [{"prod_id": prod_id, "qty": 1} for _ in range(lines)]
+    create_calls = {"requests": 0, "writes": 0}
+    cancel_calls = {"requests": 0, "writes": 0}
+    create_secs = 0.0
+    for _ in range(orders):
+        before = client_stats()
+        start = time.perf_counter()
+        order = create_order(customer_id, items)
+        create_secs += time.perf_counter() - start
+        mid = client_stats()
+        cancel_order(order["order_id"])
+        after = client_stats()
+        for k, v in _delta(before, mid).items():
+            create_calls[k] += v
+        for k, v in _delta(mid, after).items():
+            cancel_calls[k] += v
+    return {
+        "lines_per_order": lines,
+        "orders": orders,
+        "create_requests_per_order": create_calls["requests"] / orders,
+        "create_writes_per_order": create_calls["writes"] / orders,
+        "cancel_requests_per_order": cancel_calls["requests"] / orders,
+        "cancel_writes_per_order": cancel_calls["writes"] / orders,
+        "create_ms_per_order": round(create_secs / orders * 1000, 2),
+        "connections_opened": client_stats()["connections_opened"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--customer", type=int, required=True)
+    parser.add_argument("--product", type=int, required=True)
+    parser.add_argument("--items", type=int, default=5)
+    parser.add_argument("--orders", type=int, default=10)
+    args = parser.parse_args()
+    result = run(args.customer, args.product, args.items, args.orders)
+    for k, v in result.items():
+        print(f"{k:>26}: {v}")
+
+
+if __name__ == "__main__":
+    main()
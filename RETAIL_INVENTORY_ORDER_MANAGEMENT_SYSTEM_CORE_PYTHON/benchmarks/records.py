@@ -0,0 +1,71 @@
+# benchmarks/records.py
+"""
+Memory held by listings as row dicts vs the slotted records of src/models.py,
+against the in-process Supabase stand-in (benchmarks/mock_supabase.py).
+
+    python -m benchmarks.records --rows 100000
+
+For each listing the result is kept alive and measured with tracemalloc: "held" is
+what the list costs while the caller keeps it (values included), "peak" includes the
+transient row dicts the client returned. Figures are scaled to per 100k rows.
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from benchmarks import mock_supabase
+from src.dao import order_dao, product_dao
+from src.models import OrderItem
+from src.services import product_service
+
+
+def held(fn):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="products and orders to seed")
+    args = parser.parse_args()
+
+    client = mock_supabase.install()
+    mock_supabase.seed(client, orders=args.rows, customers=max(50, args.rows // 10), products=args.rows,
+                       low_stock_share=1.0)
+    product_dao.clear_cache()
+
+    lines = OrderItem.columns("order_id", "prod_id", "quantity", "price")
+    cases = [
+        ("product list_products()", lambda: product_dao.list_products(limit=args.rows),
+         lambda: product_dao.list_products(limit=args.rows, records=True)),
+        ("product get_low_stock() (4 columns)", lambda: product_service.get_low_stock(),
+         lambda: product_service.get_low_stock(records=True)),
+        ("order_items for reporting (4 columns)", lambda: order_dao.list_order_items(lines),
+         lambda: order_dao.list_order_items(lines, records=True)),
+        ("payments list_payments()", lambda: order_dao.list_payments(),
+         lambda: order_dao.list_payments(records=True)),
+    ]
+    print(f"{'listing':<40}{'rows':>9}{'dict MB':>10}{'record MB':>11}{'saved':>8}{'dict peak':>11}{'rec peak':>10}{'dict s':>8}{'rec s':>8}")
+    for name, as_dicts, as_records in cases:
+        rows, dict_bytes, dict_peak, dict_s = held(as_dicts)
+        n = len(rows)
+        del rows
+        records, rec_bytes, rec_peak, rec_s = held(as_records)
+        assert len(records) == n
+        del records
+        scale = 100_000 / max(n, 1) / 2**20
+        print(f"{name:<40}{n:>9}{dict_bytes * scale:>10.1f}{rec_bytes * scale:>11.1f}"
+              f"{1 - rec_bytes / dict_bytes:>8.0%}{dict_peak * scale:>11.1f}{rec_peak * scale:>10.1f}"
+              f"{dict_s:>8.2f}{rec_s:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
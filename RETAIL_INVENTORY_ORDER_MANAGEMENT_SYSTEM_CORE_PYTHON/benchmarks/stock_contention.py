@@ -0,0 +1,88 @@
+# benchmarks/stock_contention.py
+"""
+N threads hammer one SKU until it sells out, then check for oversell.
+
+    python -m benchmarks.stock_contention --threads 16 --stock 200
+    python -m benchmarks.stock_contention --mode legacy   # old read-modify-write path
+
+Runs against whatever database src.config points at. A throwaway product is
+created for the run and deleted afterwards.
+"""
+import argparse
+import threading
+import time
+import uuid
+
+from src.dao import product_dao
+
+
+def _reserve_atomic(prod_id: int) -> bool:
+    try:
+        product_dao.reserve_stock([{"prod_id": prod_id, "qty": 1}])
+        return True
+    except product_dao.InsufficientStock:
+        return False
+
+
+def _reserve_legacy(prod_id: int) -> bool:
+    p = product_dao.get_product_by_id(prod_id)
+    if p["stock"] < 1:
+        return False
+    product_dao.update_product(prod_id, {"stock": p["stock"] - 1})
+    return True
+
+
+def run(threads: int, stock: int, mode: str) -> dict:
+    reserve = _reserve_atomic if mode == "atomic" else _reserve_legacy
+    sku = f"BENCH-{uuid.uuid4().hex[:10]}"
+    prod = product_dao.create_product("contention benchmark", sku, 1.0, stock)
+    prod_id = prod["prod_id"]
+    sold = [0] * threads
+    attempts = [0] * threads
+
+    def worker(i: int) -> None:
+        while True:
+            attempts[i] += 1
+            if not reserve(prod_id):
+                return
+            sold[i] += 1
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    final_stock = product_dao.get_product_by_id(prod_id)["stock"]
+    product_dao.delete_product(prod_id)
+    total_sold = sum(sold)
+    return {
+        "mode": mode,
+        "threads": threads,
+        "initial_stock": stock,
+        "units_sold": total_sold,
+        "final_stock": final_stock,
+        "oversold": max(0, total_sold - stock),
+        # Sales the stock column never saw (overwritten by a concurrent write).
+        "lost_updates": total_sold - (stock - final_stock),
+        "attempts": sum(attempts),
+        "seconds": round(elapsed, 3),
+        "reservations_per_sec": round(total_sold / elapsed, 1) if elapsed else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--stock", type=int, default=200)
+    parser.add_argument("--mode", choices=["atomic", "legacy"], default="atomic")
+    args = parser.parse_args()
+    result = run(args.threads, args.stock, args.mode)
+    for k, v in result.items():
+        print(f"{k:>22}: {v}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+# benchmarks/suite.py
+"""
+End-to-end benchmark suite against the in-process Supabase stand-in
+(benchmarks/mock_supabase.py), with a fixed delay per round trip.
+
+    python -m benchmarks.suite --latency-ms 5 --sizes 1000 20000 --baskets 1 5 20 --out results.json
+    python -m benchmarks.suite --compare results.json          # exit 1 on regressions
+
+For each history size a fresh database is seeded, then each scenario runs --repeat
+times. Per scenario it reports round trips (requests/writes per op), response payload
+(bytes and JSON decode time per op), wall time (mean/p50/p95 ms) and peak Python
+memory (tracemalloc). --compare diffs against an
+earlier JSON result and flags rows whose round trips went up or whose p50 grew by
+more than --threshold.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from benchmarks import mock_supabase
+from src import reporting_reports
+from src.config import client_stats
+from src.dao import customer_dao, order_dao, product_dao
+from src.services import customer_service, order_service, product_service
+
+
+def _percentile(sorted_values, pct):
+    k = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def measure(name: str, fn, repeat: int, client, **labels) -> dict:
+    """
+    Call fn(0) once under tracemalloc for peak memory, then time fn(1..repeat).
+    Round trips (from client_stats()) and payload are counted over the timed calls only.
+    """
+    tracemalloc.start()
+    fn(0)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    timings = []
+    before, wire_before = client_stats(), client.payload()
+    for i in range(1, repeat + 1):
+        start = time.perf_counter()
+        fn(i)
+        timings.append((time.perf_counter() - start) * 1000)
+    after, wire_after = client_stats(), client.payload()
+    timings.sort()
+    return {
+        "scenario": name,
+        **labels,
+        "repeat": repeat,
+        "requests_per_op": round((after["requests"] - before["requests"]) / repeat, 2),
+        "writes_per_op": round((after["writes"] - before["writes"]) / repeat, 2),
+        "response_bytes_per_op": round((wire_after["response_bytes"] - wire_before["response_bytes"]) / repeat),
+        "decode_us_per_op": round((wire_after["decode_seconds"] - wire_before["decode_seconds"]) * 1e6 / repeat, 1),
+        "ms_mean": round(sum(timings) / repeat, 3),
+        "ms_p50": round(_percentile(timings, 50), 3),
+        "ms_p95": round(_percentile(timings, 95), 3),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def run_size(size: int, baskets, repeat: int, latency_ms: float, jitter_ms: float) -> list:
+    client = mock_supabase.install(latency_ms=latency_ms, jitter_ms=jitter_ms)
+    customers, products = max(50, size // 10), max(50, size // 20)
+    mock_supabase.seed(client, orders=size, customers=customers, products=products)
+    product_dao.clear_cache()
+    customer_dao.clear_cache()
+    results = []
+
+    for basket in baskets:
+        # Products from the top of the id range always have stock (see seed()).
+        well_stocked = [p["prod_id"] for p in product_dao.list_products(limit=products) if p["stock"] > 1000][:basket]
+        items = [{"prod_id": pid, "qty": 1} for pid in well_stocked]
+        placed = []
+
+        def create(i):
+            placed.append(order_service.create_order(1 + i % customers, items)["order_id"])
+
+        def cancel(i):
+            order_service.cancel_order(placed[i])
+
+        labels = {"table_size": size, "basket": basket}
+        results.append(measure("create_order", create, repeat, client, **labels))
+        results.append(measure("get_order_details", lambda i: order_dao.get_order_details(placed[i]), repeat, client, **labels))
+        results.append(measure("cancel_order", cancel, repeat, client, **labels))
+
+    labels = {"table_size": size, "basket": None}
+    results.append(measure("get_low_stock", lambda i: product_service.get_low_stock(), repeat, client, **labels))
+    # Existence checks (the delete_customer guard, update_customer's lookup) on
+    # customers the cache has not seen yet.
+    results.append(measure("customer_has_orders", lambda i: order_dao.customer_has_orders(2 + i), repeat, client, **labels))
+    results.append(measure("update_customer", lambda i: customer_service.customer_service.update_customer(
+        customers - i, new_city="Updated"), repeat, client, **labels))
+    for name in ("top_selling_products", "total_revenue_last_month", "total_orders_per_customer",
+                 "customers_with_more_than_n_orders"):
+        report = getattr(reporting_reports, name)
+        results.append(measure(f"reporting_reports.{name}", lambda i: report(), repeat, client, **labels))
+    return results
+
+
+def _git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(old: dict, new: dict, threshold: float) -> list:
+    """
+    Rows of `new` that need more round trips than in `old`, or whose p50 grew by more
+    than `threshold` (0.2 = 20%).
+    """
+    def key(r):
+        return r["scenario"], r["table_size"], r["basket"]
+
+    previous = {key(r): r for r in old["results"]}
+    regressions = []
+    for r in new["results"]:
+        o = previous.get(key(r))
+        if not o:
+            continue
+        if r["requests_per_op"] > o["requests_per_op"] or (o["ms_p50"] and r["ms_p50"] > o["ms_p50"] * (1 + threshold)):
+            regressions.append({"scenario": r["scenario"], "table_size": r["table_size"], "basket": r["basket"],
+                                "requests_per_op": [o["requests_per_op"], r["requests_per_op"]],
+                                "ms_p50": [o["ms_p50"], r["ms_p50"]]})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="delay added to every round trip")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="orders of seeded history")
+    parser.add_argument("--baskets", type=int, nargs="+", default=[1, 5, 20], help="lines per order")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--out", help="write results as JSON")
+    parser.add_argument("--compare", help="earlier JSON result to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        results.extend(run_size(size, args.baskets, args.repeat, args.latency_ms, args.jitter_ms))
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_rev": _git_rev(),
+            "python": platform.python_version(),
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    print(f"{'scenario':<54}{'size':>8}{'basket':>8}{'req/op':>8}{'wr/op':>7}{'resp B':>9}{'dec us':>8}"
+          f"{'p50 ms':>10}{'p95 ms':>10}{'peak KB':>10}")
+    for r in results:
+        print(f"{r['scenario']:<54}{r['table_size']:>8}{r['basket'] if r['basket'] is not None else '-':>8}"
+              f"{r['requests_per_op']:>8}{r['writes_per_op']:>7}{r['response_bytes_per_op']:>9}{r['decode_us_per_op']:>8}"
+              f"{r['ms_p50']:>10}{r['ms_p95']:>10}{r['peak_kb']:>10}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        print(json.dumps({"regressions": regressions}, indent=2))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
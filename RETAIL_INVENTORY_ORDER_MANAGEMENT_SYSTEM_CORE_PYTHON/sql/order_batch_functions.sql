@@ -0,0 +1,100 @@
+-- sql/order_batch_functions.sql
+-- Batch cancellation and settlement for order_service.cancel_orders / pay_orders
+-- (`retail-cli order cancel-batch` / `pay-batch`).
+-- Run once in the Supabase SQL editor after sql/stock_functions.sql.
+
+-- Cancel a batch of orders in one transaction. Every order that is still PLACED is
+-- flipped to CANCELLED, the quantities of its lines are added back to stock (summed
+-- per product) and its payments are marked REFUNDED; if any step fails, nothing
+-- changes. Orders that are not PLACED are left alone and reported with their current
+-- status (null when the order does not exist). Returns
+--   {"cancelled": [order_id, ...],
+--    "skipped":   [{"order_id", "status"}, ...],
+--    "products":  [product rows after the increment]}
+create or replace function cancel_orders(order_ids bigint[])
+returns jsonb
+language plpgsql
+as $$
+declare
+  claimed bigint[];
+  restocked jsonb;
+  skipped jsonb;
+begin
+  -- Claiming by the PLACED -> CANCELLED flip means concurrent cancels of the same
+  -- order restore its stock once.
+  with flipped as (
+    update orders o
+       set status = 'CANCELLED'
+     where o.order_id = any(order_ids)
+       and o.status = 'PLACED'
+    returning o.order_id
+  )
+  select coalesce(array_agg(f.order_id order by f.order_id), '{}') into claimed from flipped f;
+
+  -- Lock rows in prod_id order, like reserve_stock, so the two cannot deadlock.
+  perform 1
+     from product p
+    where p.prod_id in (select i.prod_id from order_items i where i.order_id = any(claimed))
+    order by p.prod_id
+      for update;
+
+  with restored as (
+    select i.prod_id, sum(i.quantity)::int as qty
+      from order_items i
+     where i.order_id = any(claimed)
+     group by i.prod_id
+  ), updated as (
+    update product p
+       set stock = p.stock + r.qty
+      from restored r
+     where p.prod_id = r.prod_id
+    returning p.*
+  )
+  select coalesce(jsonb_agg(to_jsonb(u) order by u.prod_id), '[]') into restocked from updated u;
+
+  update payments set status = 'REFUNDED' where order_id = any(claimed);
+
+  select coalesce(jsonb_agg(jsonb_build_object('order_id', r.id, 'status', o.status) order by r.n), '[]')
+    into skipped
+    from unnest(order_ids) with ordinality as r(id, n)
+    left join orders o on o.order_id = r.id
+   where r.id <> all(claimed);
+
+  return jsonb_build_object('cancelled', to_jsonb(claimed), 'skipped', skipped, 'products', restocked);
+end;
+$$;
+
+-- Settle a batch of orders in one transaction. Every order that is still PLACED is
+-- flipped to COMPLETED and its payments are marked PAID with p_method, stamped now();
+-- if any step fails, nothing changes. Other orders are reported as in cancel_orders.
+-- Returns {"paid": [order_id, ...], "skipped": [{"order_id", "status"}, ...]}
+create or replace function pay_orders(order_ids bigint[], p_method text)
+returns jsonb
+language plpgsql
+as $$
+declare
+  claimed bigint[];
+  skipped jsonb;
+begin
+  with flipped as (
+    update orders o
+       set status = 'COMPLETED'
+     where o.order_id = any(order_ids)
+       and o.status = 'PLACED'
+    returning o.order_id
+  )
+  select coalesce(array_agg(f.order_id order by f.order_id), '{}') into claimed from flipped f;
+
+  update payments
+     set status = 'PAID', method = p_method, paid_at = now()
+   where order_id = any(claimed);
+
+  select coalesce(jsonb_agg(jsonb_build_object('order_id', r.id, 'status', o.status) order by r.n), '[]')
+    into skipped
+    from unnest(order_ids) with ordinality as r(id, n)
+    left join orders o on o.order_id = r.id
+   where r.id <> all(claimed);
+
+  return jsonb_build_object('paid', to_jsonb(claimed), 'skipped', skipped);
+end;
+$$;
@@ -0,0 +1,78 @@
+-- sql/order_queue_functions.sql
+-- Group commit for the write-behind order queue (src/services/order_queue.py).
+-- Run once in the Supabase SQL editor after sql/stock_functions.sql.
+
+-- Client-generated key of a queued order; makes replays after a crash idempotent.
+alter table orders add column if not exists order_ref text;
+create unique index if not exists orders_order_ref_idx on orders (order_ref);
+
+-- Place a group of orders in one transaction. For each element:
+--   {"order_ref", "cust_id", "total_amount",
+--    "lines": [{"prod_id", "qty"}],            -- one entry per product
+--    "items": [{"prod_id", "qty", "price"}]}   -- order_items rows
+-- stock is reserved (stock >= qty), then the order, its items and a PENDING payment
+-- are inserted. Orders whose ref already exists are reported as DUPLICATE and left
+-- alone; orders short on stock are REJECTED without affecting the rest of the group.
+create or replace function place_orders(orders jsonb)
+returns table (ref text, placed_order_id bigint, outcome text, error text)
+language plpgsql
+as $$
+declare
+  o jsonb;
+  short_id bigint;
+  new_id bigint;
+begin
+  for o in select * from jsonb_array_elements(orders) loop
+    ref := o->>'order_ref';
+    error := null;
+
+    select ord.order_id into placed_order_id from orders ord where ord.order_ref = ref;
+    if placed_order_id is not null then
+      outcome := 'DUPLICATE';
+      return next;
+      continue;
+    end if;
+
+    perform 1
+       from product p
+      where p.prod_id in (select (l->>'prod_id')::bigint from jsonb_array_elements(o->'lines') l)
+      order by p.prod_id
+        for update;
+
+    short_id := null;
+    select l.prod_id into short_id
+      from jsonb_to_recordset(o->'lines') as l(prod_id bigint, qty int)
+      left join product p on p.prod_id = l.prod_id
+     where p.prod_id is null or p.stock < l.qty
+     limit 1;
+
+    if short_id is not null then
+      placed_order_id := null;
+      outcome := 'REJECTED';
+      error := 'insufficient_stock:' || short_id;
+      return next;
+      continue;
+    end if;
+
+    update product p
+       set stock = p.stock - l.qty
+      from jsonb_to_recordset(o->'lines') as l(prod_id bigint, qty int)
+     where p.prod_id = l.prod_id;
+
+    insert into orders (cust_id, total_amount, order_ref)
+    values ((o->>'cust_id')::bigint, (o->>'total_amount')::numeric, ref)
+    returning orders.order_id into new_id;
+
+    insert into order_items (order_id, prod_id, quantity, price)
+    select new_id, i.prod_id, i.qty, i.price
+      from jsonb_to_recordset(o->'items') as i(prod_id bigint, qty int, price numeric);
+
+    insert into payments (order_id, amount, status)
+    values (new_id, (o->>'total_amount')::numeric, 'PENDING');
+
+    placed_order_id := new_id;
+    outcome := 'PLACED';
+    return next;
+  end loop;
+end;
+$$;
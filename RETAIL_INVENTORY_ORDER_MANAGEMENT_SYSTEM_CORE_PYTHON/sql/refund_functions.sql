@@ -0,0 +1,32 @@
+-- sql/refund_functions.sql
+-- Single-request refund for `retail-cli order refund`.
+-- Run once in the Supabase SQL editor.
+
+-- Mark the payments of a CANCELLED order REFUNDED. The order row is locked while its
+-- status is checked, so a concurrent status change cannot slip in between. Returns
+--   {"status":  the order's status (null when it does not exist),
+--    "payment": its latest payment after the update, or null when nothing was refunded}
+create or replace function refund_order(p_order_id bigint)
+returns jsonb
+language plpgsql
+as $$
+declare
+  current_status text;
+  latest jsonb;
+begin
+  select o.status into current_status from orders o where o.order_id = p_order_id for update;
+  if current_status is distinct from 'CANCELLED' then
+    return jsonb_build_object('status', current_status, 'payment', null);
+  end if;
+
+  update payments set status = 'REFUNDED' where order_id = p_order_id;
+
+  select to_jsonb(p) into latest
+    from payments p
+   where p.order_id = p_order_id
+   order by p.payment_id desc
+   limit 1;
+
+  return jsonb_build_object('status', current_status, 'payment', latest);
+end;
+$$;
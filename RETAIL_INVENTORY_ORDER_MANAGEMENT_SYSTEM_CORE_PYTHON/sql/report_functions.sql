@@ -0,0 +1,41 @@
+-- sql/report_functions.sql
+-- Aggregations used by src/reporting_reports.py, run server-side so only the
+-- result set crosses the network. Run once in the Supabase SQL editor.
+
+create index if not exists order_items_prod_id_idx on order_items (prod_id);
+create index if not exists orders_order_date_idx on orders (order_date);
+create index if not exists orders_cust_id_idx on orders (cust_id);
+
+create or replace function report_top_selling_products(p_limit int default 5)
+returns table (prod_id bigint, total_qty bigint)
+language sql stable
+as $$
+  select oi.prod_id, sum(oi.quantity)::bigint as total_qty
+    from order_items oi
+   group by oi.prod_id
+   order by total_qty desc, oi.prod_id
+   limit p_limit;
+$$;
+
+-- Revenue of orders placed in [p_start, p_end).
+create or replace function report_revenue_between(p_start timestamptz, p_end timestamptz)
+returns numeric
+language sql stable
+as $$
+  select coalesce(sum(o.total_amount), 0)
+    from orders o
+   where o.order_date >= p_start
+     and o.order_date < p_end;
+$$;
+
+-- Order count per customer, keeping only customers with more than p_min_orders.
+create or replace function report_orders_per_customer(p_min_orders int default 0)
+returns table (cust_id bigint, order_count bigint)
+language sql stable
+as $$
+  select o.cust_id, count(*)::bigint as order_count
+    from orders o
+   group by o.cust_id
+  having count(*) > p_min_orders
+   order by o.cust_id;
+$$;
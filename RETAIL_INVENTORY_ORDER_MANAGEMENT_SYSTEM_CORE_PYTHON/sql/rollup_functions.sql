@@ -0,0 +1,213 @@
+-- sql/rollup_functions.sql
+-- Daily sales rollups read by src/reporting_reports.py. Kept current by statement-level
+-- triggers on orders / order_items / payments, so every write path (create_order,
+-- cancel_order, process_payment, place_orders, the order queue) updates them in the
+-- same transaction with no extra round trips.
+-- Run once in the Supabase SQL editor, then backfill existing history with:
+--   select rollup_rebuild();
+-- Figures are gross (cancelled orders still count) to match the reports; cancelled
+-- and paid amounts are kept alongside.
+
+create table if not exists rollup_daily (
+  day                date primary key,
+  orders             bigint not null default 0,
+  revenue            numeric(14, 2) not null default 0,
+  cancelled_orders   bigint not null default 0,
+  cancelled_revenue  numeric(14, 2) not null default 0
+);
+
+create table if not exists rollup_product_daily (
+  day                date not null,
+  prod_id            bigint not null,
+  quantity           bigint not null default 0,
+  revenue            numeric(14, 2) not null default 0,
+  cancelled_quantity bigint not null default 0,
+  primary key (day, prod_id)
+);
+
+create table if not exists rollup_product_totals (
+  prod_id            bigint primary key,
+  quantity           bigint not null default 0,
+  revenue            numeric(14, 2) not null default 0,
+  cancelled_quantity bigint not null default 0
+);
+create index if not exists rollup_product_totals_quantity_idx on rollup_product_totals (quantity desc, prod_id);
+
+create table if not exists rollup_customer_totals (
+  cust_id          bigint primary key,
+  orders           bigint not null default 0,
+  cancelled_orders bigint not null default 0,
+  paid_orders      bigint not null default 0,
+  paid_amount      numeric(14, 2) not null default 0
+);
+create index if not exists rollup_customer_totals_orders_idx on rollup_customer_totals (orders, cust_id);
+
+-- New orders: day totals and per-customer order counts.
+create or replace function rollup_orders_inserted()
+returns trigger
+language plpgsql
+as $$
+begin
+  insert into rollup_daily as r (day, orders, revenue)
+  select (o.order_date at time zone 'utc')::date, count(*), sum(o.total_amount)
+    from new_orders o
+   group by 1
+  on conflict (day) do update
+     set orders = r.orders + excluded.orders, revenue = r.revenue + excluded.revenue;
+
+  insert into rollup_customer_totals as r (cust_id, orders)
+  select o.cust_id, count(*) from new_orders o group by o.cust_id
+  on conflict (cust_id) do update set orders = r.orders + excluded.orders;
+  return null;
+end;
+$$;
+
+-- New order lines: per-product quantity and revenue, by day and all-time.
+create or replace function rollup_items_inserted()
+returns trigger
+language plpgsql
+as $$
+begin
+  insert into rollup_product_daily as r (day, prod_id, quantity, revenue)
+  select (o.order_date at time zone 'utc')::date, i.prod_id, sum(i.quantity), sum(i.quantity * coalesce(i.price, 0))
+    from new_items i
+    join orders o on o.order_id = i.order_id
+   group by 1, 2
+  on conflict (day, prod_id) do update
+     set quantity = r.quantity + excluded.quantity, revenue = r.revenue + excluded.revenue;
+
+  insert into rollup_product_totals as r (prod_id, quantity, revenue)
+  select i.prod_id, sum(i.quantity), sum(i.quantity * coalesce(i.price, 0))
+    from new_items i
+   group by i.prod_id
+  on conflict (prod_id) do update
+     set quantity = r.quantity + excluded.quantity, revenue = r.revenue + excluded.revenue;
+  return null;
+end;
+$$;
+
+-- Orders moving into CANCELLED.
+create or replace function rollup_orders_updated()
+returns trigger
+language plpgsql
+as $$
+begin
+  -- One statement: the data-modifying CTEs all see the same set of cancelled orders.
+  with cancelled as (
+    select n.order_id, n.cust_id, (n.order_date at time zone 'utc')::date as day, n.total_amount
+      from new_orders n
+      join old_orders o on o.order_id = n.order_id
+     where n.status = 'CANCELLED' and o.status is distinct from 'CANCELLED'
+  ),
+  lines as (
+    select c.day, i.prod_id, i.quantity
+      from cancelled c
+      join order_items i on i.order_id = c.order_id
+  ),
+  by_day as (
+    insert into rollup_daily as r (day, cancelled_orders, cancelled_revenue)
+    select c.day, count(*), sum(c.total_amount) from cancelled c group by c.day
+    on conflict (day) do update
+       set cancelled_orders = r.cancelled_orders + excluded.cancelled_orders,
+           cancelled_revenue = r.cancelled_revenue + excluded.cancelled_revenue
+    returning 1
+  ),
+  by_customer as (
+    insert into rollup_customer_totals as r (cust_id, cancelled_orders)
+    select c.cust_id, count(*) from cancelled c group by c.cust_id
+    on conflict (cust_id) do update set cancelled_orders = r.cancelled_orders + excluded.cancelled_orders
+    returning 1
+  ),
+  by_product_day as (
+    insert into rollup_product_daily as r (day, prod_id, cancelled_quantity)
+    select l.day, l.prod_id, sum(l.quantity) from lines l group by 1, 2
+    on conflict (day, prod_id) do update set cancelled_quantity = r.cancelled_quantity + excluded.cancelled_quantity
+    returning 1
+  )
+  insert into rollup_product_totals as r (prod_id, cancelled_quantity)
+  select l.prod_id, sum(l.quantity) from lines l group by l.prod_id
+  on conflict (prod_id) do update set cancelled_quantity = r.cancelled_quantity + excluded.cancelled_quantity;
+  return null;
+end;
+$$;
+
+-- Payments moving into PAID.
+create or replace function rollup_payments_updated()
+returns trigger
+language plpgsql
+as $$
+begin
+  insert into rollup_customer_totals as r (cust_id, paid_orders, paid_amount)
+  select ord.cust_id, count(distinct n.order_id), sum(n.amount)
+    from new_payments n
+    join old_payments o on o.payment_id = n.payment_id
+    join orders ord on ord.order_id = n.order_id
+   where n.status = 'PAID' and o.status is distinct from 'PAID'
+   group by ord.cust_id
+  on conflict (cust_id) do update
+     set paid_orders = r.paid_orders + excluded.paid_orders, paid_amount = r.paid_amount + excluded.paid_amount;
+  return null;
+end;
+$$;
+
+drop trigger if exists rollup_orders_inserted on orders;
+create trigger rollup_orders_inserted after insert on orders
+  referencing new table as new_orders
+  for each statement execute function rollup_orders_inserted();
+
+drop trigger if exists rollup_items_inserted on order_items;
+create trigger rollup_items_inserted after insert on order_items
+  referencing new table as new_items
+  for each statement execute function rollup_items_inserted();
+
+drop trigger if exists rollup_orders_updated on orders;
+create trigger rollup_orders_updated after update on orders
+  referencing old table as old_orders new table as new_orders
+  for each statement execute function rollup_orders_updated();
+
+drop trigger if exists rollup_payments_updated on payments;
+create trigger rollup_payments_updated after update on payments
+  referencing old table as old_payments new table as new_payments
+  for each statement execute function rollup_payments_updated();
+
+-- Recompute every rollup from the base tables (backfill after install, or repair after
+-- deletes / manual edits). Blocks writers to the base tables while it runs.
+create or replace function rollup_rebuild()
+returns void
+language plpgsql
+as $$
+begin
+  lock table orders, order_items, payments in share mode;
+  truncate rollup_daily, rollup_product_daily, rollup_product_totals, rollup_customer_totals;
+
+  insert into rollup_daily (day, orders, revenue, cancelled_orders, cancelled_revenue)
+  select (o.order_date at time zone 'utc')::date, count(*), sum(o.total_amount),
+         count(*) filter (where o.status = 'CANCELLED'),
+         coalesce(sum(o.total_amount) filter (where o.status = 'CANCELLED'), 0)
+    from orders o
+   group by 1;
+
+  insert into rollup_product_daily (day, prod_id, quantity, revenue, cancelled_quantity)
+  select (o.order_date at time zone 'utc')::date, i.prod_id, sum(i.quantity),
+         sum(i.quantity * coalesce(i.price, 0)),
+         coalesce(sum(i.quantity) filter (where o.status = 'CANCELLED'), 0)
+    from order_items i
+    join orders o on o.order_id = i.order_id
+   group by 1, 2;
+
+  insert into rollup_product_totals (prod_id, quantity, revenue, cancelled_quantity)
+  select d.prod_id, sum(d.quantity), sum(d.revenue), sum(d.cancelled_quantity)
+    from rollup_product_daily d
+   group by d.prod_id;
+
+  insert into rollup_customer_totals (cust_id, orders, cancelled_orders, paid_orders, paid_amount)
+  select o.cust_id, count(*),
+         count(*) filter (where o.status = 'CANCELLED'),
+         count(p.order_id),
+         coalesce(sum(p.amount), 0)
+    from orders o
+    left join (select order_id, sum(amount) as amount from payments where status = 'PAID' group by order_id) p
+      on p.order_id = o.order_id
+   group by o.cust_id;
+end;
+$$;
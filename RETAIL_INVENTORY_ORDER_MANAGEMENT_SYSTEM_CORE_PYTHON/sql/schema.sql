@@ -0,0 +1,60 @@
+-- sql/schema.sql
+-- Tables the DAOs expect (Postgres / Supabase). src/backends/sqlite_schema.sql is the
+-- same schema for the embedded SQLite backend; keep the two in step.
+
+create table if not exists customers (
+  cust_id    bigint generated by default as identity primary key,
+  name       text not null,
+  email      text not null unique,
+  phone      bigint,
+  city       text,
+  created_at timestamptz not null default now()
+);
+
+create table if not exists product (
+  prod_id  bigint generated by default as identity primary key,
+  name     text not null,
+  sku      text not null unique,
+  price    numeric(12, 2) not null check (price > 0),
+  stock    int not null default 0,
+  category text
+);
+
+create table if not exists orders (
+  order_id     bigint generated by default as identity primary key,
+  cust_id      bigint not null references customers (cust_id),
+  order_date   timestamptz not null default now(),
+  total_amount numeric(12, 2) not null,
+  status       text not null default 'PLACED',
+  order_ref    text unique
+);
+
+create table if not exists order_items (
+  item_id  bigint generated by default as identity primary key,
+  order_id bigint not null references orders (order_id),
+  prod_id  bigint not null references product (prod_id),
+  quantity int not null check (quantity > 0),
+  price    numeric(12, 2)
+);
+
+create table if not exists payments (
+  payment_id bigint generated by default as identity primary key,
+  order_id   bigint not null references orders (order_id),
+  amount     numeric(12, 2) not null,
+  status     text not null default 'PENDING',
+  method     text,
+  paid_at    timestamptz
+);
+
+-- Results of requests made with an idempotency key (create_order / process_payment),
+-- so a retried request gets the original result instead of running again.
+create table if not exists idempotency_keys (
+  key          text primary key,
+  operation    text not null,
+  request_hash text not null,
+  response     jsonb not null,
+  created_at   timestamptz not null default now()
+);
+
+create index if not exists order_items_order_id_idx on order_items (order_id);
+create index if not exists payments_order_id_idx on payments (order_id);
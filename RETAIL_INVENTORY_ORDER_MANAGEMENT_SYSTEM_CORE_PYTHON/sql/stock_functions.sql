@@ -0,0 +1,69 @@
+-- sql/stock_functions.sql
+-- Run once in the Supabase SQL editor. Exposed to the client through PostgREST RPC.
+-- Stock is only ever changed relative to its current value inside the database,
+-- so concurrent checkouts cannot overwrite each other's updates.
+
+drop function if exists decrement_stock(jsonb);
+
+-- Backs product_dao.iter_low_stock: "stock <= :threshold order by prod_id" becomes
+-- an index range scan instead of a full table scan.
+create index if not exists product_stock_idx on product (stock, prod_id);
+
+-- Reserve a whole basket atomically: either every line has enough stock and all
+-- are decremented, or nothing changes and the call fails with
+-- 'insufficient_stock:<prod_id>'.
+-- items: [{"prod_id": 1, "qty": 2}, ...] (one entry per product)
+create or replace function reserve_stock(items jsonb)
+returns setof product
+language plpgsql
+as $$
+declare
+  short_id bigint;
+begin
+  -- Lock rows in prod_id order so overlapping baskets cannot deadlock.
+  perform 1
+     from product p
+    where p.prod_id in (select (e->>'prod_id')::bigint from jsonb_array_elements(items) e)
+    order by p.prod_id
+      for update;
+
+  select i.prod_id into short_id
+    from jsonb_to_recordset(items) as i(prod_id bigint, qty int)
+    left join product p on p.prod_id = i.prod_id
+   where p.prod_id is null or p.stock < i.qty
+   limit 1;
+
+  if short_id is not null then
+    raise exception 'insufficient_stock:%', short_id using errcode = 'P0001';
+  end if;
+
+  return query
+    update product p
+       set stock = p.stock - i.qty
+      from jsonb_to_recordset(items) as i(prod_id bigint, qty int)
+     where p.prod_id = i.prod_id
+    returning p.*;
+end;
+$$;
+
+-- Add quantities back (cancellations, restocks).
+create or replace function increment_stock(items jsonb)
+returns setof product
+language plpgsql
+as $$
+begin
+  -- Same lock order as reserve_stock, so a restock and a checkout cannot deadlock.
+  perform 1
+     from product p
+    where p.prod_id in (select (e->>'prod_id')::bigint from jsonb_array_elements(items) e)
+    order by p.prod_id
+      for update;
+
+  return query
+    update product p
+       set stock = p.stock + i.qty
+      from jsonb_to_recordset(items) as i(prod_id bigint, qty int)
+     where p.prod_id = i.prod_id
+    returning p.*;
+end;
+$$;
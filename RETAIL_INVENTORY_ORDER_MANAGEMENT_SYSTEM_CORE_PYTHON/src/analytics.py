@@ -0,0 +1,271 @@
+# src/analytics.py
+"""
+Vectorized sales analytics over columnar NumPy arrays.
+
+load_sales() streams orders and order_items once (minimum columns, keyset pages) into
+one array per column; the report functions then group with np.unique/np.bincount
+instead of looping over dicts, so a year of order lines fits in a few hundred MB
+and each report runs in well under a second.
+
+NumPy is optional for the rest of the package: it is imported on first use and a
+missing install raises AnalyticsError.
+
+    from src import analytics
+    data = analytics.load_sales(since=date(2025, 1, 1))
+    analytics.top_products(data, 10)
+    analytics.revenue_by_period(data, "M")
+
+load_snapshot() builds the same arrays from a snapshot written by
+src.services.export_service, without touching the database.
+"""
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from src.dao.pagination import iter_keyset
+
+PAGE_SIZE = 5000
+
+ORDER_COLUMNS = "order_id, cust_id, order_date, total_amount, status"
+ITEM_COLUMNS = "item_id, order_id, prod_id, quantity, price"
+
+
+class AnalyticsError(Exception):
+    pass
+
+
+def _np():
+    try:
+        import numpy
+    except ImportError:
+        raise AnalyticsError("src.analytics needs numpy (pip install numpy)") from None
+    return numpy
+
+
+class SalesData:
+    """
+    Orders and order lines as parallel column arrays:
+      orders: order_id, cust_id (int64), day (datetime64[D]), total_amount (float64), cancelled (bool)
+      items:  order_id, prod_id, quantity (int64), price (float64)
+    """
+
+    def __init__(self, orders: Dict, items: Dict):
+        self.orders = orders
+        self.items = items
+
+    def __len__(self) -> int:
+        return len(self.orders["order_id"])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self.orders.values()) + sum(a.nbytes for a in self.items.values())
+
+    def without_cancelled(self) -> "SalesData":
+        np = _np()
+        keep = ~self.orders["cancelled"]
+        item_keep = ~np.isin(self.items["order_id"], self.orders["order_id"][self.orders["cancelled"]])
+        return SalesData({k: v[keep] for k, v in self.orders.items()},
+                         {k: v[item_keep] for k, v in self.items.items()})
+
+
+def _columns(rows: Iterable[Dict], spec: Sequence[Tuple[str, str, object]], page_size: int) -> Dict:
+    """
+    Convert a row stream into {name: array}, one page at a time so only one page of
+    dicts is alive at once. spec is (output name, row key, dtype or converter).
+    """
+    np = _np()
+    chunks: Dict[str, List] = {name: [] for name, _, _ in spec}
+    page: List[Dict] = []
+
+    def flush():
+        for name, key, kind in spec:
+            if callable(kind):
+                chunks[name].append(kind([r[key] for r in page]))
+            else:
+                # np.array rather than fromiter: a NULL price becomes NaN instead of failing.
+                chunks[name].append(np.array([r[key] for r in page], dtype=kind))
+        page.clear()
+
+    for row in rows:
+        page.append(row)
+        if len(page) >= page_size:
+            flush()
+    if page:
+        flush()
+    return {name: np.concatenate(c) if c else np.empty(0, dtype=_dtype(kind))
+            for (name, _, kind), c in zip(spec, chunks.values())}
+
+
+def _dtype(kind):
+    return "datetime64[D]" if kind is _days else ("bool" if kind is _cancelled else kind)
+
+
+def _days(values: List[str]):
+    # ISO timestamps -> calendar days (UTC, as stored).
+    return _np().array([v[:10] for v in values], dtype="datetime64[D]")
+
+
+def _cancelled(values: List[str]):
+    return _np().array([v == "CANCELLED" for v in values], dtype=bool)
+
+
+def load_sales(since: Optional[date] = None, until: Optional[date] = None, page_size: int = PAGE_SIZE) -> SalesData:
+    """
+    Load orders placed in [since, until) and their lines. Both tables are read once in
+    id order; lines of orders outside the range are dropped with a vectorized filter.
+    """
+    np = _np()
+
+    def order_range(q):
+        if since is not None:
+            q = q.gte("order_date", since.isoformat())
+        if until is not None:
+            q = q.lt("order_date", until.isoformat())
+        return q
+
+    orders = _columns(
+        iter_keyset("orders", "order_id", ORDER_COLUMNS, page_size=page_size, apply_filters=order_range, prefetch=True),
+        [("order_id", "order_id", "int64"), ("cust_id", "cust_id", "int64"), ("day", "order_date", _days),
+         ("total_amount", "total_amount", "float64"), ("cancelled", "status", _cancelled)],
+        page_size,
+    )
+    # Lines are keyed by item_id, so an order_id range only bounds the scan; the isin
+    # below drops lines of orders filtered out by date.
+    def item_range(q):
+        if since is None and until is None:
+            return q
+        if not len(orders["order_id"]):
+            return q.lt("order_id", 0)
+        return q.gte("order_id", int(orders["order_id"].min())).lte("order_id", int(orders["order_id"].max()))
+
+    items = _columns(
+        iter_keyset("order_items", "item_id", ITEM_COLUMNS, page_size=page_size, apply_filters=item_range, prefetch=True),
+        [("order_id", "order_id", "int64"), ("prod_id", "prod_id", "int64"),
+         ("quantity", "quantity", "int64"), ("price", "price", "float64")],
+        page_size,
+    )
+    if since is not None or until is not None:
+        keep = np.isin(items["order_id"], orders["order_id"])
+        items = {k: v[keep] for k, v in items.items()}
+    return SalesData(orders, items)
+
+
+def load_snapshot(out_dir: str, since: Optional[date] = None, until: Optional[date] = None) -> SalesData:
+    """
+    Load orders placed in [since, until) and their lines from a columnar snapshot
+    (see export_service.export_snapshot). Files are memory-mapped.
+    """
+    np = _np()
+    from src.services.export_service import read_table
+    orders = read_table(out_dir, "orders", ["order_id", "cust_id", "order_date", "total_amount", "status"])
+    items = read_table(out_dir, "order_items", ["order_id", "prod_id", "quantity", "price"])
+
+    def column(table, name, dtype):
+        return table.column(name).to_numpy(zero_copy_only=False).astype(dtype, copy=False)
+
+    o = {
+        "order_id": column(orders, "order_id", "int64"),
+        "cust_id": column(orders, "cust_id", "int64"),
+        "day": column(orders, "order_date", "datetime64[us]").astype("datetime64[D]"),
+        "total_amount": column(orders, "total_amount", "float64"),
+        "cancelled": column(orders, "status", object) == "CANCELLED",
+    }
+    i = {name: column(items, name, dtype) for name, dtype in
+         (("order_id", "int64"), ("prod_id", "int64"), ("quantity", "int64"), ("price", "float64"))}
+    if since is not None or until is not None:
+        keep = np.ones(len(o["order_id"]), dtype=bool)
+        if since is not None:
+            keep &= o["day"] >= np.datetime64(since, "D")
+        if until is not None:
+            keep &= o["day"] < np.datetime64(until, "D")
+        o = {k: v[keep] for k, v in o.items()}
+        item_keep = np.isin(i["order_id"], o["order_id"])
+        i = {k: v[item_keep] for k, v in i.items()}
+    return SalesData(o, i)
+
+
+def _group_sum(keys, weights=None):
+    """
+    (sorted distinct keys, per-key sum of weights or count). Integer and date keys with
+    a dense range (ids, periods) are bucketed directly with bincount, no sort needed.
+    """
+    np = _np()
+    if len(keys) and keys.dtype.kind in "iuM":
+        codes = keys.view("int64") if keys.dtype.kind == "M" else keys.astype("int64", copy=False)
+        lo = int(codes.min())
+        span = int(codes.max()) - lo + 1
+        if span <= 4 * len(codes) + 1024:
+            shifted = codes - lo
+            counts = np.bincount(shifted, minlength=span)
+            present = np.flatnonzero(counts)
+            totals = counts if weights is None else np.bincount(shifted, weights=weights, minlength=span)
+            uniq = present + lo
+            return (uniq.view(keys.dtype) if keys.dtype.kind == "M" else uniq.astype(keys.dtype)), totals[present]
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    return uniq, np.bincount(inverse, weights=weights, minlength=len(uniq))
+
+
+def top_products(data: SalesData, n: int = 5, by: str = "quantity") -> List[Tuple[int, float]]:
+    """
+    Top n products by total quantity (or by="revenue"), ties broken by prod_id.
+    """
+    np = _np()
+    items = data.items
+    weights = items["quantity"] if by == "quantity" else items["quantity"] * np.nan_to_num(items["price"])
+    prod_ids, totals = _group_sum(items["prod_id"], weights)
+    order = np.lexsort((prod_ids, -totals))[:n]
+    cast = int if by == "quantity" else float
+    return [(int(p), cast(t)) for p, t in zip(prod_ids[order], totals[order])]
+
+
+def revenue_by_period(data: SalesData, period: str = "M") -> Dict[str, float]:
+    """
+    Order revenue per calendar period: "D" (day), "W" (ISO week, Monday to Sunday),
+    "M" (month) or "Y". Keys are ISO strings ("2025-03", "2025-03-14", ...), in period
+    order; a week is keyed by its Monday.
+    """
+    np = _np()
+    day = data.orders["day"]
+    if period == "W":
+        # datetime64[W] counts weeks from 1970-01-01, a Thursday: shift Monday onto the
+        # start of a numpy week, truncate, and shift back.
+        offset = np.timedelta64(4, "D")
+        periods = (day - offset).astype("datetime64[W]").astype("datetime64[D]") + offset
+    else:
+        periods = day.astype(f"datetime64[{period}]")
+    keys, totals = _group_sum(periods, data.orders["total_amount"])
+    return {str(k): float(t) for k, t in zip(keys, totals)}
+
+
+def revenue_between(data: SalesData, start: date, end: date) -> float:
+    np = _np()
+    day = data.orders["day"]
+    mask = (day >= np.datetime64(start, "D")) & (day < np.datetime64(end, "D"))
+    return float(data.orders["total_amount"][mask].sum())
+
+
+def orders_per_customer(data: SalesData, min_orders: int = 0) -> Dict[int, int]:
+    """
+    Order count per customer, keeping customers with more than min_orders orders.
+    """
+    cust_ids, counts = _group_sum(data.orders["cust_id"])
+    keep = counts > min_orders
+    return dict(zip(cust_ids[keep].tolist(), counts[keep].tolist()))
+
+
+def repeat_customers(data: SalesData, min_orders: int = 2) -> List[int]:
+    """
+    Customers with at least min_orders orders.
+    """
+    return list(orders_per_customer(data, min_orders - 1))
+
+
+def quantity_percentiles(data: SalesData, percentiles: Sequence[float] = (50, 90, 99), per: str = "line") -> Dict[float, float]:
+    """
+    Percentiles of quantity per order line (per="line") or of units per order (per="order").
+    """
+    np = _np()
+    quantity = data.items["quantity"]
+    if per == "order":
+        _, quantity = _group_sum(data.items["order_id"], quantity)
+    if not len(quantity):
+        return {p: None for p in percentiles}
+    return dict(zip(percentiles, np.percentile(quantity, percentiles).tolist()))
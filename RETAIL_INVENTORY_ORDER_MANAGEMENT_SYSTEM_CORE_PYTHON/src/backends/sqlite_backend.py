@@ -0,0 +1,600 @@
+# src/backends/sqlite_backend.py
+"""
+Embedded SQLite storage backend.
+
+SqliteClient implements the subset of the supabase/PostgREST query-builder API the
+DAOs use (table().select/insert/upsert/update/delete, eq/neq/gt/gte/lt/lte/in_/is_,
+order/limit/range, embedded selects and rpc()), so the DAOs run unchanged against a
+local file. Every query is parameterised and its SQL text depends only on the query
+shape, so sqlite3's per-connection statement cache reuses the compiled statements.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "sqlite_schema.sql")
+
+# (child table, child column, parent table, parent column) - used for embedded selects.
+FOREIGN_KEYS = [
+    ("orders", "cust_id", "customers", "cust_id"),
+    ("order_items", "order_id", "orders", "order_id"),
+    ("order_items", "prod_id", "product", "prod_id"),
+    ("payments", "order_id", "orders", "order_id"),
+]
+
+# Columns added after a table was first released: (table, column, type). Added to
+# existing database files before the schema script runs.
+MIGRATIONS = [
+    ("orders", "order_ref", "text"),
+]
+
+_IDENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# jsonb columns round-trip as JSON text: dict/list parameters are encoded on the way
+# in and columns declared "jsonb" are decoded on the way out.
+sqlite3.register_adapter(dict, json.dumps)
+sqlite3.register_adapter(list, json.dumps)
+sqlite3.register_converter("jsonb", json.loads)
+
+def _integrity_code(e: sqlite3.IntegrityError) -> str:
+    # The Postgres SQLSTATE for the same constraint violation.
+    message = str(e)
+    for marker, code in (("UNIQUE", "23505"), ("FOREIGN KEY", "23503"), ("CHECK", "23514"), ("NOT NULL", "23502")):
+        if marker in message:
+            return code
+    return "23000"
+
+
+# rpc name -> fn(client, conn, params). Registered with @rpc below.
+RPC_FUNCTIONS: Dict[str, Callable] = {}
+
+
+class SqliteBackendError(Exception):
+    """
+    Raised for failed queries. str() mirrors postgrest's APIError so callers that
+    inspect error messages work against either backend.
+    """
+
+    def __init__(self, message: str, code: str = "SQLITE"):
+        super().__init__({"message": message, "code": code})
+        self.message = message
+        self.code = code
+
+
+class Response:
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+def rpc(name: str):
+    def register(fn):
+        RPC_FUNCTIONS[name] = fn
+        return fn
+    return register
+
+
+def _quote(column: str) -> str:
+    return f'"{column}"'
+
+
+def _dict_row(cursor, row):
+    return {d[0]: v for d, v in zip(cursor.description, row)}
+
+
+def _parse_select(spec: str) -> Tuple[List[str], List[Tuple[str, Any]]]:
+    """
+    Split "a, b, rel(x, sub(*))" into (["a", "b"], [("rel", <parsed "x, sub(*)">)]).
+    """
+    columns, embeds, depth, token = [], [], 0, ""
+    for ch in spec + ",":
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            token = token.strip()
+            if "(" in token:
+                name, inner = token.split("(", 1)
+                embeds.append((name.strip(), _parse_select(inner[:-1])))
+            elif token:
+                columns.append(token)
+            token = ""
+        else:
+            token += ch
+    return columns or ["*"], embeds
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    for table, column, decl in MIGRATIONS:
+        existing = [c["name"] for c in conn.execute(f'pragma table_info("{table}")').fetchall()]
+        if existing and column not in existing:
+            conn.execute(f'alter table "{table}" add column "{column}" {decl}')
+
+
+class _RpcCall:
+    def __init__(self, client: "SqliteClient", name: str, params: Dict):
+        self.client, self.name, self.params = client, name, params or {}
+
+    def execute(self) -> Response:
+        fn = RPC_FUNCTIONS.get(self.name)
+        if fn is None:
+            raise SqliteBackendError(f"Could not find the function public.{self.name}", code="PGRST202")
+        self.client._on_execute(write=True)
+        conn = self.client._conn()
+        try:
+            return Response(fn(self.client, conn, **self.params))
+        except sqlite3.IntegrityError as e:
+            raise SqliteBackendError(str(e), code=_integrity_code(e)) from e
+        except sqlite3.Error as e:
+            raise SqliteBackendError(str(e)) from e
+        except (KeyError, TypeError, ValueError) as e:
+            # Malformed arguments; Postgres reports these as invalid_parameter_value.
+            raise SqliteBackendError(f"invalid argument: {e!r}", code="22023") from e
+
+
+class QueryBuilder:
+    def __init__(self, client: "SqliteClient", table: str):
+        self.client = client
+        self.table = client._check_table(table)
+        self._op = "select"
+        self._select = "*"
+        self._filters: List[Tuple[str, str, Any]] = []
+        self._order: List[Tuple[str, bool]] = []
+        self._limit: Optional[int] = None
+        self._offset: Optional[int] = None
+        self._payload: Any = None
+        self._count: Optional[str] = None
+        self._head = False
+        self._returning = "representation"
+        self._on_conflict: Optional[str] = None
+        self._ignore_duplicates = False
+
+    # -- operations ---------------------------------------------------------
+
+    def select(self, *columns: str, count: Optional[str] = None, head: Optional[bool] = None) -> "QueryBuilder":
+        self._select = ",".join(columns) if columns else "*"
+        self._count = count
+        self._head = bool(head)
+        return self
+
+    def insert(self, json, *, count=None, returning="representation", upsert=False, default_to_null=True) -> "QueryBuilder":
+        self._op, self._payload, self._count, self._returning = "insert", json, count, str(returning)
+        return self
+
+    def upsert(self, json, *, count=None, returning="representation", ignore_duplicates=False,
+               on_conflict="", default_to_null=True) -> "QueryBuilder":
+        self._op, self._payload, self._count, self._returning = "upsert", json, count, str(returning)
+        self._ignore_duplicates = ignore_duplicates
+        self._on_conflict = on_conflict or None
+        return self
+
+    def update(self, json, *, count=None, returning="representation") -> "QueryBuilder":
+        self._op, self._payload, self._count, self._returning = "update", json, count, str(returning)
+        return self
+
+    def delete(self, *, count=None, returning="representation") -> "QueryBuilder":
+        self._op, self._count, self._returning = "delete", count, str(returning)
+        return self
+
+    # -- filters / modifiers ------------------------------------------------
+
+    def _filter(self, column: str, op: str, value: Any) -> "QueryBuilder":
+        self._filters.append((self.client._check_column(self.table, column), op, value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, "=", value)
+
+    def neq(self, column, value):
+        return self._filter(column, "!=", value)
+
+    def gt(self, column, value):
+        return self._filter(column, ">", value)
+
+    def gte(self, column, value):
+        return self._filter(column, ">=", value)
+
+    def lt(self, column, value):
+        return self._filter(column, "<", value)
+
+    def lte(self, column, value):
+        return self._filter(column, "<=", value)
+
+    def in_(self, column, values):
+        return self._filter(column, "in", list(values))
+
+    def is_(self, column, value):
+        return self._filter(column, "is", value)
+
+    def order(self, column: str, *, desc: bool = False, nullsfirst: Optional[bool] = None, foreign_table=None):
+        self._order.append((self.client._check_column(self.table, column), desc))
+        return self
+
+    def limit(self, size: int, *, foreign_table=None):
+        self._limit = int(size)
+        return self
+
+    def range(self, start: int, end: int, foreign_table=None):
+        self._offset, self._limit = int(start), int(end) - int(start) + 1
+        return self
+
+    # -- execution ----------------------------------------------------------
+
+    def _where(self) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        for column, op, value in self._filters:
+            if op == "in":
+                if not value:
+                    clauses.append("0")
+                    continue
+                clauses.append(f'"{column}" in ({",".join("?" * len(value))})')
+                params.extend(value)
+            elif op == "is":
+                clauses.append(f'"{column}" is null' if value in (None, "null") else f'"{column}" is ?')
+                if value not in (None, "null"):
+                    params.append(value)
+            else:
+                clauses.append(f'"{column}" {op} ?')
+                params.append(value)
+        return (" where " + " and ".join(clauses)) if clauses else "", params
+
+    def execute(self) -> Response:
+        write = self._op != "select"
+        self.client._on_execute(write=write)
+        conn = self.client._conn()
+        try:
+            if self._op == "select":
+                return self._execute_select(conn)
+            with self.client.transaction(conn):
+                return self._execute_write(conn)
+        except sqlite3.IntegrityError as e:
+            raise SqliteBackendError(str(e), code=_integrity_code(e)) from e
+        except sqlite3.Error as e:
+            raise SqliteBackendError(str(e)) from e
+
+    def _execute_select(self, conn) -> Response:
+        where, params = self._where()
+        count = None
+        if self._count:
+            count = conn.execute(f'select count(*) from "{self.table}"{where}', params).fetchone()
+            count = next(iter(count.values()))
+        if self._head:
+            return Response([], count)
+        sql = f'select * from "{self.table}"{where}'
+        if self._order:
+            sql += " order by " + ", ".join(f'"{c}"{" desc" if d else ""}' for c, d in self._order)
+        if self._limit is not None or self._offset is not None:
+            sql += " limit ? offset ?"
+            params = params + [self._limit if self._limit is not None else -1, self._offset or 0]
+        rows = conn.execute(sql, params).fetchall()
+        return Response(self.client._shape(conn, self.table, rows, _parse_select(self._select)), count)
+
+    def _execute_write(self, conn) -> Response:
+        if self._op in ("insert", "upsert"):
+            payload = self._payload if isinstance(self._payload, list) else [self._payload]
+            rows = []
+            for record in payload:
+                cols = [self.client._check_column(self.table, c) for c in record]
+                sql = f'insert into "{self.table}" ({", ".join(map(_quote, cols))}) values ({", ".join("?" * len(cols))})'
+                if self._op == "upsert":
+                    target = self._on_conflict or self.client._primary_key(self.table)
+                    if self._ignore_duplicates:
+                        sql += f' on conflict ("{target}") do nothing'
+                    else:
+                        updates = ", ".join(f'"{c}" = excluded."{c}"' for c in cols if c != target)
+                        sql += f' on conflict ("{target}") do update set {updates}' if updates else f' on conflict ("{target}") do nothing'
+                rows.extend(conn.execute(sql + " returning *", list(record.values())).fetchall())
+        elif self._op == "update":
+            cols = [self.client._check_column(self.table, c) for c in self._payload]
+            where, params = self._where()
+            sets = ", ".join(f'"{c}" = ?' for c in cols)
+            rows = conn.execute(f'update "{self.table}" set {sets}{where} returning *',
+                                list(self._payload.values()) + params).fetchall()
+        else:
+            where, params = self._where()
+            rows = conn.execute(f'delete from "{self.table}"{where} returning *', params).fetchall()
+        count = len(rows) if self._count else None
+        if self._returning != "representation":
+            return Response([], count)
+        return Response(rows, count)
+
+
+class SqliteClient:
+    """
+    Drop-in stand-in for supabase.Client backed by a local SQLite database in WAL mode.
+    One connection per thread; ":memory:" uses a private shared-cache database.
+    """
+
+    def __init__(self, path: str = "retail.db"):
+        self.path = path
+        self._uri = path == ":memory:"
+        if self._uri:
+            self.path = f"file:retail-{uuid.uuid4().hex}?mode=memory&cache=shared"
+        self._local = threading.local()
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._columns: Dict[str, List[str]] = {}
+        self._keeper = self._conn()  # creates the schema; keeps a :memory: db alive
+        for row in self._keeper.execute("select name from sqlite_master where type = 'table'").fetchall():
+            if not row["name"].startswith("sqlite_"):
+                cols = self._keeper.execute(f'pragma table_info("{row["name"]}")').fetchall()
+                self._columns[row["name"]] = [c["name"] for c in cols]
+        self._pk = {t: cols[0] for t, cols in self._columns.items()}
+
+    # -- connections --------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        conn = sqlite3.connect(self.path, uri=self._uri, isolation_level=None,
+                               check_same_thread=False, cached_statements=512,
+                               detect_types=sqlite3.PARSE_DECLTYPES)
+        conn.row_factory = _dict_row
+        conn.execute("pragma busy_timeout = 10000")
+        conn.execute("pragma foreign_keys = on")
+        if not self._uri:
+            conn.execute("pragma journal_mode = wal")
+            conn.execute("pragma synchronous = normal")
+        with self._lock:
+            if not self._all:
+                _migrate(conn)
+                with open(SCHEMA_PATH, encoding="utf-8") as f:
+                    conn.executescript(f.read())
+            self._all.append(conn)
+        self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self, conn: sqlite3.Connection):
+        """
+        BEGIN IMMEDIATE ... COMMIT (or ROLLBACK on error). Nested use joins the outer one.
+        """
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("begin immediate")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("rollback")
+            raise
+        conn.execute("commit")
+
+    def close(self) -> None:
+        with self._lock:
+            conns, self._all = self._all, []
+        for c in conns:
+            try:
+                c.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+    # -- supabase.Client surface -------------------------------------------
+
+    def table(self, name: str) -> QueryBuilder:
+        return QueryBuilder(self, name)
+
+    from_ = table
+
+    def rpc(self, name: str, params: Optional[Dict] = None) -> _RpcCall:
+        return _RpcCall(self, name, params)
+
+    # -- helpers -------------------------------------------------------------
+
+    def _on_execute(self, write: bool) -> None:
+        from src.config import record_request
+        record_request(write)
+
+    def _check_table(self, table: str) -> str:
+        if table not in self._columns:
+            raise SqliteBackendError(f'relation "public.{table}" does not exist', code="42P01")
+        return table
+
+    def _check_column(self, table: str, column: str) -> str:
+        column = column.strip()
+        if not _IDENT.match(column) or column not in self._columns[table]:
+            raise SqliteBackendError(f"column {table}.{column} does not exist", code="42703")
+        return column
+
+    def _primary_key(self, table: str) -> str:
+        return self._pk[table]
+
+    def _relation(self, table: str, other: str) -> Tuple[str, str, bool]:
+        """
+        Return (local column, remote column, many) for embedding `other` into `table`.
+        """
+        for child, child_col, parent, parent_col in FOREIGN_KEYS:
+            if child == table and parent == other:
+                return child_col, parent_col, False
+            if parent == table and child == other:
+                return parent_col, child_col, True
+        raise SqliteBackendError(f"Could not find a relationship between '{table}' and '{other}'", code="PGRST200")
+
+    def _shape(self, conn, table: str, rows: List[Dict], spec) -> List[Dict]:
+        """
+        Project `rows` to the selected columns and attach embedded relations,
+        fetching each relation for all rows with one IN query.
+        """
+        columns, embeds = spec
+        for name, sub in embeds:
+            local, remote, many = self._relation(table, self._check_table(name))
+            keys = list({r[local] for r in rows if r[local] is not None})
+            related: Dict[Any, Any] = {}
+            if keys:
+                found = conn.execute(
+                    f'select * from "{name}" where "{remote}" in ({",".join("?" * len(keys))}) order by 1', keys
+                ).fetchall()
+                shaped = self._shape(conn, name, found, sub)
+                for raw, out in zip(found, shaped):
+                    if many:
+                        related.setdefault(raw[remote], []).append(out)
+                    else:
+                        related[raw[remote]] = out
+            for r in rows:
+                r[name] = related.get(r[local], [] if many else None)
+        if columns != ["*"]:
+            keep = [self._check_column(table, c) for c in columns] + [name for name, _ in embeds]
+            rows = [{k: r[k] for k in keep} for r in rows]
+        return rows
+
+
+# -- RPC implementations (mirror sql/*_functions.sql) ---------------------------
+
+@rpc("reserve_stock")
+def _reserve_stock(client, conn, items):
+    with client.transaction(conn):
+        ids = [i["prod_id"] for i in items]
+        marks = ",".join("?" * len(ids))
+        stock = {r["prod_id"]: r["stock"] for r in conn.execute(
+            f"select prod_id, stock from product where prod_id in ({marks})", ids).fetchall()}
+        for i in items:
+            if stock.get(i["prod_id"], -1) < i["qty"]:
+                raise SqliteBackendError(f"insufficient_stock:{i['prod_id']}", code="P0001")
+        return [conn.execute("update product set stock = stock - ? where prod_id = ? returning *",
+                             (i["qty"], i["prod_id"])).fetchone() for i in items]
+
+
+@rpc("increment_stock")
+def _increment_stock(client, conn, items):
+    with client.transaction(conn):
+        rows = [conn.execute("update product set stock = stock + ? where prod_id = ? returning *",
+                             (i["qty"], i["prod_id"])).fetchone() for i in items]
+    return [r for r in rows if r]
+
+
+@rpc("refund_order")
+def _refund_order(client, conn, p_order_id):
+    with client.transaction(conn):
+        order = conn.execute("select status from orders where order_id = ?", (p_order_id,)).fetchone()
+        status = order["status"] if order else None
+        if status != "CANCELLED":
+            return {"status": status, "payment": None}
+        conn.execute("update payments set status = 'REFUNDED' where order_id = ?", (p_order_id,))
+        latest = conn.execute("select * from payments where order_id = ? order by payment_id desc limit 1",
+                              (p_order_id,)).fetchone()
+    return {"status": status, "payment": latest}
+
+
+@rpc("cancel_orders")
+def _cancel_orders(client, conn, order_ids):
+    with client.transaction(conn):
+        marks = ",".join("?" * len(order_ids))
+        claimed = sorted(r["order_id"] for r in conn.execute(
+            f"update orders set status = 'CANCELLED' where order_id in ({marks}) and status = 'PLACED'"
+            " returning order_id", order_ids).fetchall())
+        products = []
+        if claimed:
+            cmarks = ",".join("?" * len(claimed))
+            products = conn.execute(
+                "update product set stock = stock + r.qty from (select prod_id, sum(quantity) as qty"
+                f" from order_items where order_id in ({cmarks}) group by prod_id) as r"
+                " where product.prod_id = r.prod_id returning *", claimed).fetchall()
+            conn.execute(f"update payments set status = 'REFUNDED' where order_id in ({cmarks})", claimed)
+        statuses = {r["order_id"]: r["status"] for r in conn.execute(
+            f"select order_id, status from orders where order_id in ({marks})", order_ids).fetchall()}
+    done = set(claimed)
+    return {"cancelled": claimed,
+            "skipped": [{"order_id": i, "status": statuses.get(i)} for i in order_ids if i not in done],
+            "products": sorted(products, key=lambda r: r["prod_id"])}
+
+
+@rpc("pay_orders")
+def _pay_orders(client, conn, order_ids, p_method):
+    with client.transaction(conn):
+        marks = ",".join("?" * len(order_ids))
+        claimed = sorted(r["order_id"] for r in conn.execute(
+            f"update orders set status = 'COMPLETED' where order_id in ({marks}) and status = 'PLACED'"
+            " returning order_id", order_ids).fetchall())
+        if claimed:
+            conn.execute(f"update payments set status = 'PAID', method = ?, paid_at = ?"
+                         f" where order_id in ({','.join('?' * len(claimed))})",
+                         [p_method, datetime.now(timezone.utc).isoformat(), *claimed])
+        statuses = {r["order_id"]: r["status"] for r in conn.execute(
+            f"select order_id, status from orders where order_id in ({marks})", order_ids).fetchall()}
+    done = set(claimed)
+    return {"paid": claimed,
+            "skipped": [{"order_id": i, "status": statuses.get(i)} for i in order_ids if i not in done]}
+
+
+@rpc("report_top_selling_products")
+def _report_top_selling_products(client, conn, p_limit=5):
+    return conn.execute(
+        "select prod_id, sum(quantity) as total_qty from order_items"
+        " group by prod_id order by total_qty desc, prod_id limit ?", (p_limit,)).fetchall()
+
+
+@rpc("report_revenue_between")
+def _report_revenue_between(client, conn, p_start, p_end):
+    row = conn.execute("select coalesce(sum(total_amount), 0) as revenue from orders"
+                       " where order_date >= ? and order_date < ?", (p_start, p_end)).fetchone()
+    return row["revenue"]
+
+
+@rpc("report_orders_per_customer")
+def _report_orders_per_customer(client, conn, p_min_orders=0):
+    return conn.execute("select cust_id, count(*) as order_count from orders group by cust_id"
+                        " having count(*) > ? order by cust_id", (p_min_orders,)).fetchall()
+
+
+@rpc("place_orders")
+def _place_orders(client, conn, orders):
+    out = []
+    with client.transaction(conn):
+        for o in orders:
+            ref = o["order_ref"]
+            existing = conn.execute("select order_id from orders where order_ref = ?", (ref,)).fetchone()
+            if existing:
+                out.append({"ref": ref, "placed_order_id": existing["order_id"], "outcome": "DUPLICATE", "error": None})
+                continue
+            ids = [l["prod_id"] for l in o["lines"]]
+            stock = {r["prod_id"]: r["stock"] for r in conn.execute(
+                f"select prod_id, stock from product where prod_id in ({','.join('?' * len(ids))})", ids).fetchall()}
+            short = next((l["prod_id"] for l in o["lines"] if stock.get(l["prod_id"], -1) < l["qty"]), None)
+            if short is not None:
+                out.append({"ref": ref, "placed_order_id": None, "outcome": "REJECTED", "error": f"insufficient_stock:{short}"})
+                continue
+            conn.executemany("update product set stock = stock - ? where prod_id = ?",
+                             [(l["qty"], l["prod_id"]) for l in o["lines"]])
+            order_id = conn.execute("insert into orders (cust_id, total_amount, order_ref) values (?, ?, ?) returning order_id",
+                                    (o["cust_id"], o["total_amount"], ref)).fetchone()["order_id"]
+            conn.executemany("insert into order_items (order_id, prod_id, quantity, price) values (?, ?, ?, ?)",
+                             [(order_id, i["prod_id"], i["qty"], i["price"]) for i in o["items"]])
+            conn.execute("insert into payments (order_id, amount, status) values (?, ?, 'PENDING')",
+                         (order_id, o["total_amount"]))
+            out.append({"ref": ref, "placed_order_id": order_id, "outcome": "PLACED", "error": None})
+    return out
+
+
+@rpc("rollup_rebuild")
+def _rollup_rebuild(client, conn):
+    with client.transaction(conn):
+        for table in ("rollup_daily", "rollup_product_daily", "rollup_product_totals", "rollup_customer_totals"):
+            conn.execute(f"delete from {table}")
+        conn.execute(
+            "insert into rollup_daily (day, orders, revenue, cancelled_orders, cancelled_revenue)"
+            " select substr(order_date, 1, 10), count(*), sum(total_amount),"
+            " sum(status = 'CANCELLED'), coalesce(sum(case when status = 'CANCELLED' then total_amount end), 0)"
+            " from orders group by 1")
+        conn.execute(
+            "insert into rollup_product_daily (day, prod_id, quantity, revenue, cancelled_quantity)"
+            " select substr(o.order_date, 1, 10), i.prod_id, sum(i.quantity), sum(i.quantity * coalesce(i.price, 0)),"
+            " coalesce(sum(case when o.status = 'CANCELLED' then i.quantity end), 0)"
+            " from order_items i join orders o on o.order_id = i.order_id group by 1, 2")
+        conn.execute(
+            "insert into rollup_product_totals (prod_id, quantity, revenue, cancelled_quantity)"
+            " select prod_id, sum(quantity), sum(revenue), sum(cancelled_quantity) from rollup_product_daily group by prod_id")
+        conn.execute(
+            "insert into rollup_customer_totals (cust_id, orders, cancelled_orders, paid_orders, paid_amount)"
+            " select o.cust_id, count(*), sum(o.status = 'CANCELLED'), count(p.order_id), coalesce(sum(p.amount), 0)"
+            " from orders o left join (select order_id, sum(amount) as amount from payments"
+            " where status = 'PAID' group by order_id) p on p.order_id = o.order_id group by o.cust_id")
+    return None
@@ -0,0 +1,147 @@
+-- src/backends/sqlite_schema.sql
+-- SQLite version of sql/schema.sql (plus the indexes from sql/*_functions.sql).
+-- Applied automatically when the sqlite backend opens a database.
+
+create table if not exists customers (
+  cust_id    integer primary key autoincrement,
+  name       text not null,
+  email      text not null unique,
+  phone      integer,
+  city       text,
+  created_at text not null default (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+
+create table if not exists product (
+  prod_id  integer primary key autoincrement,
+  name     text not null,
+  sku      text not null unique,
+  price    real not null check (price > 0),
+  stock    integer not null default 0,
+  category text
+);
+
+create table if not exists orders (
+  order_id     integer primary key autoincrement,
+  cust_id      integer not null references customers (cust_id),
+  order_date   text not null default (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+  total_amount real not null,
+  status       text not null default 'PLACED',
+  order_ref    text
+);
+
+create table if not exists order_items (
+  item_id  integer primary key autoincrement,
+  order_id integer not null references orders (order_id),
+  prod_id  integer not null references product (prod_id),
+  quantity integer not null check (quantity > 0),
+  price    real
+);
+
+create table if not exists payments (
+  payment_id integer primary key autoincrement,
+  order_id   integer not null references orders (order_id),
+  amount     real not null,
+  status     text not null default 'PENDING',
+  method     text,
+  paid_at    text
+);
+
+create table if not exists idempotency_keys (
+  key          text primary key,
+  operation    text not null,
+  request_hash text not null,
+  response     jsonb not null,
+  created_at   text not null default (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+
+create index if not exists order_items_order_id_idx on order_items (order_id);
+create index if not exists order_items_prod_id_idx on order_items (prod_id);
+create index if not exists payments_order_id_idx on payments (order_id);
+create index if not exists orders_order_date_idx on orders (order_date);
+create index if not exists orders_cust_id_idx on orders (cust_id);
+create unique index if not exists orders_order_ref_idx on orders (order_ref);
+create index if not exists product_stock_idx on product (stock, prod_id);
+
+-- Daily sales rollups (sql/rollup_functions.sql), kept current by the triggers below.
+create table if not exists rollup_daily (
+  day               text primary key,
+  orders            integer not null default 0,
+  revenue           real not null default 0,
+  cancelled_orders  integer not null default 0,
+  cancelled_revenue real not null default 0
+);
+
+create table if not exists rollup_product_daily (
+  day                text not null,
+  prod_id            integer not null,
+  quantity           integer not null default 0,
+  revenue            real not null default 0,
+  cancelled_quantity integer not null default 0,
+  primary key (day, prod_id)
+);
+
+create table if not exists rollup_product_totals (
+  prod_id            integer primary key,
+  quantity           integer not null default 0,
+  revenue            real not null default 0,
+  cancelled_quantity integer not null default 0
+);
+create index if not exists rollup_product_totals_quantity_idx on rollup_product_totals (quantity desc, prod_id);
+
+create table if not exists rollup_customer_totals (
+  cust_id          integer primary key,
+  orders           integer not null default 0,
+  cancelled_orders integer not null default 0,
+  paid_orders      integer not null default 0,
+  paid_amount      real not null default 0
+);
+create index if not exists rollup_customer_totals_orders_idx on rollup_customer_totals (orders, cust_id);
+
+create trigger if not exists rollup_orders_inserted after insert on orders
+begin
+  insert into rollup_daily (day, orders, revenue) values (substr(new.order_date, 1, 10), 1, new.total_amount)
+  on conflict (day) do update set orders = orders + 1, revenue = revenue + excluded.revenue;
+  insert into rollup_customer_totals (cust_id, orders) values (new.cust_id, 1)
+  on conflict (cust_id) do update set orders = orders + 1;
+end;
+
+create trigger if not exists rollup_items_inserted after insert on order_items
+begin
+  insert into rollup_product_daily (day, prod_id, quantity, revenue)
+  select substr(o.order_date, 1, 10), new.prod_id, new.quantity, new.quantity * coalesce(new.price, 0)
+    from orders o where o.order_id = new.order_id
+  on conflict (day, prod_id) do update
+     set quantity = quantity + excluded.quantity, revenue = revenue + excluded.revenue;
+  insert into rollup_product_totals (prod_id, quantity, revenue)
+  values (new.prod_id, new.quantity, new.quantity * coalesce(new.price, 0))
+  on conflict (prod_id) do update
+     set quantity = quantity + excluded.quantity, revenue = revenue + excluded.revenue;
+end;
+
+create trigger if not exists rollup_orders_cancelled after update of status on orders
+when new.status = 'CANCELLED' and old.status is not 'CANCELLED'
+begin
+  insert into rollup_daily (day, cancelled_orders, cancelled_revenue)
+  values (substr(new.order_date, 1, 10), 1, new.total_amount)
+  on conflict (day) do update
+     set cancelled_orders = cancelled_orders + 1, cancelled_revenue = cancelled_revenue + excluded.cancelled_revenue;
+  insert into rollup_customer_totals (cust_id, cancelled_orders) values (new.cust_id, 1)
+  on conflict (cust_id) do update set cancelled_orders = cancelled_orders + 1;
+  insert into rollup_product_daily (day, prod_id, cancelled_quantity)
+  select substr(new.order_date, 1, 10), i.prod_id, sum(i.quantity)
+    from order_items i where i.order_id = new.order_id group by i.prod_id
+  on conflict (day, prod_id) do update set cancelled_quantity = cancelled_quantity + excluded.cancelled_quantity;
+  insert into rollup_product_totals (prod_id, cancelled_quantity)
+  select i.prod_id, sum(i.quantity)
+    from order_items i where i.order_id = new.order_id group by i.prod_id
+  on conflict (prod_id) do update set cancelled_quantity = cancelled_quantity + excluded.cancelled_quantity;
+end;
+
+create trigger if not exists rollup_payments_paid after update of status on payments
+when new.status = 'PAID' and old.status is not 'PAID'
+begin
+  insert into rollup_customer_totals (cust_id, paid_orders, paid_amount)
+  select o.cust_id, 1, new.amount from orders o where o.order_id = new.order_id
+  on conflict (cust_id) do update
+     set paid_orders = paid_orders + 1, paid_amount = paid_amount + excluded.paid_amount;
+end;
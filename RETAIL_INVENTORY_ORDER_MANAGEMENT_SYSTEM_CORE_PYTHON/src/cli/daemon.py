@@ -0,0 +1,156 @@
+# src/cli/daemon.py
+"""
+Long-lived retail-cli server on a Unix socket.
+
+`retail-cli daemon start` imports the services once and keeps the storage client (its
+connection pool), the product cache and the low-stock index warm. When
+RETAIL_CLI_SOCKET points at a running daemon, the read-only commands in FORWARDED
+are sent there instead of paying the SDK import and connection setup in a fresh
+process. Any other command, or a missing/stale socket, runs locally as before.
+
+The daemon reads its own environment (.env) at start; only the command line is
+forwarded. Its product cache has the usual PRODUCT_CACHE_TTL staleness for writes
+made by other processes.
+
+Protocol: one JSON line per request, {"argv": [...]} or {"op": "stop"|"ping"},
+answered by one JSON line, {"stdout": "..."}. Requests are handled one at a time
+and the socket is created mode 0600.
+"""
+import contextlib
+import io
+import json
+import os
+import signal
+import socket
+import sys
+from typing import List, Optional
+
+DEFAULT_SOCKET = os.path.expanduser("~/.retail-cli.sock")
+CONNECT_TIMEOUT = 0.5
+REQUEST_TIMEOUT = 60.0
+
+# (cmd, action) pairs that may be answered by the daemon.
+FORWARDED = {
+    ("order", "show"),
+    ("order", "list"),
+    ("product", "list"),
+    ("customer", "list"),
+    ("customer", "search"),
+}
+
+
+class DaemonError(Exception):
+    pass
+
+
+def _request(path: str, payload: dict, timeout: float = REQUEST_TIMEOUT) -> dict:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(CONNECT_TIMEOUT)
+        s.connect(path)
+        s.settimeout(timeout)
+        s.sendall(json.dumps(payload).encode() + b"\n")
+        with s.makefile("rb") as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError("daemon closed the connection")
+    return json.loads(line)
+
+
+def forward(path: str, argv: List[str]) -> Optional[str]:
+    """
+    Run argv on the daemon at `path` and return its output, or None when no daemon
+    answers (the caller then runs the command itself).
+    """
+    try:
+        return _request(path, {"argv": argv})["stdout"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def ping(path: str) -> bool:
+    try:
+        return _request(path, {"op": "ping"}, timeout=CONNECT_TIMEOUT).get("ok", False)
+    except (OSError, ValueError):
+        return False
+
+
+def stop(path: str) -> bool:
+    try:
+        _request(path, {"op": "stop"})
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def _warm_up() -> None:
+    from src.config import get_supabase
+    from src.dao import customer_dao, order_dao, product_dao  # noqa: F401
+    from src.services import product_service  # noqa: F401
+    get_supabase()
+
+
+def serve(path: str = DEFAULT_SOCKET) -> None:
+    """
+    Serve forwarded commands on `path` until `retail-cli daemon stop` or SIGTERM.
+    """
+    import socketserver
+    from src.cli.main import build_parser
+
+    if os.path.exists(path):
+        if ping(path):
+            raise DaemonError(f"a daemon is already listening on {path}")
+        os.remove(path)  # stale socket from a daemon that did not shut down cleanly
+    _warm_up()
+    parser = build_parser()
+    state = {"running": True}
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            try:
+                request = json.loads(self.rfile.readline())
+            except ValueError:
+                return
+            op = request.get("op")
+            if op == "stop":
+                state["running"] = False
+                reply = {"ok": True}
+            elif op == "ping":
+                reply = {"ok": True, "pid": os.getpid()}
+            else:
+                reply = {"stdout": _run(parser, request.get("argv") or [])}
+            self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+    old_umask = os.umask(0o177)
+    try:
+        server = socketserver.UnixStreamServer(path, Handler)
+    finally:
+        os.umask(old_umask)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"retail-cli daemon listening on {path} (pid {os.getpid()})", flush=True)
+    try:
+        while state["running"]:
+            server.handle_request()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+        from src.config import close_supabase
+        close_supabase()
+
+
+def _run(parser, argv: List[str]) -> str:
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        try:
+            args = parser.parse_args(argv)
+            if (args.cmd, getattr(args, "action", None)) not in FORWARDED:
+                print(f"Error: {' '.join(argv[:2])} is not served by the daemon")
+            else:
+                args.func(args)
+        except SystemExit:
+            pass
+        except Exception as e:
+            print("Error:", e)
+    return out.getvalue()
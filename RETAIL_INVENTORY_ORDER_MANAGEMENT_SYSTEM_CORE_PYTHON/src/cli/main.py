@@ -1,364 +1,562 @@
-def cmd_order_refund(args):
-    try:
-        from src.config import get_supabase
-        sb = get_supabase()
-        order = sb.table("orders").select("*").eq("order_id", args.order).limit(1).execute()
-        order_data = order.data[0] if order.data else None
-        if not order_data:
-            print(f"Order {args.order} not found.")
-            return
-        if order_data.get("status") != "CANCELLED":
-            print(f"Only CANCELLED orders can be refunded. Current status: {order_data.get('status')}")
-            return
-        sb.table("payments").update({"status": "REFUNDED"}).eq("order_id", args.order).execute()
-        payment = sb.table("payments").select("*").eq("order_id", args.order).order("payment_id", desc=True).limit(1).execute()
-        print(f"Order {args.order} payment marked as REFUNDED:")
-        print(json.dumps(payment.data[0] if payment.data else None, indent=2, default=str))
-    except Exception as e:
-        print("Error:", e)
-def cmd_order_pay(args):
-    try:
-        from src.services.order_service import process_payment
-        result = process_payment(args.order, args.method)
-        print(f"Order {args.order} payment processed:")
-        print(json.dumps(result, indent=2, default=str))
-    except Exception as e:
-        print("Error:", e)
-def cmd_order_cancel(args):
-    try:
-        from src.services.order_service import cancel_order, OrderError
-        result = cancel_order(args.order)
-        print(f"Order {args.order} cancelled (updated):")
-        print(json.dumps(result, indent=2, default=str))
-    except OrderError as oe:
-        print("Order error:", oe)
-    except Exception as e:
-        print("Error:", e)
-import argparse
-import json
-from src.services import product_service
-from src.dao import product_dao
-
-def cmd_product_add(args):
-    try:
-        p = product_service.add_product(args.name, args.sku, args.price, args.stock, args.category)
-        print("Created product:")
-        print(json.dumps(p, indent=2, default=str))
-    except Exception as e:
-        print("Error:", e)
-
-def cmd_product_list(args):
-    try:
-        ps = product_dao.list_products(limit=100)
-        print(json.dumps(ps, indent=2, default=str))
-    except Exception as e:
-        print("Error:", e)
-
-def cmd_customer_add(args):
-    try:
-        from src.services import customer_service
-        c = customer_service.add_customer(args.name, args.email, args.phone, args.city)
-        print("Created customer:")
-        print(json.dumps(c, indent=2, default=str))
-    except Exception as e:
-        print("Error:", e)
-
-def cmd_customer_search(args):
-    try:
-        from src.services import customer_service
-        customers = customer_service.customer_service.search_customers(email=args.email, city=args.city)
-        print(json.dumps(customers, indent=2, default=str))
-    except Exception as e:
-        print("Error:", e)
-
-def cmd_customer_list(args):
-    try:
-        from src.services import customer_service
-        customers = customer_service.customer_service.list_customers()
-        print(json.dumps(customers, indent=2, default=str))
-    except Exception as e:
-        print("Error:", e)
-
-def cmd_customer_update(args):
-    try:
-        from src.services import customer_service
-        c = customer_service.customer_service.update_customer(
-            args.cust_id,
-            new_phone=args.phone,
-            new_city=args.city
-        )
-        print(f"Updated customer {args.cust_id}:")
-        print(json.dumps(c, indent=2, default=str))
-    except Exception as e:
-        print("Error:", e)
-
-def cmd_customer_delete(args):
-    try:
-        from src.services import customer_service
-        customer_service.customer_service.delete_customer(args.cust_id)
-        print(f"Deleted customer with ID {args.cust_id}")
-    except Exception as e:
-        print("Error:", e)
-
-def cmd_order_create(args):
-    items = []
-    for item in args.item:
-        try:
-            pid, qty = item.split(":")
-            items.append({"prod_id": int(pid), "qty": int(qty)})
-        except Exception:
-            print("Invalid item format:", item)
-            return
-    try:
-        from src.services.order_service import create_order, OrderError
-        order = create_order(args.customer, items)
-        print("Order created:")
-        print(json.dumps(order, indent=2, default=str))
-    except OrderError as oe:
-        print("Order error:", oe)
-    except Exception as e:
-        print("Error:", e)
-
-def cmd_order_show(args):
-    try:
-        from src.dao.order_dao import get_order_details
-        details = get_order_details(args.order)
-        print("Order details:")
-        print(json.dumps(details, indent=2, default=str))
-    except Exception as e:
-        print("Error:", e)
-
-
-def cmd_order_list(args):
-    try:
-        from src.dao.order_dao import list_orders_by_customer_orders
-        orders = list_orders_by_customer_orders(args.customer)
-        print(f"Orders for customer {args.customer}:")
-        print(json.dumps(orders, indent=2, default=str))
-    except Exception as e:
-        print("Error:", e)
-
-def build_parser():
-    parser = argparse.ArgumentParser(prog="retail-cli")
-    sub = parser.add_subparsers(dest="cmd")
-
-    p_prod = sub.add_parser("product", help="product commands")
-    pprod_sub = p_prod.add_subparsers(dest="action")
-
-    addp = pprod_sub.add_parser("add")
-    addp.add_argument("--name", required=True)
-    addp.add_argument("--sku", required=True)
-    addp.add_argument("--price", type=float, required=True)
-    addp.add_argument("--stock", type=int, default=0)
-    addp.add_argument("--category", default=None)
-    addp.set_defaults(func=cmd_product_add)
-
-    listp = pprod_sub.add_parser("list")
-    listp.set_defaults(func=cmd_product_list)
-
-    pcust = sub.add_parser("customer")
-    pcust_sub = pcust.add_subparsers(dest="action")
-    addc = pcust_sub.add_parser("add")
-    addc.add_argument("--name", required=True)
-    addc.add_argument("--email", required=True)
-    addc.add_argument("--phone", required=True)
-    addc.add_argument("--city", default=None)
-    addc.set_defaults(func=cmd_customer_add)
-
-    searchc = pcust_sub.add_parser("search")
-    searchc.add_argument("--email", default=None)
-    searchc.add_argument("--city", default=None)
-    searchc.set_defaults(func=cmd_customer_search)
-
-    listc = pcust_sub.add_parser("list")
-    listc.set_defaults(func=cmd_customer_list)
-
-    updc = pcust_sub.add_parser("update")
-    updc.add_argument("--cust_id", type=int, required=True)
-    updc.add_argument("--phone", type=int, default=None)
-    updc.add_argument("--city", default=None)
-    updc.set_defaults(func=cmd_customer_update)
-
-    delc = pcust_sub.add_parser("delete")
-    delc.add_argument("--cust_id", type=int, required=True)
-    delc.set_defaults(func=cmd_customer_delete)
-
-    porder = sub.add_parser("order")
-    porder_sub = porder.add_subparsers(dest="action")
-
-    createo = porder_sub.add_parser("create")
-    createo.add_argument("--customer", type=int, required=True)
-    createo.add_argument("--item", required=True, nargs="+", help="prod_id:qty (repeatable)")
-    createo.set_defaults(func=cmd_order_create)
-
-    showo = porder_sub.add_parser("show")
-    showo.add_argument("--order", type=int, required=True)
-    showo.set_defaults(func=cmd_order_show)
-
-    cano = porder_sub.add_parser("cancel")
-    cano.add_argument("--order", type=int, required=True)
-    cano.set_defaults(func=cmd_order_cancel)
-
-    listo = porder_sub.add_parser("list")
-    listo.add_argument("--customer", type=int, required=True)
-    listo.set_defaults(func=cmd_order_list)
-
-    payo = porder_sub.add_parser("pay")
-    payo.add_argument("--order", type=int, required=True)
-    payo.add_argument("--method", choices=["Cash", "Card", "UPI"], required=True)
-    payo.set_defaults(func=cmd_order_pay)
-
-    refundo = porder_sub.add_parser("refund")
-    refundo.add_argument("--order", type=int, required=True)
-    refundo.set_defaults(func=cmd_order_refund)
-
-    return parser
-
-def main():
-    parser = build_parser()
-    args = parser.parse_args()
-    if not hasattr(args, "func"):
-        parser.print_help()
-        return
-    args.func(args)
-
-if __name__ == "__main__":
-    main()
-# import argparse
-# import json
-# from src.services import product_service
-# from src.dao import product_dao
-
-# def cmd_product_add(args):
-#     try:
-#         p = product_service.add_product(args.name, args.sku, args.price, args.stock, args.category)
-#         print("Created product:")
-#         print(json.dumps(p, indent=2, default=str))
-#     except Exception as e:
-#         print("Error:", e)
-# def build_parser():
-#     parser = argparse.ArgumentParser(prog="retail-cli")
-#     sub = parser.add_subparsers(dest="cmd")
-
-#     p_prod = sub.add_parser("product", help="product commands")
-#     pprod_sub = p_prod.add_subparsers(dest="action")
-
-#     addp = pprod_sub.add_parser("add")
-#     addp.add_argument("--name", required=True)
-#     addp.add_argument("--sku", required=True)
-#     addp.add_argument("--price", type=float, required=True)
-#     addp.add_argument("--stock", type=int, default=0)
-#     addp.add_argument("--category", default=None)
-#     addp.set_defaults(func=cmd_product_add)
-
-#     listp = pprod_sub.add_parser("list")
-#     listp.set_defaults(func=cmd_product_list)
-
-#     pcust = sub.add_parser("customer")
-#     pcust_sub = pcust.add_subparsers(dest="action")
-#     addc = pcust_sub.add_parser("add")
-#     addc.add_argument("--name", required=True)
-#     addc.add_argument("--email", required=True)
-#     addc.add_argument("--phone", required=True)
-#     addc.add_argument("--city", default=None)
-#     addc.set_defaults(func=cmd_customer_add)
-
-#     porder = sub.add_parser("order")
-#     porder_sub = porder.add_subparsers(dest="action")
-#     createo = porder_sub.add_parser("create")
-#     createo.add_argument("--customer", type=int, required=True)
-#     createo.add_argument("--item", required=True, nargs="+", help="prod_id:qty (repeatable)")
-#     createo.set_defaults(func=cmd_order_create)
-
-#     return parser
-
-# def main():
-#     parser = build_parser()
-#     args = parser.parse_args()
-#     if not hasattr(args, "func"):
-#         parser.print_help()
-#         return
-#     args.func(args)
-
-# if __name__ == "__main__":
-#     main()
-
-
-#         """
-#         showo = porder_sub.add_parser("show")
-#         showo.add_argument("--order", type=int, required=True)
-#         showo.set_defaults(func=self.cmd_order_show)
-
-#         cano = porder_sub.add_parser("cancel")
-#         cano.add_argument("--order", type=int, required=True)
-#         cano.set_defaults(func=self.cmd_order_cancel)
-#         """
-
-#         return parser
-
-#     def cmd_product_add(self, args):
-#         try:
-#             p = product_service.add_product(args.name, args.sku, args.price, args.stock, args.category)
-#             print("Created product:")
-#             print(json.dumps(p, indent=2, default=str))
-#         except Exception as e:
-#             print("Error:", e)
-
-#     def cmd_product_list(self, args):
-#         try:
-#             ps = product_dao.list_products(limit=100)
-#             print(json.dumps(ps, indent=2, default=str))
-#         except Exception as e:
-#             print("Error:", e)
-
-#     def cmd_customer_add(self, args):
-#         try:
-#             from src.services import customer_service
-#             c = customer_service.add_Customer(args.name, args.email, args.phone, args.city)
-#             print("Created customer:")
-#             print(json.dumps(c, indent=2, default=str))
-#         except Exception as e:
-#             print("Error:", e)
-
-#     def cmd_order_create(self, args):
-#         items = []
-#         for item in args.item:
-#             try:
-#                 pid, qty = item.split(":")
-#                 items.append({"prod_id": int(pid), "quantity": int(qty)})
-#             except Exception:
-#                 print("Invalid item format:", item)
-#                 return
-#         # try:
-#         #     ord = order_service.create_order(args.customer, items)
-#         #     print("Order created:")
-#         #     print(json.dumps(ord, indent=2, default=str))
-#         # except Exception as e:
-#         #     print("Error:", e)
-
-#     # def cmd_order_show(self, args):
-#     #     try:
-#     #         o = order_service.get_order_details(args.order)
-#     #         print(json.dumps(o, indent=2, default=str))
-#     #     except Exception as e:
-#     #         print("Error:", e)
-
-#     # def cmd_order_cancel(self, args):
-#     #     try:
-#     #         o = order_service.cancel_order(args.order)
-#     #         print("Order cancelled (updated):")
-#     #         print(json.dumps(o, indent=2, default=str))
-#     #     except Exception as e:
-#     #         print("Error:", e)
-
-#     def run(self):
-#         args = self.parser.parse_args()
-#         if not hasattr(args, "func"):
-#             self.parser.print_help()
-#             return
-#         args.func(args)
-
-
-# if __name__ == "__main__":
-#     cli = RetailCLI()
-#     cli.run()
+def cmd_order_refund(args):
+    try:
+        from src.dao.order_dao import refund_order
+        # One request: the RPC checks the order is CANCELLED and refunds in the same transaction.
+        result = refund_order(args.order)
+        if result["status"] is None:
+            print(f"Order {args.order} not found.")
+            return
+        if result["status"] != "CANCELLED":
+            print(f"Only CANCELLED orders can be refunded. Current status: {result['status']}")
+            return
+        print(f"Order {args.order} payment marked as REFUNDED:")
+        print(json.dumps(result["payment"], indent=2, default=str))
+    except Exception as e:
+        print("Error:", e)
+def cmd_order_pay(args):
+    try:
+        from src.services.order_service import process_payment
+        result = process_payment(args.order, args.method, idempotency_key=args.idempotency_key)
+        print(f"Order {args.order} payment processed:")
+        print(json.dumps(result, indent=2, default=str))
+    except Exception as e:
+        print("Error:", e)
+def cmd_order_cancel(args):
+    try:
+        from src.services.order_service import cancel_order, OrderError
+        result = cancel_order(args.order)
+        print(f"Order {args.order} cancelled (updated):")
+        print(json.dumps(result, indent=2, default=str))
+    except OrderError as oe:
+        print("Order error:", oe)
+    except Exception as e:
+        print("Error:", e)
+import argparse
+import json
+import os
+import sys
+
+# Service and DAO modules (and through them the supabase SDK) are imported inside the
+# command functions, so --help, argument errors and daemon-forwarded commands never
+# load them.
+
+def cmd_product_add(args):
+    try:
+        from src.services import product_service
+        p = product_service.add_product(args.name, args.sku, args.price, args.stock, args.category)
+        print("Created product:")
+        print(json.dumps(p, indent=2, default=str))
+    except Exception as e:
+        print("Error:", e)
+
+def cmd_product_list(args):
+    try:
+        from src.dao import product_dao
+        ps = product_dao.list_products(limit=100)
+        print(json.dumps(ps, indent=2, default=str))
+    except Exception as e:
+        print("Error:", e)
+
+def _print_import_progress(stats):
+    rate = stats["read"] / stats["seconds"] if stats["seconds"] else 0
+    print(f"  {stats['read']} read, {stats['written']} written, {stats['rejected']} rejected ({rate:.0f} rows/s)")
+
+def _cmd_import(import_fn, args):
+    try:
+        stats = import_fn(
+            args.file,
+            chunk_size=args.chunk_size,
+            update_existing=args.update_existing,
+            resume=args.resume,
+            checkpoint=args.checkpoint,
+            rejects_path=args.rejects,
+            progress=_print_import_progress,
+        )
+        print("Import finished:")
+        print(json.dumps(stats, indent=2, default=str))
+    except Exception as e:
+        print("Error:", e)
+
+def cmd_product_import(args):
+    from src.services.import_service import import_products
+    _cmd_import(import_products, args)
+
+def cmd_customer_import(args):
+    from src.services.import_service import import_customers
+    _cmd_import(import_customers, args)
+
+def cmd_customer_add(args):
+    try:
+        from src.services import customer_service
+        c = customer_service.add_customer(args.name, args.email, args.phone, args.city)
+        print("Created customer:")
+        print(json.dumps(c, indent=2, default=str))
+    except Exception as e:
+        print("Error:", e)
+
+def cmd_customer_search(args):
+    try:
+        from src.services import customer_service
+        customers = customer_service.customer_service.search_customers(email=args.email, city=args.city)
+        print(json.dumps(customers, indent=2, default=str))
+    except Exception as e:
+        print("Error:", e)
+
+def cmd_customer_list(args):
+    try:
+        from src.services import customer_service
+        customers = customer_service.customer_service.list_customers()
+        print(json.dumps(customers, indent=2, default=str))
+    except Exception as e:
+        print("Error:", e)
+
+def cmd_customer_update(args):
+    try:
+        from src.services import customer_service
+        c = customer_service.customer_service.update_customer(
+            args.cust_id,
+            new_phone=args.phone,
+            new_city=args.city
+        )
+        print(f"Updated customer {args.cust_id}:")
+        print(json.dumps(c, indent=2, default=str))
+    except Exception as e:
+        print("Error:", e)
+
+def cmd_customer_delete(args):
+    try:
+        from src.services import customer_service
+        customer_service.customer_service.delete_customer(args.cust_id)
+        print(f"Deleted customer with ID {args.cust_id}")
+    except Exception as e:
+        print("Error:", e)
+
+def cmd_order_create(args):
+    items = []
+    for item in args.item:
+        try:
+            pid, qty = item.split(":")
+            items.append({"prod_id": int(pid), "qty": int(qty)})
+        except Exception:
+            print("Invalid item format:", item)
+            return
+    try:
+        from src.services.order_service import create_order, OrderError
+        order = create_order(args.customer, items, idempotency_key=args.idempotency_key)
+        print("Order created:")
+        print(json.dumps(order, indent=2, default=str))
+    except OrderError as oe:
+        print("Order error:", oe)
+    except Exception as e:
+        print("Error:", e)
+
+def cmd_order_show(args):
+    try:
+        from src.dao.order_dao import get_order_details
+        details = get_order_details(args.order)
+        print("Order details:")
+        print(json.dumps(details, indent=2, default=str))
+    except Exception as e:
+        print("Error:", e)
+
+
+def cmd_order_list(args):
+    try:
+        from src.dao.order_dao import list_orders_by_customer_orders
+        orders = list_orders_by_customer_orders(args.customer)
+        print(f"Orders for customer {args.customer}:")
+        print(json.dumps(orders, indent=2, default=str))
+    except Exception as e:
+        print("Error:", e)
+
+def _batch_order_ids(args):
+    ids = list(args.orders or [])
+    if args.file:
+        # One id per line (or separated by commas/whitespace); blank lines and # comments are ignored.
+        with open(args.file, encoding="utf-8") as f:
+            for line in f:
+                line = line.split("#", 1)[0]
+                ids.extend(int(tok) for tok in line.replace(",", " ").split())
+    return ids
+
+def _print_batch(verb, done, result):
+    n = len(done)
+    rate = n / result["seconds"] if result["seconds"] else 0
+    print(f"{verb} {n} order(s), skipped {len(result['skipped'])} in {result['seconds']:.3f}s ({rate:.0f} orders/s)")
+    if result["skipped"]:
+        print(json.dumps(result["skipped"], indent=2, default=str))
+    if result["failed"]:
+        print(f"Failed (left unchanged, safe to re-run) for {len(result['failed'])} order(s):")
+        print(json.dumps(result["failed"], indent=2, default=str))
+
+def cmd_order_cancel_batch(args):
+    try:
+        from src.services.order_service import cancel_orders
+        ids = _batch_order_ids(args)
+        if not ids:
+            print("No order ids given (use --orders and/or --file).")
+            return
+        result = cancel_orders(ids)
+        _print_batch("Cancelled", result["cancelled"], result)
+        print(f"Stock restored for {result['products_restocked']} product(s).")
+    except Exception as e:
+        print("Error:", e)
+
+def cmd_order_pay_batch(args):
+    try:
+        from src.services.order_service import pay_orders
+        ids = _batch_order_ids(args)
+        if not ids:
+            print("No order ids given (use --orders and/or --file).")
+            return
+        result = pay_orders(ids, args.method)
+        _print_batch("Paid", result["paid"], result)
+    except Exception as e:
+        print("Error:", e)
+
+def cmd_report_rebuild_rollups(args):
+    try:
+        from src.dao.rollup_dao import rebuild_rollups
+        rebuild_rollups()
+        print("Rollups rebuilt.")
+    except Exception as e:
+        print("Error:", e)
+
+def cmd_export_snapshot(args):
+    try:
+        from src.services.export_service import export_snapshot
+        stats = export_snapshot(
+            args.out,
+            tables=args.tables,
+            fmt=args.format,
+            compression=None if args.compression == "none" else args.compression,
+            full=args.full,
+            page_size=args.page_size,
+            progress=lambda table, s: print(f"  {table}: {s['new_rows']} new rows, {s['total_rows']} total ({s['seconds']}s)"),
+        )
+        print("Snapshot written:")
+        print(json.dumps(stats, indent=2, default=str))
+    except Exception as e:
+        print("Error:", e)
+
+def cmd_daemon_start(args):
+    from src.cli.daemon import serve, DaemonError
+    try:
+        serve(args.socket)
+    except DaemonError as de:
+        print("Daemon error:", de)
+
+def cmd_daemon_stop(args):
+    from src.cli.daemon import stop
+    print("Daemon stopped." if stop(args.socket) else f"No daemon listening on {args.socket}.")
+
+def cmd_daemon_status(args):
+    from src.cli.daemon import ping
+    print(f"Daemon running on {args.socket}." if ping(args.socket) else f"No daemon listening on {args.socket}.")
+
+def _add_import_args(p):
+    p.add_argument("--file", required=True)
+    p.add_argument("--chunk-size", type=int, default=500)
+    p.add_argument("--update-existing", action="store_true", help="overwrite rows whose key already exists")
+    p.add_argument("--resume", action="store_true", help="continue after the last committed chunk")
+    p.add_argument("--checkpoint", default=None, help="checkpoint file (default: <file>.checkpoint)")
+    p.add_argument("--rejects", default=None, help="append rejected rows to this .jsonl file")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="retail-cli")
+    parser.add_argument("--profile", action="store_true", help="print a per-query timing breakdown to stderr")
+    parser.add_argument("--metrics-file", help="write query metrics in Prometheus text format to this file")
+    sub = parser.add_subparsers(dest="cmd")
+
+    p_prod = sub.add_parser("product", help="product commands")
+    pprod_sub = p_prod.add_subparsers(dest="action")
+
+    addp = pprod_sub.add_parser("add")
+    addp.add_argument("--name", required=True)
+    addp.add_argument("--sku", required=True)
+    addp.add_argument("--price", type=float, required=True)
+    addp.add_argument("--stock", type=int, default=0)
+    addp.add_argument("--category", default=None)
+    addp.set_defaults(func=cmd_product_add)
+
+    listp = pprod_sub.add_parser("list")
+    listp.set_defaults(func=cmd_product_list)
+
+    importp = pprod_sub.add_parser("import", help="bulk load products from .csv/.jsonl")
+    _add_import_args(importp)
+    importp.set_defaults(func=cmd_product_import)
+
+    pcust = sub.add_parser("customer")
+    pcust_sub = pcust.add_subparsers(dest="action")
+    addc = pcust_sub.add_parser("add")
+    addc.add_argument("--name", required=True)
+    addc.add_argument("--email", required=True)
+    addc.add_argument("--phone", required=True)
+    addc.add_argument("--city", default=None)
+    addc.set_defaults(func=cmd_customer_add)
+
+    searchc = pcust_sub.add_parser("search")
+    searchc.add_argument("--email", default=None)
+    searchc.add_argument("--city", default=None)
+    searchc.set_defaults(func=cmd_customer_search)
+
+    listc = pcust_sub.add_parser("list")
+    listc.set_defaults(func=cmd_customer_list)
+
+    updc = pcust_sub.add_parser("update")
+    updc.add_argument("--cust_id", type=int, required=True)
+    updc.add_argument("--phone", type=int, default=None)
+    updc.add_argument("--city", default=None)
+    updc.set_defaults(func=cmd_customer_update)
+
+    delc = pcust_sub.add_parser("delete")
+    delc.add_argument("--cust_id", type=int, required=True)
+    delc.set_defaults(func=cmd_customer_delete)
+
+    importc = pcust_sub.add_parser("import", help="bulk load customers from .csv/.jsonl")
+    _add_import_args(importc)
+    importc.set_defaults(func=cmd_customer_import)
+
+    porder = sub.add_parser("order")
+    porder_sub = porder.add_subparsers(dest="action")
+
+    createo = porder_sub.add_parser("create")
+    createo.add_argument("--customer", type=int, required=True)
+    createo.add_argument("--item", required=True, nargs="+", help="prod_id:qty (repeatable)")
+    createo.add_argument("--idempotency-key", help="Safe to retry: a repeat with the same key returns the original order")
+    createo.set_defaults(func=cmd_order_create)
+
+    showo = porder_sub.add_parser("show")
+    showo.add_argument("--order", type=int, required=True)
+    showo.set_defaults(func=cmd_order_show)
+
+    cano = porder_sub.add_parser("cancel")
+    cano.add_argument("--order", type=int, required=True)
+    cano.set_defaults(func=cmd_order_cancel)
+
+    listo = porder_sub.add_parser("list")
+    listo.add_argument("--customer", type=int, required=True)
+    listo.set_defaults(func=cmd_order_list)
+
+    payo = porder_sub.add_parser("pay")
+    payo.add_argument("--order", type=int, required=True)
+    payo.add_argument("--method", choices=["Cash", "Card", "UPI"], required=True)
+    payo.add_argument("--idempotency-key", help="Safe to retry: a repeat with the same key returns the original result")
+    payo.set_defaults(func=cmd_order_pay)
+
+    refundo = porder_sub.add_parser("refund")
+    refundo.add_argument("--order", type=int, required=True)
+    refundo.set_defaults(func=cmd_order_refund)
+
+    cancelb = porder_sub.add_parser("cancel-batch", help="cancel many PLACED orders and restore their stock")
+    cancelb.add_argument("--orders", type=int, nargs="+", help="order ids")
+    cancelb.add_argument("--file", help="file of order ids, one per line")
+    cancelb.set_defaults(func=cmd_order_cancel_batch)
+
+    payb = porder_sub.add_parser("pay-batch", help="settle the payments of many PLACED orders")
+    payb.add_argument("--orders", type=int, nargs="+", help="order ids")
+    payb.add_argument("--file", help="file of order ids, one per line")
+    payb.add_argument("--method", choices=["Cash", "Card", "UPI"], required=True)
+    payb.set_defaults(func=cmd_order_pay_batch)
+
+    preport = sub.add_parser("report", help="reporting commands")
+    preport_sub = preport.add_subparsers(dest="action")
+    rebuildr = preport_sub.add_parser("rebuild-rollups", help="recompute the sales rollups from order history")
+    rebuildr.set_defaults(func=cmd_report_rebuild_rollups)
+
+    pexport = sub.add_parser("export", help="export commands")
+    pexport_sub = pexport.add_subparsers(dest="action")
+    snapx = pexport_sub.add_parser("snapshot", help="columnar snapshot of the order tables for offline reporting")
+    snapx.add_argument("--out", required=True, help="snapshot directory (re-run to export only new rows)")
+    snapx.add_argument("--tables", nargs="+", choices=["orders", "order_items", "product", "customers", "payments"])
+    snapx.add_argument("--format", choices=["parquet", "arrow"], default="parquet")
+    snapx.add_argument("--compression", choices=["zstd", "lz4", "none"], default="zstd",
+                       help="use none with --format arrow for zero-copy memory-mapped reads")
+    snapx.add_argument("--full", action="store_true", help="re-export everything instead of only rows above the last exported id")
+    snapx.add_argument("--page-size", type=int, default=5000)
+    snapx.set_defaults(func=cmd_export_snapshot)
+
+    pdaemon = sub.add_parser("daemon", help="keep a warm process serving read-only commands over a Unix socket")
+    pdaemon_sub = pdaemon.add_subparsers(dest="action")
+    for name, func in (("start", cmd_daemon_start), ("stop", cmd_daemon_stop), ("status", cmd_daemon_status)):
+        p = pdaemon_sub.add_parser(name)
+        p.add_argument("--socket", default=os.getenv("RETAIL_CLI_SOCKET") or os.path.expanduser("~/.retail-cli.sock"))
+        p.set_defaults(func=func)
+
+    return parser
+
+def _forward(args, argv):
+    # Read-only commands go to a running daemon when RETAIL_CLI_SOCKET is set.
+    socket_path = os.getenv("RETAIL_CLI_SOCKET")
+    if not socket_path or args.profile or args.metrics_file:
+        return False
+    from src.cli.daemon import FORWARDED, forward
+    if (args.cmd, getattr(args, "action", None)) not in FORWARDED:
+        return False
+    out = forward(socket_path, argv)
+    if out is None:
+        return False
+    sys.stdout.write(out)
+    return True
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not hasattr(args, "func"):
+        parser.print_help()
+        return
+    if _forward(args, argv):
+        return
+    if not (args.profile or args.metrics_file):
+        args.func(args)
+        return
+    from src import config, tracing
+    config.enable_tracing()
+    with tracing.operation(f"cli.{args.cmd}.{getattr(args, 'action', None) or ''}".rstrip(".")):
+        args.func(args)
+    if args.profile:
+        print(tracing.report(), file=sys.stderr)
+    if args.metrics_file:
+        tracing.write_prometheus(args.metrics_file)
+
+if __name__ == "__main__":
+    main()
+# import argparse
+# import json
+# from src.services import product_service
+# from src.dao import product_dao
+
+# def cmd_product_add(args):
+#     try:
+#         p = product_service.add_product(args.name, args.sku, args.price, args.stock, args.category)
+#         print("Created product:")
+#         print(json.dumps(p, indent=2, default=str))
+#     except Exception as e:
+#         print("Error:", e)
+# def build_parser():
+#     parser = argparse.ArgumentParser(prog="retail-cli")
+#     sub = parser.add_subparsers(dest="cmd")
+
+#     p_prod = sub.add_parser("product", help="product commands")
+#     pprod_sub = p_prod.add_subparsers(dest="action")
+
+#     addp = pprod_sub.add_parser("add")
+#     addp.add_argument("--name", required=True)
+#     addp.add_argument("--sku", required=True)
+#     addp.add_argument("--price", type=float, required=True)
+#     addp.add_argument("--stock", type=int, default=0)
+#     addp.add_argument("--category", default=None)
+#     addp.set_defaults(func=cmd_product_add)
+
+#     listp = pprod_sub.add_parser("list")
+#     listp.set_defaults(func=cmd_product_list)
+
+#     pcust = sub.add_parser("customer")
+#     pcust_sub = pcust.add_subparsers(dest="action")
+#     addc = pcust_sub.add_parser("add")
+#     addc.add_argument("--name", required=True)
+#     addc.add_argument("--email", required=True)
+#     addc.add_argument("--phone", required=True)
+#     addc.add_argument("--city", default=None)
+#     addc.set_defaults(func=cmd_customer_add)
+
+#     porder = sub.add_parser("order")
+#     porder_sub = porder.add_subparsers(dest="action")
+#     createo = porder_sub.add_parser("create")
+#     createo.add_argument("--customer", type=int, required=True)
+#     createo.add_argument("--item", required=True, nargs="+", help="prod_id:qty (repeatable)")
+#     createo.set_defaults(func=cmd_order_create)
+
+#     return parser
+
+# def main():
+#     parser = build_parser()
+#     args = parser.parse_args()
+#     if not hasattr(args, "func"):
+#         parser.print_help()
+#         return
+#     args.func(args)
+
+# if __name__ == "__main__":
+#     main()
+
+
+#         """
+#         showo = porder_sub.add_parser("show")
+#         showo.add_argument("--order", type=int, required=True)
+#         showo.set_defaults(func=self.cmd_order_show)
+
+#         cano = porder_sub.add_parser("cancel")
+#         cano.add_argument("--order", type=int, required=True)
+#         cano.set_defaults(func=self.cmd_order_cancel)
+#         """
+
+#         return parser
+
+#     def cmd_product_add(self, args):
+#         try:
+#             p = product_service.add_product(args.name, args.sku, args.price, args.stock, args.category)
+#             print("Created product:")
+#             print(json.dumps(p, indent=2, default=str))
+#         except Exception as e:
+#             print("Error:", e)
+
+#     def cmd_product_list(self, args):
+#         try:
+#             ps = product_dao.list_products(limit=100)
+#             print(json.dumps(ps, indent=2, default=str))
+#         except Exception as e:
+#             print("Error:", e)
+
+#     def cmd_customer_add(self, args):
+#         try:
+#             from src.services import customer_service
+#             c = customer_service.add_Customer(args.name, args.email, args.phone, args.city)
+#             print("Created customer:")
+#             print(json.dumps(c, indent=2, default=str))
+#         except Exception as e:
+#             print("Error:", e)
+
+#     def cmd_order_create(self, args):
+#         items = []
+#         for item in args.item:
+#             try:
+#                 pid, qty = item.split(":")
+#                 items.append({"prod_id": int(pid), "quantity": int(qty)})
+#             except Exception:
+#                 print("Invalid item format:", item)
+#                 return
+#         # try:
+#         #     ord = order_service.create_order(args.customer, items)
+#         #     print("Order created:")
+#         #     print(json.dumps(ord, indent=2, default=str))
+#         # except Exception as e:
+#         #     print("Error:", e)
+
+#     # def cmd_order_show(self, args):
+#     #     try:
+#     #         o = order_service.get_order_details(args.order)
+#     #         print(json.dumps(o, indent=2, default=str))
+#     #     except Exception as e:
+#     #         print("Error:", e)
+
+#     # def cmd_order_cancel(self, args):
+#     #     try:
+#     #         o = order_service.cancel_order(args.order)
+#     #         print("Order cancelled (updated):")
+#     #         print(json.dumps(o, indent=2, default=str))
+#     #     except Exception as e:
+#     #         print("Error:", e)
+
+#     def run(self):
+#         args = self.parser.parse_args()
+#         if not hasattr(args, "func"):
+#             self.parser.print_help()
+#             return
+#         args.func(args)
+
+
+# if __name__ == "__main__":
+#     cli = RetailCLI()
+#     cli.run()
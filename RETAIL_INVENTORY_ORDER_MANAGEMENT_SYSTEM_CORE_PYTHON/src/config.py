@@ -1,30 +1,208 @@
-# src/config.py
-
-import os
-
-from dotenv import load_dotenv
-
-from supabase import create_client, Client
-
- 
-
-load_dotenv()  # loads .env from project root
-
- 
-
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-def get_supabase() -> Client:
-
-    """
-
-    Return a supabase client. Raises RuntimeError if config missing.
-
-    """
-
-    if not SUPABASE_URL or not SUPABASE_KEY:
-
-        raise RuntimeError("SUPABASE_URL and SUPABASE_KEY must be set in environment (.env)")
-
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
\ No newline at end of file
+# src/config.py
+
+import os
+import threading
+
+from dotenv import load_dotenv
+
+
+
+load_dotenv()  # loads .env from project root
+
+
+
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+
+SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+
+# Storage backend: "supabase" (remote PostgREST) or "sqlite" (embedded file, see
+# src/backends/sqlite_backend.py). The sqlite backend does not need the supabase SDK.
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "retail.db")
+
+# HTTP connection pool shared by every DAO call in this process.
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+
+# In-process product catalog cache (src/dao/product_dao.py). TTL 0 disables it.
+PRODUCT_CACHE_SIZE = int(os.getenv("PRODUCT_CACHE_SIZE", "5000"))
+PRODUCT_CACHE_TTL = float(os.getenv("PRODUCT_CACHE_TTL", "30"))
+
+# Customer lookup cache by id, email and city (src/dao/customer_dao.py). TTL 0 disables it.
+CUSTOMER_CACHE_SIZE = int(os.getenv("CUSTOMER_CACHE_SIZE", "10000"))
+CUSTOMER_CACHE_TTL = float(os.getenv("CUSTOMER_CACHE_TTL", "30"))
+
+# Stock level at or below which a product counts as "low stock".
+LOW_STOCK_THRESHOLD = int(os.getenv("LOW_STOCK_THRESHOLD", "5"))
+
+# Max DAO calls in flight at once from the asyncio layer (src/dao/async_dao.py).
+ASYNC_MAX_CONCURRENCY = int(os.getenv("ASYNC_MAX_CONCURRENCY", "16"))
+
+# Threads for running independent reads side by side (src/services/fanout.py); 1 disables.
+FANOUT_MAX_WORKERS = int(os.getenv("FANOUT_MAX_WORKERS", "8"))
+
+# Write-behind order queue (src/services/order_queue.py).
+ORDER_QUEUE_PATH = os.getenv("ORDER_QUEUE_PATH", "order_queue.log")
+ORDER_QUEUE_GROUP_SIZE = int(os.getenv("ORDER_QUEUE_GROUP_SIZE", "100"))
+ORDER_QUEUE_FLUSH_INTERVAL = float(os.getenv("ORDER_QUEUE_FLUSH_INTERVAL", "0.02"))
+
+# Retries of transient failures (src/retry.py): attempts in total, then exponential
+# backoff with full jitter starting at RETRY_BASE_DELAY seconds, capped at RETRY_MAX_DELAY.
+RETRY_ATTEMPTS = int(os.getenv("RETRY_ATTEMPTS", "5"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.05"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "2.0"))
+
+# Wrap the client in src.tracing.TracingClient (also turned on by retail-cli --profile).
+TRACE_QUERIES = os.getenv("TRACE_QUERIES", "").lower() in ("1", "true", "yes")
+
+_lock = threading.Lock()
+_tracing = TRACE_QUERIES
+_client = None
+_http = None
+_stats = {"clients_created": 0, "connections_opened": 0, "requests": 0, "writes": 0}
+
+
+def _count_connection(event_name: str, info: dict) -> None:
+    # httpcore trace callback: fires once per new TCP connection.
+    if event_name == "connection.connect_tcp.complete":
+        with _lock:
+            _stats["connections_opened"] += 1
+
+
+def record_request(write: bool) -> None:
+    """
+    Count one round trip to the storage backend.
+    """
+    with _lock:
+        _stats["requests"] += 1
+        if write:
+            _stats["writes"] += 1
+
+
+def _on_request(request) -> None:
+    request.extensions["trace"] = _count_connection
+    record_request(request.method not in ("GET", "HEAD"))
+
+
+def _build_http():
+    import httpx
+    return httpx.Client(
+        timeout=HTTP_TIMEOUT,
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        event_hooks={"request": [_on_request]},
+    )
+
+
+def _build_client():
+    global _http
+    if STORAGE_BACKEND == "sqlite":
+        from src.backends.sqlite_backend import SqliteClient
+        return SqliteClient(SQLITE_PATH)
+    if STORAGE_BACKEND != "supabase":
+        raise RuntimeError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND!r} (use 'supabase' or 'sqlite')")
+    if not SUPABASE_URL or not SUPABASE_KEY:
+
+        raise RuntimeError("SUPABASE_URL and SUPABASE_KEY must be set in environment (.env)")
+
+    from supabase import create_client
+    from supabase.lib.client_options import SyncClientOptions
+    _http = _build_http()
+    return create_client(SUPABASE_URL, SUPABASE_KEY, options=SyncClientOptions(httpx_client=_http))
+
+
+def get_supabase():
+
+    """
+
+    Return the process-wide storage client for STORAGE_BACKEND (a supabase Client, or
+    the query-compatible SqliteClient), creating it on first use.
+    Raises RuntimeError if config missing.
+
+    """
+
+    global _client
+    if _client is not None:
+        return _client
+
+    with _lock:
+        if _client is None:
+            _client = _traced(_build_client())
+            _stats["clients_created"] += 1
+        return _client
+
+
+def _traced(client):
+    if not _tracing:
+        return client
+    from src.tracing import TracingClient
+    return client if isinstance(client, TracingClient) else TracingClient(client)
+
+
+def enable_tracing() -> None:
+    """
+    Trace every query from now on (see src/tracing.py), including on the current client.
+    """
+    global _tracing, _client
+    with _lock:
+        _tracing = True
+        if _client is not None:
+            _client = _traced(_client)
+
+
+def set_supabase(client) -> None:
+    """
+    Install an already-built client (e.g. a SqliteClient stand-in for benchmarks) as the
+    shared client. The previous one is closed.
+    """
+    global _client
+    close_supabase()
+    with _lock:
+        _client = _traced(client)
+        _stats["clients_created"] += 1
+
+
+def close_supabase() -> None:
+    """
+    Close the shared client (its connection pool or database handles). The next
+    get_supabase() call builds a new one.
+    """
+    global _client, _http
+    with _lock:
+        client, http, _client, _http = _client, _http, None, None
+    if http is not None:
+        http.close()
+    if hasattr(client, "close"):
+        client.close()
+
+
+def reset_supabase() -> None:
+    """
+    Drop the shared client without closing its sockets (for forked children, which must
+    not touch connections inherited from the parent) and zero the counters.
+    """
+    global _client, _http, _lock
+    _lock = threading.Lock()
+    _client = None
+    _http = None
+    for k in _stats:
+        _stats[k] = 0
+
+
+def client_stats() -> dict:
+    """
+    Return how many clients, TCP connections and HTTP requests (and of those, writes:
+    POST/PATCH/DELETE, including RPC calls) this process has made.
+    """
+    with _lock:
+        return dict(_stats)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_supabase)
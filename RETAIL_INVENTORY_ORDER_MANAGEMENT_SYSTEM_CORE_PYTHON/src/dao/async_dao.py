@@ -0,0 +1,69 @@
+# src/dao/async_dao.py
+"""
+Awaitable versions of the DAO calls used on the checkout path.
+
+Each call runs the synchronous DAO on a bounded worker pool that shares the
+process-wide client (and its HTTP connection pool), so it works for every
+STORAGE_BACKEND. At most ASYNC_MAX_CONCURRENCY calls are in flight per event loop;
+callers can await several of these with asyncio.gather to overlap round trips.
+"""
+import asyncio
+import contextvars
+import functools
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from src.config import ASYNC_MAX_CONCURRENCY
+import src.dao.customer_dao as customer_dao
+import src.dao.order_dao as order_dao
+import src.dao.product_dao as product_dao
+
+_executor = ThreadPoolExecutor(max_workers=ASYNC_MAX_CONCURRENCY, thread_name_prefix="async-dao")
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+def _semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    sem = _semaphores.get(loop)
+    if sem is None:
+        sem = _semaphores[loop] = asyncio.Semaphore(ASYNC_MAX_CONCURRENCY)
+    return sem
+
+async def run(fn, *args, **kwargs):
+    """
+    Run a blocking DAO function without blocking the event loop.
+    """
+    async with _semaphore():
+        loop = asyncio.get_running_loop()
+        # Carry context variables (e.g. the tracing operation) into the worker thread.
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(_executor, functools.partial(ctx.run, fn, *args, **kwargs))
+
+async def get_customer_by_id(cust_id: int) -> Optional[Dict]:
+    return await run(customer_dao.get_customer_by_id, cust_id)
+
+async def get_products_by_ids(prod_ids: List[int], columns: str = "*") -> List[Dict]:
+    return await run(product_dao.get_products_by_ids, prod_ids, columns)
+
+async def reserve_stock(items: List[Dict]) -> List[Dict]:
+    return await run(product_dao.reserve_stock, items)
+
+async def increment_stock(items: List[Dict]) -> List[Dict]:
+    return await run(product_dao.increment_stock, items)
+
+async def insert_order(customer_id: int, total_amount: float) -> Dict:
+    return await run(order_dao.insert_order, customer_id, total_amount)
+
+async def insert_order_items(order_id: int, items: List[Dict]) -> List[Dict]:
+    return await run(order_dao.insert_order_items, order_id, items)
+
+async def insert_payment(order_id: int, amount: float, status: str = "PENDING") -> Dict:
+    return await run(order_dao.insert_payment, order_id, amount, status)
+
+async def get_order_details(order_id: int) -> Dict:
+    return await run(order_dao.get_order_details, order_id)
+
+async def set_order_status(order_id: int, status: str, expected: Optional[str] = None) -> Optional[Dict]:
+    return await run(order_dao.set_order_status, order_id, status, expected)
+
+async def update_payment(order_id: int, fields: Dict) -> Optional[Dict]:
+    return await run(order_dao.update_payment, order_id, fields)
@@ -1,66 +1,166 @@
-# src/dao/customer_dao.py
-from typing import Optional, List, Dict
-from src.config import get_supabase
-
-def _sb():
-    return get_supabase()
-
-def create_customer(name: str, email: str, phone: int, city: Optional[str] = None) -> Optional[Dict]:
-    """
-    Insert a customer and return the inserted row (two-step: insert then select by unique email).
-    """
-    payload = {"name": name, "email": email, "phone": phone}
-    if city is not None:
-        payload["city"] = city
-
-    # Insert (no select chaining)
-    _sb().table("customers").insert(payload).execute()
-
-    # Fetch inserted row by unique column (email)
-    resp = _sb().table("customers").select("*").eq("email", email).limit(1).execute()
-    return resp.data[0] if resp.data else None
-
-def get_customer_by_id(cust_id: int) -> Optional[Dict]:
-    """
-    Fetch a customer by their unique ID.
-    """
-    resp = _sb().table("customers").select("*").eq("cust_id", cust_id).limit(1).execute()
-    return resp.data[0] if resp.data else None
-
-def get_customer_by_email(email: str) -> Optional[Dict]:
-    """
-    Fetch a customer by email.
-    """
-    resp = _sb().table("customers").select("*").eq("email", email).limit(1).execute()
-    return resp.data[0] if resp.data else None
-
-def update_customer(cust_id: int, fields: Dict) -> Optional[Dict]:
-    """
-    Update a customer's details and return the updated row (two-step).
-    """
-    _sb().table("customers").update(fields).eq("cust_id", cust_id).execute()
-    resp = _sb().table("customers").select("*").eq("cust_id", cust_id).limit(1).execute()
-    return resp.data[0] if resp.data else None
-
-def delete_customer(cust_id: int) -> Optional[Dict]:
-    """
-    Delete a customer and return the deleted row.
-    """
-    resp_before = _sb().table("customers").select("*").eq("cust_id", cust_id).limit(1).execute()
-    row = resp_before.data[0] if resp_before.data else None
-    _sb().table("customers").delete().eq("cust_id", cust_id).execute()
-    return row
-
-def list_customers(limit: int = 100) -> List[Dict]:
-    """
-    List customers with a limit.
-    """
-    resp = _sb().table("customers").select("*").order("cust_id", desc=False).limit(limit).execute()
-    return resp.data or []
-
-def get_customers_by_city(city: str) -> List[Dict]:
-    """
-    Fetch all customers from a specific city.
-    """
-    resp = _sb().table("customers").select("*").eq("city", city).execute()
-    return resp.data or []
+# src/dao/customer_dao.py
+from typing import Optional, List, Dict, Iterator
+from src.config import get_supabase, CUSTOMER_CACHE_SIZE, CUSTOMER_CACHE_TTL
+from src.cache import TTLCache
+from src.models import Customer, select_fields
+from src.dao.pagination import iter_keyset, DEFAULT_PAGE_SIZE
+
+def _sb():
+    return get_supabase()
+
+# Read-through customer cache. Customer records are stored under ("id", cust_id) and ("email", email),
+# city lookups as ("city", city) -> tuple of cust_ids. An email known not to exist is
+# cached as _ABSENT, but only for callers that ask for it (signup dedup, where the
+# unique index on email catches anything the marker misses); other lookups treat it
+# as a miss. Every write below invalidates the affected entries.
+_customers = TTLCache(maxsize=CUSTOMER_CACHE_SIZE, ttl=CUSTOMER_CACHE_TTL)
+_ABSENT = object()
+
+def _remember(row: Dict) -> Dict:
+    record = Customer.from_row(row)
+    _customers.set(("id", record.cust_id), record)
+    _customers.set(("email", record.email), record)
+    return dict(row)
+
+def _forget(rows: List[Dict]) -> None:
+    for row in rows:
+        cached = _customers.pop(("id", row["cust_id"]))
+        for r in (row, cached):
+            if r:
+                if r.get("email") is not None:
+                    _customers.pop(("email", r["email"]))
+                if r.get("city") is not None:
+                    _customers.pop(("city", r["city"]))
+
+def _cached_row(record: Customer, columns: str) -> Dict:
+    return record.to_dict(select_fields(columns))
+
+def cache_stats() -> Dict:
+    """
+    Hit/miss/eviction counters of the customer cache.
+    """
+    return _customers.stats()
+
+def clear_cache() -> None:
+    _customers.clear()
+
+def create_customer(name: str, email: str, phone: int, city: Optional[str] = None) -> Optional[Dict]:
+    """
+    Insert a customer and return the inserted row (single request, INSERT ... RETURNING).
+    """
+    payload = {"name": name, "email": email, "phone": phone}
+    if city is not None:
+        payload["city"] = city
+
+    try:
+        resp = _sb().table("customers").insert(payload, returning="representation").execute()
+    except Exception:
+        # e.g. the email was taken by another process after we cached it as absent
+        _customers.pop(("email", email))
+        raise
+    if not resp.data:
+        return None
+    _forget(resp.data)  # the cached absent email and the city's id list
+    return _remember(resp.data[0])
+
+def get_customer_by_id(cust_id: int, columns: str = "*") -> Optional[Dict]:
+    """
+    Fetch a customer by their unique ID, projected to `columns`. Only full rows are
+    cached, but a cached row also answers projected lookups.
+    """
+    cached = _customers.get(("id", cust_id))
+    if cached is not None:
+        return _cached_row(cached, columns)
+    resp = _sb().table("customers").select(columns).eq("cust_id", cust_id).limit(1).execute()
+    if not resp.data:
+        return None
+    return _remember(resp.data[0]) if columns == "*" else resp.data[0]
+
+def get_customer_by_email(email: str, columns: str = "*", cache_absent: bool = False) -> Optional[Dict]:
+    """
+    Fetch a customer by email, projected to `columns`, or None. With cache_absent an
+    unknown email is remembered as absent (and answered from that) for the cache TTL;
+    only a check backed by the unique index on email should rely on that.
+    """
+    cached = _customers.get(("email", email))
+    if cached is _ABSENT and cache_absent:
+        return None
+    if cached is not None and cached is not _ABSENT:
+        return _cached_row(cached, columns)
+    resp = _sb().table("customers").select(columns).eq("email", email).limit(1).execute()
+    if not resp.data:
+        if cache_absent:
+            _customers.set(("email", email), _ABSENT)
+        return None
+    return _remember(resp.data[0]) if columns == "*" else resp.data[0]
+
+def get_existing_emails(emails: List[str]) -> set:
+    """
+    Return which of `emails` already exist, in one round trip.
+    """
+    if not emails:
+        return set()
+    resp = _sb().table("customers").select("email").in_("email", list(emails)).execute()
+    return {r["email"] for r in resp.data or []}
+
+def upsert_customers(rows: List[Dict], update_existing: bool = False) -> int:
+    """
+    Insert many customers in one request, keyed on email. Returns the number of rows sent.
+    """
+    if not rows:
+        return 0
+    _sb().table("customers").upsert(
+        rows, on_conflict="email", ignore_duplicates=not update_existing, returning="minimal"
+    ).execute()
+    # No cust_ids come back with returning=minimal, and new rows can fill cached
+    # absent emails and city lists; drop the whole cache.
+    _customers.clear()
+    return len(rows)
+
+def update_customer(cust_id: int, fields: Dict) -> Optional[Dict]:
+    """
+    Update a customer's details and return the updated row (single request).
+    """
+    resp = _sb().table("customers").update(fields, returning="representation").eq("cust_id", cust_id).execute()
+    _forget(resp.data or [{"cust_id": cust_id}])
+    return resp.data[0] if resp.data else None
+
+def delete_customer(cust_id: int) -> Optional[Dict]:
+    """
+    Delete a customer and return the deleted row (single request).
+    """
+    resp = _sb().table("customers").delete(returning="representation").eq("cust_id", cust_id).execute()
+    _forget(resp.data or [{"cust_id": cust_id}])
+    return resp.data[0] if resp.data else None
+
+def list_customers(limit: int = 100, columns: str = "*") -> List[Dict]:
+    """
+    List customers with a limit, projected to `columns`.
+    """
+    resp = _sb().table("customers").select(columns).order("cust_id", desc=False).limit(limit).execute()
+    return resp.data or []
+
+def get_customers_by_city(city: str, columns: str = "*") -> List[Dict]:
+    """
+    Fetch all customers from a specific city, projected to `columns`.
+    """
+    ids = _customers.get(("city", city))
+    if ids is not None:
+        rows = [_customers.get(("id", cust_id)) for cust_id in ids]
+        # A customer whose record was evicted before they moved away still sits in
+        # this city's list; their re-cached record shows it, so go to the DB then.
+        if all(row is not None and row.city == city for row in rows):
+            return [_cached_row(row, columns) for row in rows]
+    resp = _sb().table("customers").select(columns).eq("city", city).execute()
+    if columns != "*":
+        return resp.data or []
+    rows = [_remember(row) for row in resp.data or []]
+    _customers.set(("city", city), tuple(row["cust_id"] for row in rows))
+    return rows
+
+def iter_customers(page_size: int = DEFAULT_PAGE_SIZE, city: Optional[str] = None, prefetch: bool = False) -> Iterator[Dict]:
+    """
+    Stream every customer in cust_id order using keyset pagination.
+    """
+    by_city = (lambda q: q.eq("city", city)) if city else None
+    return iter_keyset("customers", "cust_id", page_size=page_size, apply_filters=by_city, prefetch=prefetch)
@@ -0,0 +1,17 @@
+# src/dao/idempotency_dao.py
+from src.config import get_supabase
+from typing import Dict, Optional
+
+def get_idempotent_result(key: str) -> Optional[Dict]:
+    """
+    Stored {"key", "operation", "request_hash", "response", ...} row for a key, or None.
+    """
+    sb = get_supabase()
+    resp = sb.table("idempotency_keys").select("*").eq("key", key).limit(1).execute()
+    return resp.data[0] if resp.data else None
+
+def save_idempotent_result(key: str, operation: str, request_hash: str, response: Dict) -> None:
+    # ignore_duplicates: the first stored result wins, so a repeat can never overwrite it.
+    sb = get_supabase()
+    payload = {"key": key, "operation": operation, "request_hash": request_hash, "response": response}
+    sb.table("idempotency_keys").upsert(payload, on_conflict="key", ignore_duplicates=True, returning="minimal").execute()
@@ -1,63 +1,188 @@
-def process_payment(order_id: int, method: str) -> dict:
-    from datetime import datetime
-    sb = get_supabase()
-    # Update payment record
-    paid_at = datetime.utcnow().isoformat()
-    sb.table("payments").update({"status": "PAID", "method": method, "paid_at": paid_at}).eq("order_id", order_id).execute()
-    # Update order status
-    sb.table("orders").update({"status": "COMPLETED"}).eq("order_id", order_id).execute()
-    # Return updated payment and order
-    payment = sb.table("payments").select("*").eq("order_id", order_id).order("payment_id", desc=True).limit(1).execute()
-    order = sb.table("orders").select("*").eq("order_id", order_id).limit(1).execute()
-    return {"order": order.data[0] if order.data else None, "payment": payment.data[0] if payment.data else None}
-def insert_payment(order_id: int, amount: float, status: str = "PENDING") -> dict:
-    sb = get_supabase()
-    payload = {"order_id": order_id, "amount": amount, "status": status}
-    sb.table("payments").insert(payload).execute()
-    resp = sb.table("payments").select("*").order("payment_id", desc=True).limit(1).execute()
-    return resp.data[0] if resp.data else None
-# Fetch full details of an order (order info + customer info + order items)
-def get_order_details(order_id: int) -> dict:
-    sb = get_supabase()
-    order = sb.table("orders").select("*").eq("order_id", order_id).limit(1).execute()
-    order_data = order.data[0] if order.data else None
-    if not order_data:
-        return {}
-    customer = sb.table("customers").select("*").eq("cust_id", order_data["cust_id"]).limit(1).execute()
-    customer_data = customer.data[0] if customer.data else None
-    items = sb.table("order_items").select("*").eq("order_id", order_id).execute()
-    return {
-        "order": order_data,
-        "customer": customer_data,
-        "items": items.data or []
-    }
-# src/dao/order_dao.py
-from src.config import get_supabase
-from typing import List, Dict
-
-def list_orders_by_customer(customer_id: int) -> List[Dict]:
-    sb = get_supabase()
-    resp = sb.table("customers").select("*").eq("customer_id", customer_id).execute()
-    return resp.data or []
-
-def insert_order(customer_id: int, total_amount: float) -> Dict:
-    sb = get_supabase()
-    payload = {"cust_id": customer_id, "total_amount": total_amount}
-    sb.table("orders").insert(payload).execute()
-    resp = sb.table("orders").select("*").order("order_id", desc=True).limit(1).execute()
-    return resp.data[0] if resp.data else None
-
-def insert_order_item(order_id: int, prod_id: int, qty: int) -> Dict:
-    sb = get_supabase()
-    from src.dao.product_dao import get_product_by_id
-    product = get_product_by_id(prod_id)
-    price = product["price"] if product else None
-    payload = {"order_id": order_id, "prod_id": prod_id, "quantity": qty, "price": price}
-    sb.table("order_items").insert(payload).execute()
-    resp = sb.table("order_items").select("*").order("item_id", desc=True).limit(1).execute()
-    return resp.data[0] if resp.data else None
-
-def list_orders_by_customer_orders(customer_id: int) -> List[Dict]:
-    sb = get_supabase()
-    resp = sb.table("orders").select("*").eq("cust_id", customer_id).order("order_id", desc=False).execute()
-    return resp.data or []
+def process_payment(order_id: int, method: str) -> dict:
+    from datetime import datetime
+    # Update payment record (UPDATE ... RETURNING gives us the new row)
+    paid_at = datetime.utcnow().isoformat()
+    payment = update_payment(order_id, {"status": "PAID", "method": method, "paid_at": paid_at})
+    # Update order status
+    order = set_order_status(order_id, "COMPLETED")
+    return {"order": order, "payment": payment}
+def set_order_status(order_id: int, status: str, expected: str | None = None) -> dict:
+    """
+    Set an order's status and return the updated row. With `expected`, only an order
+    currently in that status is changed (returns None otherwise).
+    """
+    sb = get_supabase()
+    q = sb.table("orders").update({"status": status}, returning="representation").eq("order_id", order_id)
+    if expected is not None:
+        q = q.eq("status", expected)
+    resp = q.execute()
+    return resp.data[0] if resp.data else None
+def update_payment(order_id: int, fields: dict) -> dict:
+    """
+    Update the payment(s) of an order and return the latest one.
+    """
+    sb = get_supabase()
+    resp = sb.table("payments").update(fields, returning="representation").eq("order_id", order_id).execute()
+    return max(resp.data, key=lambda p: p["payment_id"]) if resp.data else None
+def refund_order(order_id: int) -> dict:
+    """
+    Refund a CANCELLED order's payments in one request via the refund_order RPC
+    (sql/refund_functions.sql). Returns {"status": the order's status, None if it does
+    not exist; "payment": the latest payment, None when nothing was refunded}.
+    """
+    return get_supabase().rpc("refund_order", {"p_order_id": order_id}).execute().data
+def insert_payment(order_id: int, amount: float, status: str = "PENDING") -> dict:
+    sb = get_supabase()
+    payload = {"order_id": order_id, "amount": amount, "status": status}
+    resp = sb.table("payments").insert(payload, returning="representation").execute()
+    return resp.data[0] if resp.data else None
+def get_payment(order_id: int, columns: str = "*") -> dict:
+    """
+    Latest payment of an order projected to `columns`, or None.
+    """
+    sb = get_supabase()
+    resp = sb.table("payments").select(columns).eq("order_id", order_id).order("payment_id", desc=True).limit(1).execute()
+    return resp.data[0] if resp.data else None
+# Fetch full details of an order (order info + customer info + order items) in one
+# request, letting PostgREST embed the related rows through their foreign keys.
+ORDER_DETAILS_SELECT = "*, customers(*), order_items(*, product(*))"
+
+def _split_details(row: dict) -> dict:
+    customer = row.pop("customers", None)
+    items = row.pop("order_items", None) or []
+    return {"order": row, "customer": customer, "items": items}
+
+def get_order_details(order_id: int) -> dict:
+    sb = get_supabase()
+    resp = sb.table("orders").select(ORDER_DETAILS_SELECT).eq("order_id", order_id).limit(1).execute()
+    if not resp.data:
+        return {}
+    return _split_details(resp.data[0])
+
+def get_order_details_many(order_ids: list) -> dict:
+    """
+    Fetch details for several orders in one request, keyed by order_id.
+    Unknown ids are simply absent from the result.
+    """
+    if not order_ids:
+        return {}
+    sb = get_supabase()
+    resp = sb.table("orders").select(ORDER_DETAILS_SELECT).in_("order_id", list(order_ids)).execute()
+    return {row["order_id"]: _split_details(row) for row in resp.data or []}
+
+# src/dao/order_dao.py
+from src.config import get_supabase
+from src.dao.pagination import iter_keyset, DEFAULT_PAGE_SIZE
+from src.models import Order, OrderItem, Payment
+from typing import List, Dict, Iterator, Optional
+
+def list_orders_by_customer(customer_id: int, columns: str = "*", records: bool = False) -> List:
+    """
+    A customer's orders in order_id order, projected to `columns`, as dicts or
+    (records=True) Order records. Use list_orders_by_customer_orders for customers
+    with more orders than max-rows.
+    """
+    sb = get_supabase()
+    resp = sb.table("orders").select(columns).eq("cust_id", customer_id).order("order_id", desc=False).execute()
+    return Order.from_rows(resp.data or []) if records else resp.data or []
+
+def customer_has_orders(customer_id: int) -> bool:
+    """
+    Whether the customer has any order. Fetches at most one order_id (served by
+    orders_cust_id_idx); count="exact" would count every matching row instead.
+    """
+    resp = get_supabase().table("orders").select("order_id").eq("cust_id", customer_id).limit(1).execute()
+    return bool(resp.data)
+
+def insert_order(customer_id: int, total_amount: float) -> Dict:
+    sb = get_supabase()
+    payload = {"cust_id": customer_id, "total_amount": total_amount}
+    resp = sb.table("orders").insert(payload, returning="representation").execute()
+    return resp.data[0] if resp.data else None
+
+def insert_order_item(order_id: int, prod_id: int, qty: int, price: float | None = None) -> Dict:
+    sb = get_supabase()
+    if price is None:
+        from src.dao.product_dao import get_product_by_id
+        product = get_product_by_id(prod_id)
+        price = product["price"] if product else None
+    payload = {"order_id": order_id, "prod_id": prod_id, "quantity": qty, "price": price}
+    resp = sb.table("order_items").insert(payload, returning="representation").execute()
+    return resp.data[0] if resp.data else None
+
+def insert_order_items(order_id: int, items: List[Dict]) -> List[Dict]:
+    """
+    Insert all {"prod_id", "qty", "price"} lines of an order with one multi-row insert.
+    """
+    if not items:
+        return []
+    sb = get_supabase()
+    payload = [
+        {"order_id": order_id, "prod_id": it["prod_id"], "quantity": it["qty"], "price": it["price"]}
+        for it in items
+    ]
+    resp = sb.table("order_items").insert(payload, returning="representation").execute()
+    return resp.data or []
+
+def iter_orders(customer_id: Optional[int] = None, page_size: int = DEFAULT_PAGE_SIZE, prefetch: bool = False) -> Iterator[Dict]:
+    """
+    Stream orders (optionally for one customer) in order_id order using keyset pagination.
+    """
+    by_customer = (lambda q: q.eq("cust_id", customer_id)) if customer_id is not None else None
+    return iter_keyset("orders", "order_id", page_size=page_size, apply_filters=by_customer, prefetch=prefetch)
+
+def place_orders(orders: List[Dict]) -> List[Dict]:
+    """
+    Group-commit queued orders in one transaction via the place_orders RPC
+    (sql/order_queue_functions.sql). Returns one {"ref", "placed_order_id",
+    "outcome", "error"} row per order; outcome is PLACED, DUPLICATE or REJECTED.
+    """
+    if not orders:
+        return []
+    resp = get_supabase().rpc("place_orders", {"orders": orders}).execute()
+    return resp.data or []
+
+def pay_orders(order_ids: List[int], method: str) -> Dict:
+    """
+    Complete the PLACED orders among order_ids and mark their payments PAID with
+    `method`, in one transaction via the pay_orders RPC (sql/order_batch_functions.sql).
+    Returns {"paid": [ids], "skipped": [{"order_id", "status"}]}.
+    """
+    if not order_ids:
+        return {"paid": [], "skipped": []}
+    resp = get_supabase().rpc("pay_orders", {"order_ids": list(order_ids), "p_method": method}).execute()
+    return resp.data
+
+def cancel_orders(order_ids: List[int]) -> Dict:
+    """
+    Cancel the PLACED orders among order_ids, restock their lines and refund their
+    payments in one transaction via the cancel_orders RPC (sql/order_batch_functions.sql).
+    Returns {"cancelled": [ids], "skipped": [{"order_id", "status"}], "products": [rows]}.
+    """
+    if not order_ids:
+        return {"cancelled": [], "skipped": [], "products": []}
+    resp = get_supabase().rpc("cancel_orders", {"order_ids": list(order_ids)}).execute()
+    return resp.data
+
+def list_orders_by_customer_orders(customer_id: int, records: bool = False) -> List:
+    # Paged so customers with more orders than the server's max-rows are not truncated.
+    rows = iter_orders(customer_id)
+    return Order.from_rows(rows) if records else list(rows)
+
+def list_order_items(columns: str = "*", records: bool = False, page_size: int = DEFAULT_PAGE_SIZE) -> List:
+    """
+    Every order line in item_id order (paged), projected to `columns`, as dicts or
+    (records=True) OrderItem records.
+    """
+    rows = iter_keyset("order_items", "item_id", columns, page_size=page_size)
+    return OrderItem.from_rows(rows) if records else list(rows)
+
+def list_payments(status: Optional[str] = None, columns: str = "*", records: bool = False,
+                  page_size: int = DEFAULT_PAGE_SIZE) -> List:
+    """
+    Every payment (optionally only those in `status`) in payment_id order (paged),
+    projected to `columns`, as dicts or (records=True) Payment records.
+    """
+    by_status = (lambda q: q.eq("status", status)) if status else None
+    rows = iter_keyset("payments", "payment_id", columns, page_size=page_size, apply_filters=by_status)
+    return Payment.from_rows(rows) if records else list(rows)
@@ -0,0 +1,51 @@
+# src/dao/pagination.py
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, Optional
+from src.config import get_supabase
+
+DEFAULT_PAGE_SIZE = 500
+
+def iter_keyset(
+    table: str,
+    key: str,
+    columns: str = "*",
+    page_size: int = DEFAULT_PAGE_SIZE,
+    apply_filters: Optional[Callable] = None,
+    prefetch: bool = False,
+) -> Iterator[Dict]:
+    """
+    Yield every row of `table` in `key` order, one page at a time, using keyset
+    pagination (`key > last seen`) so each page costs the same no matter how deep
+    the scan goes. `apply_filters(query)` may add extra filters. With prefetch=True
+    the next page is requested in the background while the current one is consumed.
+    """
+    if page_size <= 0:
+        raise ValueError("page_size must be positive")
+    if columns != "*" and key not in [c.strip() for c in columns.split(",")]:
+        columns = f"{key}, {columns}"
+
+    def fetch(after):
+        q = get_supabase().table(table).select(columns).order(key, desc=False).limit(page_size)
+        if apply_filters:
+            q = apply_filters(q)
+        if after is not None:
+            q = q.gt(key, after)
+        return q.execute().data or []
+
+    if not prefetch:
+        after = None
+        while True:
+            rows = fetch(after)
+            yield from rows
+            if len(rows) < page_size:
+                return
+            after = rows[-1][key]
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        # Each fetch runs in a copy of the caller's context (keeps tracing attribution).
+        pending = pool.submit(contextvars.copy_context().run, fetch, None)
+        while pending is not None:
+            rows = pending.result()
+            pending = pool.submit(contextvars.copy_context().run, fetch, rows[-1][key]) if len(rows) == page_size else None
+            yield from rows
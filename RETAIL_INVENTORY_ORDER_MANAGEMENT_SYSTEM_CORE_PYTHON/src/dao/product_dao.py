@@ -1,51 +1,187 @@
-# src/dao/product_dao.py
-from typing import Optional, List, Dict
-from src.config import get_supabase
- 
-def _sb():
-    return get_supabase()
- 
-def create_product(name: str, sku: str, price: float, stock: int = 0, category: str | None = None) -> Optional[Dict]:
-    """
-    Insert a product and return the inserted row (two-step: insert then select by unique sku).
-    """
-    payload = {"name": name, "sku": sku, "price": price, "stock": stock}
-    if category is not None:
-        payload["category"] = category
- 
-    # Insert (no select chaining)
-    _sb().table("product").insert(payload).execute()
- 
-    # Fetch inserted row by unique column (sku)
-    resp = _sb().table("product").select("*").eq("sku", sku).limit(1).execute()
-    return resp.data[0] if resp.data else None
- 
-def get_product_by_id(prod_id: int) -> Optional[Dict]:
-    resp = _sb().table("product").select("*").eq("prod_id", prod_id).limit(1).execute()
-    return resp.data[0] if resp.data else None
- 
-def get_product_by_sku(sku: str) -> Optional[Dict]:
-    resp = _sb().table("product").select("*").eq("sku", sku).limit(1).execute()
-    return resp.data[0] if resp.data else None
- 
-def update_product(prod_id: int, fields: Dict) -> Optional[Dict]:
-    """
-    Update and then return the updated row (two-step).
-    """
-    _sb().table("product").update(fields).eq("prod_id", prod_id).execute()
-    resp = _sb().table("product").select("*").eq("prod_id", prod_id).limit(1).execute()
-    return resp.data[0] if resp.data else None
- 
-def delete_product(prod_id: int) -> Optional[Dict]:
-    # fetch row before delete (so we can return it)
-    resp_before = _sb().table("product").select("*").eq("prod_id", prod_id).limit(1).execute()
-    row = resp_before.data[0] if resp_before.data else None
-    _sb().table("product").delete().eq("prod_id", prod_id).execute()
-    return row
- 
-def list_products(limit: int = 100, category: str | None = None) -> List[Dict]:
-    q = _sb().table("product").select("*").order("prod_id", desc=False).limit(limit)
-    if category:
-        q = q.eq("category", category)
-    resp = q.execute()
-    return resp.data or []
\ No newline at end of file
+# src/dao/product_dao.py
+import re
+from typing import Optional, List, Dict, Iterator
+from src.config import get_supabase, PRODUCT_CACHE_SIZE, PRODUCT_CACHE_TTL
+from src.cache import TTLCache
+from src.models import Product, select_fields
+from src.dao.pagination import iter_keyset, DEFAULT_PAGE_SIZE
+ 
+def _sb():
+    return get_supabase()
+ 
+# Read-through catalog cache. Rows are stored as Product records under ("id", prod_id)
+# and ("sku", sku); every write below invalidates the affected products.
+_catalog = TTLCache(maxsize=PRODUCT_CACHE_SIZE, ttl=PRODUCT_CACHE_TTL)
+ 
+def _remember(row: Dict) -> Dict:
+    record = Product.from_row(row)
+    _catalog.set(("id", record.prod_id), record)
+    if record.sku is not None:
+        _catalog.set(("sku", record.sku), record)
+    return dict(row)
+ 
+def _forget(rows: List[Dict]) -> None:
+    for row in rows:
+        cached = _catalog.pop(("id", row["prod_id"]))
+        for r in (row, cached):
+            if r and r.get("sku") is not None:
+                _catalog.pop(("sku", r["sku"]))
+ 
+def invalidate(prod_ids: List[int]) -> None:
+    """
+    Drop cached rows for products changed outside this module (e.g. by a group commit).
+    """
+    _forget([{"prod_id": prod_id} for prod_id in prod_ids])
+ 
+def cache_enabled() -> bool:
+    return _catalog.enabled
+ 
+def cache_stats() -> Dict:
+    """
+    Hit/miss/eviction counters of the product catalog cache.
+    """
+    return _catalog.stats()
+ 
+def clear_cache() -> None:
+    _catalog.clear()
+ 
+def create_product(name: str, sku: str, price: float, stock: int = 0, category: str | None = None) -> Optional[Dict]:
+    """
+    Insert a product and return the inserted row (single request, INSERT ... RETURNING).
+    """
+    payload = {"name": name, "sku": sku, "price": price, "stock": stock}
+    if category is not None:
+        payload["category"] = category
+ 
+    resp = _sb().table("product").insert(payload, returning="representation").execute()
+    _forget(resp.data or [])
+    return resp.data[0] if resp.data else None
+ 
+def _fetched(rows: List[Dict], columns: str) -> List[Dict]:
+    # Only full rows go into the catalog; projected ones are returned as they are.
+    return [_remember(row) for row in rows] if columns == "*" else rows
+ 
+def get_product_by_id(prod_id: int, columns: str = "*") -> Optional[Dict]:
+    cached = _catalog.get(("id", prod_id))
+    if cached is not None:
+        return cached.to_dict(select_fields(columns))
+    resp = _sb().table("product").select(columns).eq("prod_id", prod_id).limit(1).execute()
+    return _fetched(resp.data, columns)[0] if resp.data else None
+ 
+def get_products_by_ids(prod_ids: List[int], columns: str = "*") -> List[Dict]:
+    """
+    Fetch several products, projected to `columns`, in at most one round trip (only
+    cache misses hit the network).
+    """
+    fields = select_fields(columns)
+    found, missing = [], []
+    for prod_id in prod_ids:
+        cached = _catalog.get(("id", prod_id))
+        if cached is not None:
+            found.append(cached.to_dict(fields))
+        else:
+            missing.append(prod_id)
+    if missing:
+        resp = _sb().table("product").select(columns).in_("prod_id", missing).execute()
+        found.extend(_fetched(resp.data or [], columns))
+    return found
+ 
+def get_product_by_sku(sku: str, columns: str = "*") -> Optional[Dict]:
+    cached = _catalog.get(("sku", sku))
+    if cached is not None:
+        return cached.to_dict(select_fields(columns))
+    resp = _sb().table("product").select(columns).eq("sku", sku).limit(1).execute()
+    return _fetched(resp.data, columns)[0] if resp.data else None
+ 
+def get_existing_skus(skus: List[str]) -> set:
+    """
+    Return which of `skus` already exist, in one round trip.
+    """
+    if not skus:
+        return set()
+    resp = _sb().table("product").select("sku").in_("sku", list(skus)).execute()
+    return {r["sku"] for r in resp.data or []}
+ 
+def upsert_products(rows: List[Dict], update_existing: bool = False) -> int:
+    """
+    Insert many products in one request, keyed on sku. Existing skus are overwritten when
+    update_existing is set, otherwise left untouched. Returns the number of rows sent.
+    """
+    if not rows:
+        return 0
+    _sb().table("product").upsert(
+        rows, on_conflict="sku", ignore_duplicates=not update_existing, returning="minimal"
+    ).execute()
+    if update_existing:
+        # We don't get prod_ids back with returning=minimal; drop the whole catalog.
+        _catalog.clear()
+    return len(rows)
+ 
+def update_product(prod_id: int, fields: Dict) -> Optional[Dict]:
+    """
+    Update and return the updated row (single request).
+    """
+    resp = _sb().table("product").update(fields, returning="representation").eq("prod_id", prod_id).execute()
+    _forget(resp.data or [{"prod_id": prod_id}])
+    return resp.data[0] if resp.data else None
+ 
+class InsufficientStock(Exception):
+    def __init__(self, prod_id: int):
+        super().__init__(f"Insufficient stock for product {prod_id}")
+        self.prod_id = prod_id
+ 
+def reserve_stock(items: List[Dict]) -> List[Dict]:
+    """
+    Atomically subtract {"prod_id", "qty"} quantities (one entry per product) via the
+    reserve_stock RPC (see sql/stock_functions.sql). Nothing changes unless every line
+    has enough stock; otherwise InsufficientStock is raised.
+    """
+    try:
+        resp = _sb().rpc("reserve_stock", {"items": items}).execute()
+    except Exception as e:
+        _forget(items)
+        m = re.search(r"insufficient_stock:(\d+)", str(e))
+        if m:
+            raise InsufficientStock(int(m.group(1))) from e
+        raise
+    # The RPC returns the authoritative post-update rows, so refresh instead of dropping:
+    # hot SKUs keep serving stock and price from memory between sales.
+    return [_remember(row) for row in resp.data or []]
+ 
+def increment_stock(items: List[Dict]) -> List[Dict]:
+    """
+    Atomically add {"prod_id", "qty"} quantities back to stock and return the updated rows.
+    """
+    resp = _sb().rpc("increment_stock", {"items": items}).execute()
+    return [_remember(row) for row in resp.data or []]
+ 
+def delete_product(prod_id: int) -> Optional[Dict]:
+    # DELETE ... RETURNING hands back the removed row
+    resp = _sb().table("product").delete(returning="representation").eq("prod_id", prod_id).execute()
+    _forget(resp.data or [{"prod_id": prod_id}])
+    return resp.data[0] if resp.data else None
+ 
+def list_products(limit: int = 100, category: str | None = None, records: bool = False, columns: str = "*") -> List:
+    """
+    First `limit` products in prod_id order, projected to `columns`, as dicts or
+    (records=True) Product records.
+    """
+    q = _sb().table("product").select(columns).order("prod_id", desc=False).limit(limit)
+    if category:
+        q = q.eq("category", category)
+    resp = q.execute()
+    return Product.from_rows(resp.data or []) if records else resp.data or []
+ 
+def iter_products(page_size: int = DEFAULT_PAGE_SIZE, category: str | None = None, prefetch: bool = False) -> Iterator[Dict]:
+    """
+    Stream every product in prod_id order using keyset pagination.
+    """
+    by_category = (lambda q: q.eq("category", category)) if category else None
+    return iter_keyset("product", "prod_id", page_size=page_size, apply_filters=by_category, prefetch=prefetch)
+ 
+def iter_low_stock(threshold: int, columns: str = "prod_id, sku, name, stock", page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Dict]:
+    """
+    Stream products with stock <= threshold, filtered server-side and projected to
+    `columns` (served by product_stock_idx, see sql/stock_functions.sql).
+    """
+    return iter_keyset("product", "prod_id", columns, page_size=page_size, apply_filters=lambda q: q.lte("stock", threshold))
@@ -0,0 +1,39 @@
+# src/dao/rollup_dao.py
+"""
+Reads of the daily sales rollups (sql/rollup_functions.sql). The rollups are kept
+current by database triggers, so nothing here writes to them except rebuild_rollups().
+"""
+from datetime import date
+from typing import Iterator, List, Tuple
+from src.config import get_supabase
+from src.dao.pagination import iter_keyset, DEFAULT_PAGE_SIZE
+
+def rebuild_rollups() -> None:
+    """
+    Recompute every rollup from orders / order_items / payments. Run once after
+    installing the rollups on an existing database, or to repair them.
+    """
+    get_supabase().rpc("rollup_rebuild", {}).execute()
+
+def top_products(limit: int = 5) -> List[Tuple[int, int]]:
+    sb = get_supabase()
+    resp = (sb.table("rollup_product_totals").select("prod_id, quantity")
+            .order("quantity", desc=True).order("prod_id").limit(limit).execute())
+    return [(r["prod_id"], r["quantity"]) for r in resp.data or []]
+
+def revenue_between(start: date, end: date) -> float:
+    """
+    Revenue of orders placed on days in [start, end): one row per day.
+    """
+    sb = get_supabase()
+    resp = (sb.table("rollup_daily").select("revenue")
+            .gte("day", start.isoformat()).lt("day", end.isoformat()).execute())
+    return sum(r["revenue"] for r in resp.data or [])
+
+def iter_customer_order_counts(min_orders: int = 0, page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Tuple[int, int]]:
+    """
+    (cust_id, orders) for customers with more than min_orders orders, in cust_id order.
+    """
+    rows = iter_keyset("rollup_customer_totals", "cust_id", "cust_id, orders", page_size=page_size,
+                       apply_filters=lambda q: q.gt("orders", min_orders))
+    return ((r["cust_id"], r["orders"]) for r in rows)
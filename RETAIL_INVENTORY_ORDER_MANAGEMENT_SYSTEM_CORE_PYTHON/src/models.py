@@ -0,0 +1,117 @@
+# src/models.py
+"""
+Compact read-only records for rows the process keeps around: the product and
+customer caches, the low-stock index, and large listings asked for with records=True.
+
+Each record is a frozen dataclass with __slots__, so its fields live in a fixed array
+rather than a per-row hash table: ~80 bytes per row instead of ~270 for the dict
+itself (the values are the same objects either way). from_row() ignores keys it does
+not know (embedded relations) and leaves columns that were not selected as None, so
+projected rows (select(Product.columns("prod_id", "stock"))) convert the same way.
+
+Records support r["stock"] and r.get("stock") like the row dicts they replace;
+to_dict() gives a plain row back for JSON output and dict-based callers (optionally
+only some fields, so a cached record can answer a projected query).
+"""
+from dataclasses import dataclass, fields
+from typing import Dict, Iterable, List, Optional, Sequence
+
+
+class Record:
+    __slots__ = ()
+    FIELDS: Sequence[str] = ()
+
+    @classmethod
+    def from_row(cls, row: Dict):
+        return cls(*map(row.get, cls.FIELDS))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict]) -> List:
+        names = cls.FIELDS
+        return [cls(*map(row.get, names)) for row in rows]
+
+    @classmethod
+    def columns(cls, *names: str) -> str:
+        """
+        select() string for the given fields (all of them by default).
+        """
+        unknown = [n for n in names if n not in cls.FIELDS]
+        if unknown:
+            raise ValueError(f"{cls.__name__} has no field(s): {', '.join(unknown)}")
+        return ", ".join(names or cls.FIELDS)
+
+    def to_dict(self, columns: Optional[Sequence[str]] = None) -> Dict:
+        return {name: getattr(self, name) for name in (columns or self.FIELDS)}
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+
+def select_fields(columns: str) -> Optional[List[str]]:
+    """
+    Field names of a plain select() string ("prod_id, stock"), or None for "*".
+    """
+    if columns.strip() == "*":
+        return None
+    return [c.strip() for c in columns.split(",")]
+
+
+def _record(cls):
+    cls = dataclass(frozen=True, slots=True)(cls)
+    cls.FIELDS = tuple(f.name for f in fields(cls))
+    return cls
+
+
+@_record
+class Product(Record):
+    prod_id: int
+    name: Optional[str] = None
+    sku: Optional[str] = None
+    price: Optional[float] = None
+    stock: Optional[int] = None
+    category: Optional[str] = None
+
+
+@_record
+class Customer(Record):
+    cust_id: int
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[int] = None
+    city: Optional[str] = None
+    created_at: Optional[str] = None
+
+
+@_record
+class Order(Record):
+    order_id: int
+    cust_id: Optional[int] = None
+    order_date: Optional[str] = None
+    total_amount: Optional[float] = None
+    status: Optional[str] = None
+    order_ref: Optional[str] = None
+
+
+@_record
+class OrderItem(Record):
+    item_id: Optional[int] = None
+    order_id: Optional[int] = None
+    prod_id: Optional[int] = None
+    quantity: Optional[int] = None
+    price: Optional[float] = None
+
+
+@_record
+class Payment(Record):
+    payment_id: int
+    order_id: Optional[int] = None
+    amount: Optional[float] = None
+    status: Optional[str] = None
+    method: Optional[str] = None
+    paid_at: Optional[str] = None
@@ -1,45 +1,97 @@
-from src.config import get_supabase
-from datetime import datetime, timedelta
-from collections import Counter, defaultdict
-
-# Top 5 selling products (by total quantity)
-def top_selling_products(limit=5):
-    sb = get_supabase()
-    items = sb.table("order_items").select("prod_id, quantity").execute().data
-    counter = Counter()
-    for item in items:
-        counter[item["prod_id"]] += item["quantity"]
-    return counter.most_common(limit)
-
-# Total revenue in the last month
-def total_revenue_last_month():
-    sb = get_supabase()
-    today = datetime.utcnow()
-    first_day = (today.replace(day=1) - timedelta(days=1)).replace(day=1)
-    last_day = today.replace(day=1) - timedelta(days=1)
-    orders = sb.table("orders").select("order_date, total_amount").execute().data
-    revenue = sum(o["total_amount"] for o in orders if first_day.isoformat() <= o["order_date"] <= last_day.isoformat())
-    return revenue
-
-# Total orders placed by each customer
-def total_orders_per_customer():
-    sb = get_supabase()
-    orders = sb.table("orders").select("cust_id").execute().data
-    counter = Counter(o["cust_id"] for o in orders)
-    return dict(counter)
-
-# Customers who placed more than 2 orders
-def customers_with_more_than_n_orders(n=2):
-    counts = total_orders_per_customer()
-    return [cust_id for cust_id, total in counts.items() if total > n]
-
-if __name__ == "__main__":
-    import json
-    print("Top 5 selling products:")
-    print(json.dumps(top_selling_products(), indent=2))
-    print("\nTotal revenue last month:")
-    print(total_revenue_last_month())
-    print("\nTotal orders per customer:")
-    print(json.dumps(total_orders_per_customer(), indent=2))
-    print("\nCustomers with more than 2 orders:")
+from src.config import get_supabase
+from src.dao.pagination import iter_keyset
+from src.dao import rollup_dao
+from datetime import datetime, timedelta
+from collections import Counter, defaultdict
+
+PAGE_SIZE = 1000
+
+# Each report reads the precomputed rollups from sql/rollup_functions.sql, so its
+# cost does not grow with order history. Without the rollups it calls an aggregate
+# RPC from sql/report_functions.sql, and without those it streams the minimum
+# columns page by page.
+
+# Errors meaning "this rollup table / report function is not installed": PostgREST's
+# function and table not found, Postgres' undefined_function and undefined_table.
+_NOT_INSTALLED = {"PGRST202", "PGRST205", "42883", "42P01"}
+
+def _first_available(*sources):
+    # Result of the first source that is installed. Any other failure (network, auth,
+    # timeout) is raised rather than hidden behind a slower fallback.
+    for source in sources[:-1]:
+        try:
+            return source()
+        except Exception as e:
+            if str(getattr(e, "code", None)) not in _NOT_INSTALLED:
+                raise
+    return sources[-1]()
+
+def _stream(table, columns, key, apply_filters=None):
+    return iter_keyset(table, key, columns, page_size=PAGE_SIZE, apply_filters=apply_filters, prefetch=True)
+
+def _last_month_bounds(today=None):
+    today = today or datetime.utcnow()
+    this_month = today.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    last_month = (this_month - timedelta(days=1)).replace(day=1)
+    return last_month, this_month
+
+# Top 5 selling products (by total quantity)
+def top_selling_products(limit=5):
+    sb = get_supabase()
+
+    def from_rpc():
+        rows = sb.rpc("report_top_selling_products", {"p_limit": limit}).execute().data or []
+        return [(r["prod_id"], r["total_qty"]) for r in rows]
+
+    def from_items():
+        counter = Counter()
+        for item in _stream("order_items", "prod_id, quantity", "item_id"):
+            counter[item["prod_id"]] += item["quantity"]
+        return counter.most_common(limit)
+
+    return _first_available(lambda: rollup_dao.top_products(limit), from_rpc, from_items)
+
+# Total revenue in the last month
+def total_revenue_last_month():
+    sb = get_supabase()
+    start, end = _last_month_bounds()
+
+    def from_rpc():
+        revenue = sb.rpc("report_revenue_between", {"p_start": start.isoformat(), "p_end": end.isoformat()}).execute().data
+        return revenue or 0
+
+    def from_orders():
+        def in_range(q):
+            return q.gte("order_date", start.isoformat()).lt("order_date", end.isoformat())
+        return sum(o["total_amount"] for o in _stream("orders", "total_amount", "order_id", in_range))
+
+    return _first_available(lambda: rollup_dao.revenue_between(start.date(), end.date()), from_rpc, from_orders)
+
+# Total orders placed by each customer
+def total_orders_per_customer(min_orders=0):
+    sb = get_supabase()
+
+    def from_rpc():
+        rows = sb.rpc("report_orders_per_customer", {"p_min_orders": min_orders}).execute().data or []
+        return {r["cust_id"]: r["order_count"] for r in rows}
+
+    def from_orders():
+        counter = Counter(o["cust_id"] for o in _stream("orders", "cust_id", "order_id"))
+        return {cust_id: total for cust_id, total in counter.items() if total > min_orders}
+
+    return _first_available(lambda: dict(rollup_dao.iter_customer_order_counts(min_orders)), from_rpc, from_orders)
+
+# Customers who placed more than 2 orders
+def customers_with_more_than_n_orders(n=2):
+    return list(total_orders_per_customer(min_orders=n))
+
+if __name__ == "__main__":
+    import json
+    print("Top 5 selling products:")
+    print(json.dumps(top_selling_products(), indent=2))
+    print("\nTotal revenue last month:")
+    print(total_revenue_last_month())
+    print("\nTotal orders per customer:")
+    print(json.dumps(total_orders_per_customer(), indent=2))
+    print("\nCustomers with more than 2 orders:")
     print(json.dumps(customers_with_more_than_n_orders(2), indent=2))
\ No newline at end of file
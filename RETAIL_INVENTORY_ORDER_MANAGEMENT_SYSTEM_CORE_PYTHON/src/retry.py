@@ -0,0 +1,65 @@
+# src/retry.py
+"""
+Retry transient storage failures with exponential backoff and full jitter.
+
+Only wrap calls that are safe to repeat: reads, idempotent updates, and writes keyed
+so the server ignores a repeat (place_orders with an order_ref, idempotency_keys).
+"""
+import random
+import time
+from typing import Callable, Iterator, TypeVar
+from src.config import RETRY_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY
+
+T = TypeVar("T")
+
+# httpx transport errors (matched by name so httpx stays an optional import).
+_TRANSIENT_TYPES = {
+    "TransportError", "TimeoutException", "ConnectError", "ConnectTimeout", "ReadTimeout",
+    "WriteTimeout", "PoolTimeout", "ReadError", "WriteError", "RemoteProtocolError",
+}
+# HTTP gateway errors, PostgREST "could not connect / schema cache" errors,
+# Postgres serialization failure / deadlock.
+_TRANSIENT_CODES = {"502", "503", "504", "PGRST000", "PGRST001", "PGRST002", "PGRST003", "40001", "40P01"}
+_TRANSIENT_MESSAGES = ("database is locked", "connection reset", "connection refused", "server closed the connection")
+
+
+def is_transient(exc: BaseException) -> bool:
+    """
+    True for failures where repeating the same request may succeed.
+    """
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    if any(cls.__name__ in _TRANSIENT_TYPES for cls in type(exc).__mro__):
+        return True
+    if str(getattr(exc, "code", None)) in _TRANSIENT_CODES:
+        return True
+    message = str(getattr(exc, "message", None) or exc).lower()
+    return any(m in message for m in _TRANSIENT_MESSAGES)
+
+
+def backoff_delays(attempts: int = RETRY_ATTEMPTS, base: float = RETRY_BASE_DELAY,
+                   cap: float = RETRY_MAX_DELAY) -> Iterator[float]:
+    """
+    Sleep before each retry: uniform in [0, min(cap, base * 2**n)] ("full jitter"),
+    so clients that failed together do not retry together.
+    """
+    for n in range(attempts - 1):
+        yield random.uniform(0, min(cap, base * 2 ** n))
+
+
+def call_with_retry(fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Call fn(*args, **kwargs), retrying transient failures up to RETRY_ATTEMPTS times
+    in total. The last error, or any non-transient one, is raised unchanged.
+    """
+    delays = backoff_delays()
+    while True:
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            if not is_transient(e):
+                raise
+            delay = next(delays, None)
+            if delay is None:
+                raise
+            time.sleep(delay)
@@ -0,0 +1,68 @@
+# src/services/async_order_service.py
+"""
+asyncio versions of create_order / cancel_order / process_payment. Same rules and
+errors as src/services/order_service.py, but independent round trips overlap.
+"""
+import asyncio
+from datetime import datetime
+from typing import Dict, List
+import src.dao.async_dao as adao
+from src import tracing
+from src.dao.product_dao import InsufficientStock
+from src.services.order_service import OrderError, _merge_lines, _price_basket, _item_rows, _restock_lines, _basket_columns
+from src.services.product_service import low_stock_index
+
+@tracing.operation("async_order_service.create_order")
+async def create_order(customer_id: int, items: List[Dict]) -> Dict:
+    wanted = _merge_lines(items)
+    # Customer check and product fetch don't depend on each other.
+    customer, products = await asyncio.gather(
+        adao.get_customer_by_id(customer_id),
+        adao.get_products_by_ids(list(wanted), _basket_columns()),
+    )
+    if not customer:
+        raise OrderError("Customer not found")
+    products = {p["prod_id"]: p for p in products}
+    total_amount = _price_basket(wanted, products)
+
+    try:
+        low_stock_index.observe(await adao.reserve_stock([{"prod_id": prod_id, "qty": qty} for prod_id, qty in wanted.items()]))
+    except InsufficientStock as e:
+        raise OrderError(str(e))
+
+    order = await adao.insert_order(customer_id, total_amount)
+    order_id = order["order_id"]
+    # Items and the pending payment both only need the order id.
+    _, payment = await asyncio.gather(
+        adao.insert_order_items(order_id, _item_rows(items, products)),
+        adao.insert_payment(order_id, total_amount, status="PENDING"),
+    )
+    return {"order_id": order_id, "customer_id": customer_id, "total_amount": total_amount, "items": items, "payment": payment}
+
+@tracing.operation("async_order_service.cancel_order")
+async def cancel_order(order_id: int) -> Dict:
+    details = await adao.get_order_details(order_id)
+    order = details.get("order")
+    if not order:
+        raise OrderError("Order not found")
+    if order.get("status") != "PLACED":
+        raise OrderError("Only PLACED orders can be cancelled")
+    cancelled = await adao.set_order_status(order_id, "CANCELLED", expected="PLACED")
+    if not cancelled:
+        raise OrderError("Only PLACED orders can be cancelled")
+    lines = _restock_lines(details)
+    restocked, _ = await asyncio.gather(
+        adao.increment_stock(lines) if lines else asyncio.sleep(0, result=[]),
+        adao.update_payment(order_id, {"status": "REFUNDED"}),
+    )
+    low_stock_index.observe(restocked)
+    return {**details, "order": cancelled}
+
+@tracing.operation("async_order_service.process_payment")
+async def process_payment(order_id: int, method: str) -> Dict:
+    paid_at = datetime.utcnow().isoformat()
+    payment, order = await asyncio.gather(
+        adao.update_payment(order_id, {"status": "PAID", "method": method, "paid_at": paid_at}),
+        adao.set_order_status(order_id, "COMPLETED"),
+    )
+    return {"order": order, "payment": payment}
@@ -0,0 +1,275 @@
+# src/services/export_service.py
+"""
+Columnar snapshots of the order tables for offline reporting.
+
+export_snapshot() streams each table in keyset pages into Parquet or Arrow IPC files
+under one directory, next to a manifest.json recording the highest key exported per
+table. Later runs only export rows above that key and add them as a new part file,
+so a nightly incremental costs one pass over the day's new rows.
+
+Incremental runs pick up new rows only; status/stock changes to rows already exported
+are picked up by a --full run. pyarrow is needed here but nowhere else in the package.
+
+read_table() memory-maps the part files back into one pyarrow Table, so reports over
+a snapshot (see src.analytics.load_snapshot) put no load on the database.
+"""
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+from src.dao.pagination import iter_keyset
+
+DEFAULT_PAGE_SIZE = 5000
+ROW_GROUP_ROWS = 100_000
+MANIFEST = "manifest.json"
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# table -> (key column, [(column, arrow type name)])
+TABLES = {
+    "orders": ("order_id", [("order_id", "int64"), ("cust_id", "int64"), ("order_date", "timestamp"),
+                            ("total_amount", "float64"), ("status", "string"), ("order_ref", "string")]),
+    "order_items": ("item_id", [("item_id", "int64"), ("order_id", "int64"), ("prod_id", "int64"),
+                                ("quantity", "int64"), ("price", "float64")]),
+    "product": ("prod_id", [("prod_id", "int64"), ("name", "string"), ("sku", "string"), ("price", "float64"),
+                            ("stock", "int64"), ("category", "string")]),
+    "customers": ("cust_id", [("cust_id", "int64"), ("name", "string"), ("email", "string"), ("phone", "int64"),
+                              ("city", "string"), ("created_at", "timestamp")]),
+    "payments": ("payment_id", [("payment_id", "int64"), ("order_id", "int64"), ("amount", "float64"),
+                                ("status", "string"), ("method", "string"), ("paid_at", "timestamp")]),
+}
+
+
+class ExportError(Exception):
+    pass
+
+
+def _pa():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ExportError("snapshot export needs pyarrow (pip install pyarrow)") from None
+    return pyarrow
+
+
+def _schema(table: str):
+    pa = _pa()
+    types = {"int64": pa.int64(), "float64": pa.float64(), "string": pa.string(),
+             "timestamp": pa.timestamp("us", tz="UTC")}
+    return pa.schema([(name, types[kind]) for name, kind in TABLES[table][1]])
+
+
+def _timestamp(value):
+    # PostgREST sends ISO strings with an offset, the SQLite backend naive UTC ones.
+    if value is None:
+        return None
+    ts = datetime.fromisoformat(value)
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def _batch(table: str, rows: List[Dict]):
+    pa = _pa()
+    schema = _schema(table)
+    arrays = []
+    for name, kind in TABLES[table][1]:
+        values = [r.get(name) for r in rows]
+        if kind == "timestamp":
+            values = [_timestamp(v) for v in values]
+        arrays.append(pa.array(values, type=schema.field(name).type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def load_manifest(out_dir: str) -> Dict:
+    try:
+        with open(os.path.join(out_dir, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"tables": {}}
+
+
+def _save_manifest(out_dir: str, manifest: Dict) -> None:
+    path = os.path.join(out_dir, MANIFEST)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class _PartWriter:
+    """
+    Writes record batches to one part file: Parquet row groups of ~ROW_GROUP_ROWS, or
+    Arrow IPC file batches. The file only appears under its final name on close().
+    """
+
+    def __init__(self, path: str, schema, fmt: str, compression: Optional[str]):
+        pa = _pa()
+        self.path, self.fmt, self.tmp = path, fmt, path + ".tmp"
+        self._buffered: List = []
+        self._buffered_rows = 0
+        if fmt == "parquet":
+            self._writer = pa.parquet.ParquetWriter(self.tmp, schema, compression=compression or "none")
+        else:
+            self._sink = pa.OSFile(self.tmp, "wb")
+            options = pa.ipc.IpcWriteOptions(compression=compression)
+            self._writer = pa.ipc.new_file(self._sink, schema, options=options)
+
+    def write(self, batch) -> None:
+        if self.fmt != "parquet":
+            self._writer.write_batch(batch)
+            return
+        self._buffered.append(batch)
+        self._buffered_rows += batch.num_rows
+        if self._buffered_rows >= ROW_GROUP_ROWS:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._buffered:
+            self._writer.write_table(_pa().Table.from_batches(self._buffered))
+            self._buffered, self._buffered_rows = [], 0
+
+    def close(self) -> None:
+        if self.fmt == "parquet":
+            self._flush()
+        self._writer.close()
+        if self.fmt != "parquet":
+            self._sink.close()
+        os.replace(self.tmp, self.path)
+
+    def abort(self) -> None:
+        try:
+            self._writer.close()
+        finally:
+            if os.path.exists(self.tmp):
+                os.remove(self.tmp)
+
+
+def _pages(rows: Iterable[Dict], size: int) -> Iterable[List[Dict]]:
+    page: List[Dict] = []
+    for row in rows:
+        page.append(row)
+        if len(page) >= size:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+def _run_id() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+
+
+def export_table(table: str, out_dir: str, after: Optional[int] = None, fmt: str = "parquet",
+                 compression: Optional[str] = "zstd", page_size: int = DEFAULT_PAGE_SIZE,
+                 run: Optional[str] = None) -> Optional[Dict]:
+    """
+    Export rows of `table` with key > after into a new part file. Returns
+    {"file", "rows", "min_id", "max_id"}, or None when there was nothing new.
+
+    Part names carry the run id, so a re-export never overwrites a part that the
+    current manifest may still list.
+    """
+    if table not in TABLES:
+        raise ExportError(f"Unknown table: {table}")
+    if fmt not in FORMATS:
+        raise ExportError(f"Unknown format: {fmt} (use {' or '.join(FORMATS)})")
+    key, columns = TABLES[table]
+    run = run or _run_id()
+    since = (lambda q: q.gt(key, after)) if after is not None else None
+    rows = iter_keyset(table, key, ", ".join(c for c, _ in columns), page_size=page_size,
+                       apply_filters=since, prefetch=True)
+
+    os.makedirs(os.path.join(out_dir, table), exist_ok=True)
+    writer, part, count, first, last = None, None, 0, None, None
+    try:
+        for page in _pages(rows, page_size):
+            if writer is None:
+                first = page[0][key]
+                part = os.path.join(table, f"{first:012d}-{run}{FORMATS[fmt]}")
+                writer = _PartWriter(os.path.join(out_dir, part), _schema(table), fmt, compression)
+            writer.write(_batch(table, page))
+            count += len(page)
+            last = page[-1][key]
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        raise
+    if writer is None:
+        return None
+    # Name the part by its key range once the range is known.
+    final = os.path.join(table, f"{first:012d}-{last:012d}-{run}{FORMATS[fmt]}")
+    writer.path = os.path.join(out_dir, final)
+    writer.close()
+    return {"file": final, "rows": count, "min_id": first, "max_id": last}
+
+
+def _remove_unlisted(out_dir: str, table: str, entry: Dict) -> None:
+    # Parts replaced by a full run, and leftovers of runs that failed before their
+    # manifest update. The table directory belongs to the snapshot.
+    listed = {os.path.normpath(part["file"]) for part in entry["parts"]}
+    folder = os.path.join(out_dir, table)
+    for name in os.listdir(folder):
+        if os.path.join(table, name) not in listed:
+            os.remove(os.path.join(folder, name))
+
+
+def export_snapshot(out_dir: str, tables: Optional[List[str]] = None, fmt: str = "parquet",
+                    compression: Optional[str] = "zstd", full: bool = False, page_size: int = DEFAULT_PAGE_SIZE,
+                    progress: Optional[Callable[[str, Optional[Dict]], None]] = None) -> Dict:
+    """
+    Export (or incrementally extend) a snapshot of `tables` (default: all) in out_dir.
+    full=True (or a change of format) re-exports each table from scratch; its old parts
+    are only deleted once the manifest lists the new ones, so a run that fails part way
+    leaves the previous snapshot readable (and its stray parts are removed next time).
+    Returns per-table stats.
+    """
+    tables = tables or list(TABLES)
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = load_manifest(out_dir)
+    run = _run_id()
+    stats = {}
+    for table in tables:
+        start = time.perf_counter()
+        entry = manifest["tables"].get(table)
+        if full or (entry and entry.get("format") != fmt):
+            entry = None
+        entry = entry or {"key": TABLES[table][0], "format": fmt, "max_id": None, "rows": 0, "parts": []}
+        part = export_table(table, out_dir, after=entry["max_id"], fmt=fmt, compression=compression,
+                            page_size=page_size, run=run)
+        if part:
+            entry["parts"].append(part)
+            entry["rows"] += part["rows"]
+            entry["max_id"] = part["max_id"]
+        entry["exported_at"] = datetime.now(timezone.utc).isoformat()
+        manifest["tables"][table] = entry
+        # Saved per table so an interrupted run keeps the tables it finished.
+        _save_manifest(out_dir, manifest)
+        _remove_unlisted(out_dir, table, entry)
+        stats[table] = {"new_rows": part["rows"] if part else 0, "total_rows": entry["rows"],
+                        "max_id": entry["max_id"], "seconds": round(time.perf_counter() - start, 3)}
+        if progress:
+            progress(table, stats[table])
+    return stats
+
+
+def read_table(out_dir: str, table: str, columns: Optional[List[str]] = None):
+    """
+    All parts of one table as a pyarrow Table, memory-mapped rather than read into
+    memory (zero-copy for uncompressed Arrow IPC parts).
+    """
+    pa = _pa()
+    entry = load_manifest(out_dir)["tables"].get(table)
+    if not entry or not entry["parts"]:
+        return _schema(table).empty_table() if columns is None else _schema(table).empty_table().select(columns)
+    pieces = []
+    for part in entry["parts"]:
+        path = os.path.join(out_dir, part["file"])
+        if entry["format"] == "parquet":
+            pieces.append(pa.parquet.read_table(path, columns=columns, memory_map=True))
+        else:
+            t = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+            pieces.append(t.select(columns) if columns else t)
+    return pa.concat_tables(pieces)
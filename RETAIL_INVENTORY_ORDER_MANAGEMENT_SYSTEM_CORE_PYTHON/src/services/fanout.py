@@ -0,0 +1,63 @@
+# src/services/fanout.py
+"""
+Run independent blocking calls (DAO reads) side by side on a bounded thread pool,
+so a service step costs about one round trip instead of one per call.
+
+    customer, products = fan_out(
+        lambda: get_customer_by_id(cust_id),
+        lambda: get_products_by_ids(prod_ids),
+    )
+
+Results come back in argument order. Every call runs to completion even if another
+one fails; failures are then raised in argument order: a single failure as itself
+(so callers' except clauses work as they did with sequential calls), several as one
+FanOutError listing all of them. Calls made from inside a fanned-out call run inline,
+so nesting cannot exhaust the pool. FANOUT_MAX_WORKERS=1 runs everything inline.
+"""
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Tuple
+from src.config import FANOUT_MAX_WORKERS
+
+_executor = ThreadPoolExecutor(max_workers=max(FANOUT_MAX_WORKERS, 1), thread_name_prefix="fanout")
+_local = threading.local()
+
+
+class FanOutError(Exception):
+    def __init__(self, errors: List[Tuple[int, BaseException]]):
+        self.errors = errors
+        super().__init__("; ".join(f"call {i}: {type(e).__name__}: {e}" for i, e in errors))
+
+
+def _run(fn: Callable[[], Any]) -> Any:
+    _local.inside = True
+    try:
+        return fn()
+    finally:
+        _local.inside = False
+
+
+def fan_out(*calls: Callable[[], Any]) -> List[Any]:
+    """
+    Call each zero-argument callable, concurrently when there is more than one, and
+    return their results in order.
+    """
+    if len(calls) <= 1 or FANOUT_MAX_WORKERS <= 1 or getattr(_local, "inside", False):
+        pending = calls
+    else:
+        # Each call gets a copy of the caller's context (e.g. the tracing operation).
+        futures = [_executor.submit(contextvars.copy_context().run, _run, fn) for fn in calls]
+        pending = [future.result for future in futures]
+    results, errors = [], []
+    for i, wait in enumerate(pending):
+        try:
+            results.append(wait())
+        except Exception as e:
+            results.append(None)
+            errors.append((i, e))
+    if len(errors) == 1:
+        raise errors[0][1]
+    if errors:
+        raise FanOutError(errors) from errors[0][1]
+    return results
@@ -0,0 +1,196 @@
+# src/services/import_service.py
+import csv
+import json
+import math
+import os
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import src.dao.customer_dao as customer_dao
+import src.dao.product_dao as product_dao
+
+DEFAULT_CHUNK_SIZE = 500
+
+class BulkImportError(Exception):
+    pass
+
+def read_rows(path: str) -> Iterator[Tuple[int, Dict]]:
+    """
+    Stream (row_number, record) pairs from a .csv (with header) or .jsonl file.
+    Row numbers count data rows from 1 and are what checkpoints refer to.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, newline="", encoding="utf-8") as f:
+        if ext == ".csv":
+            for n, rec in enumerate(csv.DictReader(f), start=1):
+                yield n, rec
+        elif ext in (".jsonl", ".ndjson"):
+            n = 0
+            for line in f:
+                if not line.strip():
+                    continue
+                n += 1
+                try:
+                    yield n, json.loads(line)
+                except ValueError as e:
+                    yield n, {"__error__": f"invalid JSON: {e}"}
+        else:
+            raise BulkImportError(f"Unsupported file type: {ext} (use .csv or .jsonl)")
+
+def _blank(v) -> bool:
+    return v is None or (isinstance(v, str) and not v.strip())
+
+def validate_product(rec: Dict) -> Dict:
+    """
+    Return a clean product row or raise ValueError with the reason.
+    """
+    if "__error__" in rec:
+        raise ValueError(rec["__error__"])
+    if _blank(rec.get("name")) or _blank(rec.get("sku")):
+        raise ValueError("name and sku are required")
+    price = float(rec.get("price"))
+    # NaN compares false with everything, so check finiteness explicitly.
+    if not math.isfinite(price) or price <= 0:
+        raise ValueError("price must be a finite number greater than 0")
+    stock = float(rec.get("stock") or 0)
+    # int() would silently truncate 2.7 from a JSONL file.
+    if not stock.is_integer():
+        raise ValueError("stock must be a whole number")
+    if stock < 0:
+        raise ValueError("stock must not be negative")
+    stock = int(stock)
+    row = {"name": str(rec["name"]).strip(), "sku": str(rec["sku"]).strip(), "price": price, "stock": stock}
+    if not _blank(rec.get("category")):
+        row["category"] = str(rec["category"]).strip()
+    return row
+
+def validate_customer(rec: Dict) -> Dict:
+    """
+    Return a clean customer row or raise ValueError with the reason.
+    """
+    if "__error__" in rec:
+        raise ValueError(rec["__error__"])
+    if _blank(rec.get("name")) or _blank(rec.get("email")):
+        raise ValueError("name and email are required")
+    email = str(rec["email"]).strip()
+    if "@" not in email:
+        raise ValueError(f"invalid email: {email}")
+    row = {"name": str(rec["name"]).strip(), "email": email, "phone": int(rec.get("phone"))}
+    if not _blank(rec.get("city")):
+        row["city"] = str(rec["city"]).strip()
+    return row
+
+def _load_checkpoint(path: str) -> int:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return int(json.load(f).get("row", 0))
+    except FileNotFoundError:
+        return 0
+
+def _save_checkpoint(path: str, source: str, row: int) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"source": os.path.abspath(source), "row": row}, f)
+    os.replace(tmp, path)
+
+def _run_import(
+    path: str,
+    key: str,
+    validate: Callable[[Dict], Dict],
+    existing: Callable[[List[str]], set],
+    upsert: Callable[[List[Dict], bool], int],
+    chunk_size: int,
+    update_existing: bool,
+    resume: bool,
+    checkpoint: Optional[str],
+    rejects_path: Optional[str],
+    progress: Optional[Callable[[Dict], None]],
+) -> Dict:
+    if chunk_size <= 0:
+        raise BulkImportError("chunk_size must be positive")
+    checkpoint = checkpoint or path + ".checkpoint"
+    skip_to = _load_checkpoint(checkpoint) if resume else 0
+    stats = {"read": 0, "written": 0, "duplicates": 0, "rejected": 0, "resumed_after": skip_to}
+    rejects_file = open(rejects_path, "a", encoding="utf-8") if rejects_path else None
+    start = time.perf_counter()
+    saved = skip_to
+
+    def reject(n: int, rec: Dict, reason: str) -> None:
+        stats["rejected"] += 1
+        if rejects_file:
+            rejects_file.write(json.dumps({"row": n, "reason": reason, "record": rec}, default=str) + "\n")
+
+    def flush(chunk: List[Tuple[int, Dict]], upto: int) -> None:
+        # The checkpoint moves to the last row read, so rows rejected after the last
+        # accepted one are not re-checked (and re-appended to the rejects) on resume.
+        nonlocal saved
+        if chunk:
+            # One in_() query per chunk instead of one lookup per row.
+            already = existing([row[key] for _, row in chunk])
+            rows = []
+            for n, row in chunk:
+                if row[key] in already and not update_existing:
+                    stats["duplicates"] += 1
+                    reject(n, row, f"{key} already exists")
+                else:
+                    rows.append(row)
+            stats["written"] += upsert(rows, update_existing)
+        if rejects_file:
+            rejects_file.flush()
+        _save_checkpoint(checkpoint, path, upto)
+        saved = upto
+        if progress:
+            progress(dict(stats, seconds=time.perf_counter() - start))
+
+    try:
+        chunk: List[Tuple[int, Dict]] = []
+        seen_in_chunk = set()
+        last = skip_to
+        for n, rec in read_rows(path):
+            if n <= skip_to:
+                continue
+            last = n
+            stats["read"] += 1
+            try:
+                row = validate(rec)
+            except (ValueError, TypeError) as e:
+                reject(n, rec, str(e))
+                continue
+            if row[key] in seen_in_chunk:
+                stats["duplicates"] += 1
+                reject(n, rec, f"duplicate {key} in file")
+                continue
+            seen_in_chunk.add(row[key])
+            chunk.append((n, row))
+            if len(chunk) >= chunk_size:
+                flush(chunk, n)
+                chunk, seen_in_chunk = [], set()
+        if chunk or last > saved:
+            flush(chunk, last)
+    finally:
+        if rejects_file:
+            rejects_file.close()
+
+    elapsed = time.perf_counter() - start
+    stats["seconds"] = round(elapsed, 3)
+    stats["rows_per_sec"] = round(stats["read"] / elapsed, 1) if elapsed else None
+    stats["checkpoint"] = checkpoint
+    return stats
+
+def import_products(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, update_existing: bool = False,
+                    resume: bool = False, checkpoint: Optional[str] = None, rejects_path: Optional[str] = None,
+                    progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Stream products from a CSV/JSONL file into the product table in chunks.
+    Returns counters: read, written, duplicates, rejected, seconds, rows_per_sec.
+    """
+    return _run_import(path, "sku", validate_product, product_dao.get_existing_skus, product_dao.upsert_products,
+                       chunk_size, update_existing, resume, checkpoint, rejects_path, progress)
+
+def import_customers(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, update_existing: bool = False,
+                     resume: bool = False, checkpoint: Optional[str] = None, rejects_path: Optional[str] = None,
+                     progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Stream customers from a CSV/JSONL file into the customers table in chunks.
+    """
+    return _run_import(path, "email", validate_customer, customer_dao.get_existing_emails, customer_dao.upsert_customers,
+                       chunk_size, update_existing, resume, checkpoint, rejects_path, progress)
@@ -0,0 +1,255 @@
+# src/services/order_queue.py
+"""
+Write-behind order placement for checkout bursts.
+
+submit() validates an order, appends it to a local append-only log, fsyncs and returns
+a ticket; a background committer then places queued orders in groups with one
+place_orders RPC per group (stock reservation, order, items and payment rows in one
+transaction). On start-up every order in the log without a matching "done" record is
+replayed; place_orders skips refs it has already applied, so replays are idempotent.
+A group that fails because of an order's data (a constraint violation, a malformed
+record) is narrowed down to the offending orders, which are marked REJECTED; any
+other failure puts the group back at the head of the queue, retried with backoff.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional
+from src.config import ORDER_QUEUE_PATH, ORDER_QUEUE_GROUP_SIZE, ORDER_QUEUE_FLUSH_INTERVAL
+import src.dao.order_dao as order_dao
+import src.dao.product_dao as product_dao
+from src.dao.customer_dao import get_customer_by_id
+from src.services.order_service import OrderError, _merge_lines, _price_basket, _item_rows, _basket_columns
+
+_MAX_RESULTS = 100_000
+_MAX_BACKOFF = 30.0
+_ORDER_FIELDS = ("order_ref", "cust_id", "total_amount", "lines", "items")
+
+def _order_specific(exc: BaseException) -> bool:
+    # SQLSTATE classes caused by one order's data: 22 (data exception, e.g. a malformed
+    # value) and 23 (FK, check, unique and not-null violations). Anything else (network,
+    # auth, a missing function) says nothing about the orders in the group.
+    return str(getattr(exc, "code", None) or "")[:2] in ("22", "23")
+
+def _rejected(record: Dict, error: str) -> Dict:
+    return {"ref": record.get("order_ref"), "placed_order_id": None, "outcome": "REJECTED", "error": error}
+
+class OrderQueue:
+    def __init__(self, path: str = ORDER_QUEUE_PATH, group_size: int = ORDER_QUEUE_GROUP_SIZE,
+                 flush_interval: float = ORDER_QUEUE_FLUSH_INTERVAL):
+        self.path = path
+        self.group_size = group_size
+        self.flush_interval = flush_interval
+        self._pending: "deque[Dict]" = deque()
+        self._results: "OrderedDict[str, Dict]" = OrderedDict()
+        self._log_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._stop = False
+        self._busy = False
+        self._failures = 0  # consecutive commits that went back on the queue
+        self._metrics = {"submitted": 0, "recovered": 0, "placed": 0, "rejected": 0, "duplicates": 0,
+                         "groups": 0, "commit_errors": 0, "last_group_size": 0, "last_commit_ms": 0.0}
+        self._recover()
+        self._log = open(self.path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="order-queue-committer", daemon=True)
+        self._thread.start()
+
+    # -- producer side --------------------------------------------------------
+
+    def submit(self, customer_id: int, items: List[Dict]) -> Dict:
+        """
+        Validate and durably enqueue an order. Returns {"ticket", "status": "QUEUED",
+        "total_amount"}; the order id is available later through result(ticket).
+        Raises OrderError for unknown customers/products; stock is checked when the
+        group commits, and an order short on stock ends up REJECTED.
+        """
+        if not items:
+            raise OrderError("Order has no items")
+        if not get_customer_by_id(customer_id):
+            raise OrderError("Customer not found")
+        wanted = _merge_lines(items)
+        products = {p["prod_id"]: p for p in product_dao.get_products_by_ids(list(wanted), _basket_columns())}
+        total_amount = _price_basket(wanted, products)
+        record = {
+            "op": "order",
+            "order_ref": uuid.uuid4().hex,
+            "cust_id": customer_id,
+            "total_amount": total_amount,
+            "lines": [{"prod_id": prod_id, "qty": qty} for prod_id, qty in wanted.items()],
+            "items": _item_rows(items, products),
+        }
+        self._append([record])
+        self._set_result(record["order_ref"], {"status": "QUEUED"})
+        with self._cond:
+            self._pending.append(record)
+            self._metrics["submitted"] += 1
+            if len(self._pending) >= self.group_size:
+                self._cond.notify()
+        return {"ticket": record["order_ref"], "status": "QUEUED", "total_amount": total_amount}
+
+    def result(self, ticket: str) -> Optional[Dict]:
+        """
+        QUEUED, PLACED (with order_id) or REJECTED (with error); None if unknown.
+        """
+        with self._cond:
+            r = self._results.get(ticket)
+            return dict(r) if r else None
+
+    def metrics(self) -> Dict:
+        with self._cond:
+            return dict(self._metrics, depth=len(self._pending))
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """
+        Block until everything submitted so far is committed. Returns False on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify()
+            while self._pending or self._busy:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(min(remaining, 0.05))
+        return True
+
+    def close(self, timeout: float = 30.0) -> None:
+        self.flush(timeout)
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+        self._thread.join(timeout)
+        self._log.close()
+
+    # -- log ----------------------------------------------------------------
+
+    def _append(self, records: List[Dict]) -> None:
+        data = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+        with self._log_lock:
+            self._log.write(data)
+            self._log.flush()
+            os.fsync(self._log.fileno())
+
+    def _recover(self) -> None:
+        """
+        Re-queue logged orders that never got a "done" record, then compact the log so
+        it only holds those.
+        """
+        orders: "OrderedDict[str, Dict]" = OrderedDict()
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        break  # torn final write from a crash; nothing after it was acknowledged
+                    if rec.get("op") == "order":
+                        orders[rec["order_ref"]] = rec
+                    elif rec.get("op") == "done":
+                        for ref in rec["refs"]:
+                            orders.pop(ref, None)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for rec in orders.values():
+                f.write(json.dumps(rec, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        for ref, rec in orders.items():
+            self._pending.append(rec)
+            self._results[ref] = {"status": "QUEUED"}
+        self._metrics["recovered"] = len(orders)
+
+    def _set_result(self, ref: str, result: Dict) -> None:
+        with self._cond:
+            self._results[ref] = result
+            self._results.move_to_end(ref)
+            while len(self._results) > _MAX_RESULTS:
+                self._results.popitem(last=False)
+
+    # -- committer ----------------------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._pending and not self._stop:
+                    self._cond.wait(self.flush_interval)
+                # On close, orders that still cannot be committed stay in the log for the
+                # next start-up to replay.
+                if self._stop and (not self._pending or self._failures):
+                    return
+                group = [self._pending.popleft() for _ in range(min(self.group_size, len(self._pending)))]
+                self._busy = bool(group)
+            if group:
+                self._commit(group)
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def _commit(self, group: List[Dict]) -> None:
+        start = time.perf_counter()
+        payload, outcomes = [], []
+        for r in group:
+            try:
+                payload.append({k: r[k] for k in _ORDER_FIELDS})
+            except KeyError as e:
+                outcomes.append(_rejected(r, f"malformed queue record: missing {e}"))
+        try:
+            outcomes += order_dao.place_orders(payload)
+        except Exception as e:
+            with self._cond:
+                self._metrics["commit_errors"] += 1
+            if not _order_specific(e):
+                self._retry_later(group)
+                return
+            if len(group) > 1:
+                # One order's data (FK violation after its customer or product was
+                # deleted, a malformed value) rolls back the whole group: split it until
+                # the offending orders are alone, so everything else still commits.
+                mid = len(group) // 2
+                self._commit(group[:mid])
+                self._commit(group[mid:])
+                return
+            outcomes = [_rejected(group[0], str(e))]
+        self._failures = 0
+        product_dao.invalidate(list({l["prod_id"] for r in group for l in r.get("lines") or ()}))
+        self._append([{"op": "done", "refs": [r.get("order_ref") for r in group]}])
+        counts = {"PLACED": 0, "REJECTED": 0, "DUPLICATE": 0}
+        for o in outcomes:
+            counts[o["outcome"]] = counts.get(o["outcome"], 0) + 1
+            if o["outcome"] == "REJECTED":
+                self._set_result(o["ref"], {"status": "REJECTED", "error": o["error"]})
+            else:
+                self._set_result(o["ref"], {"status": "PLACED", "order_id": o["placed_order_id"]})
+        with self._cond:
+            self._metrics["placed"] += counts["PLACED"]
+            self._metrics["rejected"] += counts["REJECTED"]
+            self._metrics["duplicates"] += counts["DUPLICATE"]
+            self._metrics["groups"] += 1
+            self._metrics["last_group_size"] = len(group)
+            self._metrics["last_commit_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+    def _retry_later(self, group: List[Dict]) -> None:
+        # Leave the group at the head of the queue; wait longer after each failure in a
+        # row (an outage or an expired key should not turn into a tight retry loop).
+        with self._cond:
+            self._pending.extendleft(reversed(group))
+            self._failures += 1
+            delay = min(_MAX_BACKOFF, self.flush_interval * 10 * 2 ** min(self._failures - 1, 16))
+            self._cond.wait_for(lambda: self._stop, delay)
+
+_queue: Optional[OrderQueue] = None
+_queue_lock = threading.Lock()
+
+def get_order_queue() -> OrderQueue:
+    """
+    Process-wide queue, started (and recovered from ORDER_QUEUE_PATH) on first use.
+    """
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = OrderQueue()
+        return _queue
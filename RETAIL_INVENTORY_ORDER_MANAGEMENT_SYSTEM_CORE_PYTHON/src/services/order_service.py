@@ -1,72 +1,250 @@
-def process_payment(order_id: int, method: str) -> dict:
-    from src.dao.order_dao import process_payment
-    return process_payment(order_id, method)
-from typing import List, Dict
-from src.dao.customer_dao import get_customer_by_id
-from src.dao.product_dao import get_product_by_id, update_product
-from src.dao.order_dao import insert_order, insert_order_item
-
-
-class OrderError(Exception):
-    pass
-
-def cancel_order(order_id: int) -> dict:
-    from src.dao.order_dao import get_order_details
-    from src.dao.product_dao import update_product, get_product_by_id
-    from src.config import get_supabase
-    sb = get_supabase()
-    details = get_order_details(order_id)
-    order = details.get("order")
-    if not order:
-        raise OrderError("Order not found")
-    if order.get("status") != "PLACED":
-        raise OrderError("Only PLACED orders can be cancelled")
-    # Restore stock for each item
-    for item in details.get("items", []):
-        prod_id = item["prod_id"]
-        qty = item["quantity"]
-        product = get_product_by_id(prod_id)
-        if product:
-            new_stock = product["stock"] + qty
-            update_product(prod_id, {"stock": new_stock})
-    # Update order status
-    sb.table("orders").update({"status": "CANCELLED"}).eq("order_id", order_id).execute()
-    # Mark payment as REFUNDED
-    sb.table("payments").update({"status": "REFUNDED"}).eq("order_id", order_id).execute()
-    # Return updated order details
-    updated = get_order_details(order_id)
-    return updated
-
-def create_order(customer_id: int, items: List[Dict]) -> Dict:
-   
-    customer = get_customer_by_id(customer_id)
-    if not customer:
-        raise OrderError("Customer not found")
-
-   
-    total_amount = 0
-    product_updates = []
-    for item in items:
-        prod_id = item["prod_id"]
-        qty = item["qty"]
-        product = get_product_by_id(prod_id)
-        if not product:
-            raise OrderError(f"Product {prod_id} not found")
-        if product["stock"] < qty:
-            raise OrderError(f"Insufficient stock for product {prod_id}")
-        total_amount += product["price"] * qty
-        product_updates.append((prod_id, product["stock"] - qty))
-
-    for prod_id, new_stock in product_updates:
-        update_product(prod_id, {"stock": new_stock})
-
-    order = insert_order(customer_id, total_amount)
-    order_id = order["order_id"]
-    for item in items:
-        insert_order_item(order_id, item["prod_id"], item["qty"])
-
-    # Insert pending payment record
-    from src.dao.order_dao import insert_payment
-    payment = insert_payment(order_id, total_amount, status="PENDING")
-
-    return {"order_id": order_id, "customer_id": customer_id, "total_amount": total_amount, "items": items, "payment": payment}
\ No newline at end of file
+def process_payment(order_id: int, method: str, idempotency_key: str | None = None) -> dict:
+    from src.dao.order_dao import process_payment
+    with tracing.operation("order_service.process_payment"):
+        if idempotency_key is None:
+            return process_payment(order_id, method)
+        request_hash = _request_hash("process_payment", order_id=order_id, method=method)
+        replayed = _replay(idempotency_key, "process_payment", request_hash)
+        if replayed is not None:
+            return replayed
+        # Both updates set absolute values, so repeating them after a lost response is harmless.
+        result = call_with_retry(process_payment, order_id, method)
+        call_with_retry(idempotency_dao.save_idempotent_result, idempotency_key, "process_payment", request_hash, result)
+        return result
+import hashlib
+import json
+import time
+from typing import List, Dict, Optional
+from src.dao.customer_dao import get_customer_by_id
+from src.dao.product_dao import get_products_by_ids, reserve_stock, increment_stock, InsufficientStock
+from src.dao.order_dao import insert_order, insert_order_items
+from src.dao import idempotency_dao
+from src.retry import call_with_retry
+from src import tracing
+from src.services.product_service import low_stock_index
+from src.services.fanout import fan_out
+import src.dao.order_dao as order_dao
+import src.dao.product_dao as product_dao
+
+
+class OrderError(Exception):
+    pass
+
+def _merge_lines(items: List[Dict]) -> Dict[int, int]:
+    # Merge repeated lines for the same product so stock is checked against the total.
+    wanted: Dict[int, int] = {}
+    for item in items:
+        wanted[item["prod_id"]] = wanted.get(item["prod_id"], 0) + item["qty"]
+    return wanted
+
+def _price_basket(wanted: Dict[int, int], products: Dict[int, Dict]) -> float:
+    # No stock check here: the rows may come from the product cache and be up to
+    # PRODUCT_CACHE_TTL old. reserve_stock / place_orders decide under a row lock.
+    total_amount = 0
+    for prod_id, qty in wanted.items():
+        product = products.get(prod_id)
+        if not product:
+            raise OrderError(f"Product {prod_id} not found")
+        total_amount += product["price"] * qty
+    return total_amount
+
+def _basket_columns() -> str:
+    # Pricing needs the price only; full rows are worth fetching while they get cached.
+    return "*" if product_dao.cache_enabled() else "prod_id, price"
+
+def _item_rows(items: List[Dict], products: Dict[int, Dict]) -> List[Dict]:
+    return [{"prod_id": item["prod_id"], "qty": item["qty"], "price": products[item["prod_id"]]["price"]} for item in items]
+
+def _request_hash(operation: str, **request) -> str:
+    return hashlib.sha256(json.dumps([operation, request], sort_keys=True, default=str).encode()).hexdigest()
+
+def _replay(key: str, operation: str, request_hash: str) -> Optional[Dict]:
+    """
+    Stored response for an idempotency key, or None if the key is new. Reusing a key
+    for a different request is an error rather than a silent replay.
+    """
+    stored = call_with_retry(idempotency_dao.get_idempotent_result, key)
+    if not stored:
+        return None
+    if stored["operation"] != operation or stored["request_hash"] != request_hash:
+        raise OrderError(f"Idempotency key {key!r} was already used for a different request")
+    return stored["response"]
+
+def _restock_lines(details: Dict) -> List[Dict]:
+    restored: Dict[int, int] = {}
+    for item in details.get("items", []):
+        restored[item["prod_id"]] = restored.get(item["prod_id"], 0) + item["quantity"]
+    return [{"prod_id": prod_id, "qty": qty} for prod_id, qty in restored.items()]
+
+@tracing.operation("order_service.cancel_order")
+def cancel_order(order_id: int) -> dict:
+    from src.dao.order_dao import get_order_details, set_order_status, update_payment
+    details = get_order_details(order_id)
+    order = details.get("order")
+    if not order:
+        raise OrderError("Order not found")
+    if order.get("status") != "PLACED":
+        raise OrderError("Only PLACED orders can be cancelled")
+    # Flip the status only if it is still PLACED, so two concurrent cancels
+    # cannot both restore stock.
+    cancelled = set_order_status(order_id, "CANCELLED", expected="PLACED")
+    if not cancelled:
+        raise OrderError("Only PLACED orders can be cancelled")
+    # Restore stock for all items in one atomic increment
+    lines = _restock_lines(details)
+    if lines:
+        low_stock_index.observe(increment_stock(lines))
+    # Mark payment as REFUNDED
+    update_payment(order_id, {"status": "REFUNDED"})
+    # Return updated order details (items and customer are unchanged, no need to re-fetch)
+    return {**details, "order": cancelled}
+
+BATCH_CHUNK = 500  # order ids per in_() filter, keeping request URLs well under PostgREST limits
+
+def _chunks(ids: List[int]) -> List[List[int]]:
+    ids = list(dict.fromkeys(ids))
+    return [ids[i:i + BATCH_CHUNK] for i in range(0, len(ids), BATCH_CHUNK)]
+
+def _skipped(rows: List[Dict]) -> Dict[int, str]:
+    # {"order_id", "status"} rows reported by the batch RPCs for ids they left alone.
+    return {row["order_id"]: "not found" if row["status"] is None else f"status is {row['status']}, not PLACED"
+            for row in rows}
+
+@tracing.operation("order_service.cancel_orders")
+def cancel_orders(order_ids: List[int]) -> Dict:
+    """
+    Cancel many PLACED orders with one cancel_orders RPC per chunk of ids. The status
+    flip, the stock increment (quantities summed per product) and the refund commit
+    together, so a chunk that fails is left exactly as it was and can be re-run.
+
+    Returns {"cancelled": [ids], "skipped": {id: reason}, "failed": {id: error},
+    "products_restocked": n}.
+    """
+    start = time.perf_counter()
+    cancelled, skipped, failed, restocked = [], {}, {}, set()
+    for ids in _chunks(order_ids):
+        try:
+            # Safe to repeat: orders a lost attempt already cancelled are no longer
+            # PLACED, so they come back as skipped instead of being restocked twice.
+            result = call_with_retry(order_dao.cancel_orders, ids)
+        except Exception as e:
+            failed.update((order_id, str(e)) for order_id in ids)
+            continue
+        products = result["products"]
+        product_dao.invalidate([p["prod_id"] for p in products])
+        low_stock_index.observe(products)
+        cancelled += result["cancelled"]
+        restocked.update(p["prod_id"] for p in products)
+        skipped.update(_skipped(result["skipped"]))
+    return {"cancelled": cancelled, "skipped": skipped, "failed": failed, "products_restocked": len(restocked),
+            "seconds": round(time.perf_counter() - start, 3)}
+
+@tracing.operation("order_service.pay_orders")
+def pay_orders(order_ids: List[int], method: str) -> Dict:
+    """
+    Settle the payments of many PLACED orders with one pay_orders RPC per chunk of ids:
+    the PLACED -> COMPLETED flip and the payment update commit together, so a chunk
+    that fails is left exactly as it was and can be re-run.
+
+    Unlike process_payment, orders that are not PLACED (cancelled, already completed)
+    are skipped rather than overwritten. Returns {"paid": [ids], "skipped": {id: reason},
+    "failed": {id: error}}.
+    """
+    start = time.perf_counter()
+    paid, skipped, failed = [], {}, {}
+    for ids in _chunks(order_ids):
+        try:
+            # Safe to repeat, like cancel_orders: a settled order is no longer PLACED.
+            result = call_with_retry(order_dao.pay_orders, ids, method)
+        except Exception as e:
+            failed.update((order_id, str(e)) for order_id in ids)
+            continue
+        paid += result["paid"]
+        skipped.update(_skipped(result["skipped"]))
+    return {"paid": paid, "skipped": skipped, "failed": failed, "seconds": round(time.perf_counter() - start, 3)}
+
+@tracing.operation("order_service.create_order")
+def create_order(customer_id: int, items: List[Dict], idempotency_key: Optional[str] = None) -> Dict:
+    """
+    Place an order with a fixed number of round trips regardless of basket size:
+    one product fetch, one stock RPC and one multi-row order_items insert.
+
+    With an idempotency_key the order is placed in a single transaction and can be
+    retried freely: a repeat returns the first call's result and never reserves stock twice.
+    """
+    if idempotency_key is not None:
+        return _create_order_idempotent(customer_id, items, idempotency_key)
+    wanted = _merge_lines(items)
+    # Customer check and product fetch don't depend on each other.
+    customer, products = fan_out(
+        lambda: get_customer_by_id(customer_id),
+        lambda: get_products_by_ids(list(wanted), _basket_columns()),
+    )
+    if not customer:
+        raise OrderError("Customer not found")
+    products = {p["prod_id"]: p for p in products}
+    total_amount = _price_basket(wanted, products)
+
+    try:
+        low_stock_index.observe(reserve_stock([{"prod_id": prod_id, "qty": qty} for prod_id, qty in wanted.items()]))
+    except InsufficientStock as e:
+        raise OrderError(str(e))
+
+    order = insert_order(customer_id, total_amount)
+    order_id = order["order_id"]
+    insert_order_items(order_id, _item_rows(items, products))
+
+    # Insert pending payment record
+    from src.dao.order_dao import insert_payment
+    payment = insert_payment(order_id, total_amount, status="PENDING")
+
+    return {"order_id": order_id, "customer_id": customer_id, "total_amount": total_amount, "items": items, "payment": payment}
+
+def _create_order_idempotent(customer_id: int, items: List[Dict], key: str) -> Dict:
+    request_hash = _request_hash("create_order", customer_id=customer_id, items=items)
+    replayed = _replay(key, "create_order", request_hash)
+    if replayed is not None:
+        return replayed
+
+    wanted = _merge_lines(items)
+    customer, products = fan_out(
+        lambda: call_with_retry(get_customer_by_id, customer_id),
+        lambda: call_with_retry(get_products_by_ids, list(wanted), _basket_columns()),
+    )
+    if not customer:
+        raise OrderError("Customer not found")
+    products = {p["prod_id"]: p for p in products}
+    total_amount = _price_basket(wanted, products)
+    item_rows = _item_rows(items, products)
+
+    # place_orders reserves stock and writes the order, items and payment in one
+    # transaction keyed by order_ref, so a retry after a lost response finds the
+    # order already there (DUPLICATE) instead of placing it again.
+    outcome = call_with_retry(order_dao.place_orders, [{
+        "order_ref": key,
+        "cust_id": customer_id,
+        "total_amount": total_amount,
+        "lines": [{"prod_id": prod_id, "qty": qty} for prod_id, qty in wanted.items()],
+        "items": item_rows,
+    }])[0]
+    if outcome["outcome"] == "REJECTED":
+        raise OrderError(f"Insufficient stock for product {outcome['error'].rsplit(':', 1)[-1]}")
+    order_id = outcome["placed_order_id"]
+    duplicate = outcome["outcome"] == "DUPLICATE"
+    product_dao.invalidate(list(wanted))
+    payment, details, fresh = fan_out(
+        lambda: call_with_retry(order_dao.get_payment, order_id),
+        lambda: call_with_retry(order_dao.get_order_details, order_id) if duplicate else None,
+        lambda: call_with_retry(get_products_by_ids, list(wanted)) if low_stock_index.loaded else None,
+    )
+    if fresh is not None:
+        low_stock_index.observe(fresh)
+    if duplicate:
+        # An earlier attempt placed this order: answer with what was stored and charged
+        # then, not with the basket re-priced at today's prices.
+        total_amount = details["order"]["total_amount"]
+        item_rows = [{"prod_id": i["prod_id"], "qty": i["quantity"], "price": i["price"]}
+                     for i in sorted(details["items"], key=lambda i: i["item_id"])]
+    result = {"order_id": order_id, "customer_id": customer_id, "total_amount": total_amount, "items": item_rows, "payment": payment}
+    call_with_retry(idempotency_dao.save_idempotent_result, key, "create_order", request_hash, result)
+    return result
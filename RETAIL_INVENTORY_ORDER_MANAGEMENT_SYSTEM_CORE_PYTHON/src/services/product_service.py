@@ -1,33 +1,92 @@
-# src/services/product_service.py
-from typing import List, Dict
-import src.dao.product_dao as product_dao
- 
-class ProductError(Exception):
-    pass
- 
-def add_product(name: str, sku: str, price: float, stock: int = 0, category: str | None = None) -> Dict:
-    """
-    Validate and insert a new product.
-    Raises ProductError on validation failure.
-    """
-    if price <= 0:
-        raise ProductError("Price must be greater than 0")
-    existing = product_dao.get_product_by_sku(sku)
-    if existing:
-        raise ProductError(f"SKU already exists: {sku}")
-    return product_dao.create_product(name, sku, price, stock, category)
- 
-def restock_product(prod_id: int, delta: int) -> Dict:
-    if delta <= 0:
-        raise ProductError("Delta must be positive")
-    p = product_dao.get_product_by_id(prod_id)
-    if not p:
-        raise ProductError("Product not found")
-    new_stock = (p.get("stock") or 0) + delta
-    return product_dao.update_product(prod_id, {"stock": new_stock})
- 
-def get_low_stock(threshold: int = 5) -> List[Dict]:
-    allp = product_dao.list_products(limit=1000)
-    return [p for p in allp if (p.get("stock") or 0) <= threshold]
- 
+# src/services/product_service.py
+import threading
+from typing import List, Dict, Iterable
+import src.dao.product_dao as product_dao
+from src.config import LOW_STOCK_THRESHOLD
+from src import tracing
+from src.models import Product
+ 
+class ProductError(Exception):
+    pass
+ 
+_LOW_STOCK_FIELDS = ("prod_id", "sku", "name", "stock")
+_LOW_STOCK_COLUMNS = Product.columns(*_LOW_STOCK_FIELDS)
+ 
+def add_product(name: str, sku: str, price: float, stock: int = 0, category: str | None = None) -> Dict:
+    """
+    Validate and insert a new product.
+    Raises ProductError on validation failure.
+    """
+    if price <= 0:
+        raise ProductError("Price must be greater than 0")
+    existing = product_dao.get_product_by_sku(sku, columns="prod_id")
+    if existing:
+        raise ProductError(f"SKU already exists: {sku}")
+    return product_dao.create_product(name, sku, price, stock, category)
+ 
+@tracing.operation("product_service.restock_product")
+def restock_product(prod_id: int, delta: int) -> Dict:
+    if delta <= 0:
+        raise ProductError("Delta must be positive")
+    rows = product_dao.increment_stock([{"prod_id": prod_id, "qty": delta}])
+    if not rows:
+        raise ProductError("Product not found")
+    low_stock_index.observe(rows)
+    return rows[0]
+ 
+@tracing.operation("product_service.get_low_stock")
+def get_low_stock(threshold: int = LOW_STOCK_THRESHOLD, records: bool = False) -> List:
+    """
+    Products with stock <= threshold, filtered in the database. With records=True they
+    come back as Product records (name, sku and stock only) instead of dicts.
+    """
+    rows = product_dao.iter_low_stock(threshold, _LOW_STOCK_COLUMNS)
+    return Product.from_rows(rows) if records else list(rows)
+ 
+class LowStockIndex:
+    """
+    In-memory set of products at or below a reorder threshold. Loaded once from the
+    database, then kept current from the product rows that stock-changing calls
+    (create_order, cancel_order, restock_product) already get back, so polling
+    snapshot() costs no round trips.
+    """
+ 
+    def __init__(self, threshold: int = LOW_STOCK_THRESHOLD):
+        self.threshold = threshold
+        self._rows: Dict[int, Product] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+ 
+    def refresh(self) -> None:
+        rows = {p.prod_id: p for p in Product.from_rows(product_dao.iter_low_stock(self.threshold, _LOW_STOCK_COLUMNS))}
+        with self._lock:
+            self._rows = rows
+            self._loaded = True
+ 
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+ 
+    def observe(self, products: Iterable[Dict]) -> None:
+        """
+        Apply product rows whose stock just changed.
+        """
+        with self._lock:
+            if not self._loaded:
+                return
+            for p in products:
+                if (p.get("stock") or 0) <= self.threshold:
+                    self._rows[p["prod_id"]] = Product(p["prod_id"], name=p.get("name"), sku=p.get("sku"), stock=p.get("stock"))
+                else:
+                    self._rows.pop(p["prod_id"], None)
+ 
+    def snapshot(self) -> List[Dict]:
+        if not self._loaded:
+            self.refresh()
+        with self._lock:
+            rows = sorted(self._rows.values(), key=lambda r: (r.stock or 0, r.prod_id))
+        return [r.to_dict(_LOW_STOCK_FIELDS) for r in rows]
+ 
+low_stock_index = LowStockIndex()
+ 
  
\ No newline at end of file
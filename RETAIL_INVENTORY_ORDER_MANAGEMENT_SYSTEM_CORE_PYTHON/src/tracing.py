@@ -0,0 +1,263 @@
+# src/tracing.py
+"""
+Per-query tracing of the storage client.
+
+When tracing is on (TRACE_QUERIES=1, retail-cli --profile, or config.enable_tracing())
+the shared client is wrapped so every execute() records a span: table (or rpc name),
+operation, filter shape, latency and row count. Spans are attributed to the innermost
+service operation (see operation()) and aggregated per (operation, table, op).
+
+Filters are recorded as shapes ("prod_id=in[3]", "status=eq"), never values, so the
+same query issued in a loop collapses onto one key and shows up as an N+1 candidate.
+
+report() prints a timing breakdown; write_prometheus() writes the aggregates in the
+Prometheus text format for a node_exporter textfile collector.
+"""
+import contextvars
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, List, Optional
+
+# Calls of the same query shape within one operation call before it is flagged.
+N_PLUS_ONE_THRESHOLD = int(os.getenv("TRACE_N_PLUS_ONE", "3"))
+MAX_SPANS = 10_000
+
+_WRITE_OPS = {"insert", "upsert", "update", "delete"}
+_FILTERS = {"eq", "neq", "gt", "gte", "lt", "lte", "like", "ilike", "is_", "in_", "contains", "match"}
+_current: contextvars.ContextVar = contextvars.ContextVar("trace_operation", default=None)
+
+
+class _Invocation:
+    __slots__ = ("name", "shapes")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.shapes: Counter = Counter()
+
+
+class Tracer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.spans: "deque[Dict]" = deque(maxlen=MAX_SPANS)
+        self.calls: Dict = {}        # (operation, table, op) -> {count, seconds, max, rows, errors}
+        self.operations: Dict = {}   # operation -> {count, seconds}
+        self.n_plus_one: Dict = {}   # (operation, shape) -> worst repeat count
+
+    def record(self, table: str, op: str, filters: List[str], seconds: float, rows: Optional[int], error: bool,
+               paged: bool = False) -> None:
+        inv = _current.get()
+        operation = inv.name if inv else "(none)"
+        shape = f"{op} {table}" + (f" [{', '.join(filters)}]" if filters else "")
+        with self._lock:
+            self.spans.append({"operation": operation, "table": table, "op": op, "filters": filters,
+                               "ms": round(seconds * 1000, 3), "rows": rows, "error": error})
+            agg = self.calls.setdefault((operation, table, op), {"count": 0, "seconds": 0.0, "max": 0.0, "rows": 0, "errors": 0})
+            agg["count"] += 1
+            agg["seconds"] += seconds
+            agg["max"] = max(agg["max"], seconds)
+            agg["rows"] += rows or 0
+            agg["errors"] += error
+            # Successive pages of one keyset scan are expected to repeat.
+            if inv and not paged:
+                inv.shapes[shape] += 1
+
+    def _finish(self, inv: _Invocation, seconds: float) -> None:
+        with self._lock:
+            agg = self.operations.setdefault(inv.name, {"count": 0, "seconds": 0.0})
+            agg["count"] += 1
+            agg["seconds"] += seconds
+            for shape, n in inv.shapes.items():
+                if n >= N_PLUS_ONE_THRESHOLD:
+                    key = (inv.name, shape)
+                    self.n_plus_one[key] = max(n, self.n_plus_one.get(key, 0))
+
+    def reset(self) -> None:
+        with self._lock:
+            self.spans.clear()
+            self.calls.clear()
+            self.operations.clear()
+            self.n_plus_one.clear()
+
+
+tracer = Tracer()
+
+
+class operation:
+    """
+    Context manager / decorator naming the service operation that queries run under.
+
+        @tracing.operation("order_service.create_order")
+        def create_order(...): ...
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._tokens: List = []
+
+    def __enter__(self):
+        inv = _Invocation(self.name)
+        self._tokens.append((_current.set(inv), inv, time.perf_counter()))
+        return inv
+
+    def __exit__(self, *exc):
+        token, inv, start = self._tokens.pop()
+        _current.reset(token)
+        tracer._finish(inv, time.perf_counter() - start)
+        return False
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with operation(self.name):
+                return fn(*args, **kwargs)
+
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            with operation(self.name):
+                return await fn(*args, **kwargs)
+
+        return async_wrapper if inspect.iscoroutinefunction(fn) else wrapper
+
+
+def _describe_filter(method: str, args) -> str:
+    column = args[0] if args else "?"
+    op = method.rstrip("_")
+    if method == "in_" and len(args) > 1:
+        return f"{column}={op}[{len(list(args[1]))}]"
+    return f"{column}={op}"
+
+
+class _TracedQuery:
+    """
+    Wraps a query builder; every chained call returns another wrapper, and execute()
+    is timed and recorded.
+    """
+
+    def __init__(self, inner, table: str, op: str = "select", filters: Optional[List[str]] = None, limited: bool = False):
+        self._inner, self._table, self._op, self._filters = inner, table, op, filters or []
+        self._limited = limited
+
+    def __getattr__(self, name):
+        attr = getattr(self._inner, name)
+        if name == "execute":
+            return self._execute
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if not hasattr(result, "execute"):
+                return result
+            op = name if name in _WRITE_OPS else self._op
+            filters = self._filters + [_describe_filter(name, args)] if name in _FILTERS else self._filters
+            return _TracedQuery(result, self._table, op, filters, self._limited or name in ("limit", "range"))
+        return call
+
+    def _execute(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            resp = self._inner.execute(*args, **kwargs)
+        except Exception:
+            tracer.record(self._table, self._op, self._filters, time.perf_counter() - start, None, True)
+            raise
+        data = getattr(resp, "data", None)
+        rows = len(data) if isinstance(data, list) else (None if data is None else 1)
+        paged = self._limited and any(f.endswith("=gt") for f in self._filters)
+        tracer.record(self._table, self._op, self._filters, time.perf_counter() - start, rows, False, paged)
+        return resp
+
+
+class TracingClient:
+    """
+    Proxy for a supabase Client or SqliteClient that traces table()/from_()/rpc().
+    """
+
+    def __init__(self, inner):
+        self._inner = inner
+
+    def table(self, name: str):
+        return _TracedQuery(self._inner.table(name), name)
+
+    from_ = table
+
+    def rpc(self, name: str, params: Optional[Dict] = None, *args, **kwargs):
+        return _TracedQuery(self._inner.rpc(name, params or {}, *args, **kwargs), name, "rpc")
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+def report(top: int = 25) -> str:
+    """
+    Timing breakdown per operation, slowest calls first, plus N+1 candidates.
+    """
+    with tracer._lock:
+        operations = dict(tracer.operations)
+        calls = dict(tracer.calls)
+        repeats = dict(tracer.n_plus_one)
+    lines = []
+    total_calls = sum(c["count"] for c in calls.values())
+    total_ms = sum(c["seconds"] for c in calls.values()) * 1000
+    lines.append(f"{total_calls} queries, {total_ms:.1f} ms in the storage client")
+    names = sorted({k[0] for k in calls} | set(operations),
+                   key=lambda n: -sum(c["seconds"] for k, c in calls.items() if k[0] == n))
+    for name in names:
+        op = operations.get(name)
+        head = f"\n{name}"
+        if op:
+            head += f"  ({op['count']} call{'s' if op['count'] != 1 else ''}, {op['seconds'] * 1000:.1f} ms)"
+        lines.append(head)
+        rows = sorted(((k, c) for k, c in calls.items() if k[0] == name), key=lambda kc: -kc[1]["seconds"])
+        if rows:
+            lines.append(f"  {'table':<28}{'op':<8}{'calls':>7}{'total ms':>11}{'mean ms':>10}{'max ms':>9}{'rows':>8}")
+        for (_, table, kind), c in rows[:top]:
+            lines.append(f"  {table:<28}{kind:<8}{c['count']:>7}{c['seconds'] * 1000:>11.2f}"
+                         f"{c['seconds'] * 1000 / c['count']:>10.2f}{c['max'] * 1000:>9.2f}{c['rows']:>8}")
+    if repeats:
+        lines.append("\nPossible N+1 (same query shape repeated within one operation call):")
+        for (name, shape), n in sorted(repeats.items(), key=lambda kv: -kv[1]):
+            lines.append(f"  {name}: {shape} x{n}")
+    return "\n".join(lines)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def write_prometheus(path: str, prefix: str = "retail") -> None:
+    """
+    Write the aggregates in Prometheus text exposition format (atomically, so a
+    textfile collector never reads a partial file).
+    """
+    with tracer._lock:
+        calls = dict(tracer.calls)
+        operations = dict(tracer.operations)
+    out = [
+        f"# HELP {prefix}_db_requests_total Storage requests by service operation, table and kind.",
+        f"# TYPE {prefix}_db_requests_total counter",
+    ]
+    for (name, table, op), c in sorted(calls.items()):
+        out.append(f'{prefix}_db_requests_total{{operation="{_label(name)}",table="{_label(table)}",op="{op}"}} {c["count"]}')
+    out += [f"# HELP {prefix}_db_request_seconds Storage request latency.", f"# TYPE {prefix}_db_request_seconds summary"]
+    for (name, table, op), c in sorted(calls.items()):
+        labels = f'operation="{_label(name)}",table="{_label(table)}",op="{op}"'
+        out.append(f"{prefix}_db_request_seconds_sum{{{labels}}} {c['seconds']:.6f}")
+        out.append(f"{prefix}_db_request_seconds_count{{{labels}}} {c['count']}")
+    out += [f"# HELP {prefix}_db_rows_total Rows returned by storage requests.", f"# TYPE {prefix}_db_rows_total counter"]
+    for (name, table, op), c in sorted(calls.items()):
+        out.append(f'{prefix}_db_rows_total{{operation="{_label(name)}",table="{_label(table)}",op="{op}"}} {c["rows"]}')
+    out += [f"# HELP {prefix}_db_errors_total Failed storage requests.", f"# TYPE {prefix}_db_errors_total counter"]
+    for (name, table, op), c in sorted(calls.items()):
+        out.append(f'{prefix}_db_errors_total{{operation="{_label(name)}",table="{_label(table)}",op="{op}"}} {c["errors"]}')
+    out += [f"# HELP {prefix}_operation_seconds Service operation latency.", f"# TYPE {prefix}_operation_seconds summary"]
+    for name, o in sorted(operations.items()):
+        out.append(f'{prefix}_operation_seconds_sum{{operation="{_label(name)}"}} {o["seconds"]:.6f}')
+        out.append(f'{prefix}_operation_seconds_count{{operation="{_label(name)}"}} {o["count"]}')
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("\n".join(out) + "\n")
+    os.replace(tmp, path)
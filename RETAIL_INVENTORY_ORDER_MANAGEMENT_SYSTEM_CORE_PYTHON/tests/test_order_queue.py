@@ -0,0 +1,99 @@
+# tests/test_order_queue.py
+# Run from the project root: python -m pytest -q
+import json
+
+import pytest
+
+from src import config
+from src.backends.sqlite_backend import SqliteBackendError, SqliteClient
+from src.dao import customer_dao, order_dao, product_dao
+from src.services.order_queue import OrderQueue
+
+
+@pytest.fixture
+def store():
+    config.set_supabase(SqliteClient(":memory:"))
+    product_dao.clear_cache()
+    customer_dao.clear_cache()
+    yield
+    config.close_supabase()
+
+
+def _queue(tmp_path):
+    # A long flush interval keeps every submit in one group until flush().
+    return OrderQueue(path=str(tmp_path / "orders.log"), group_size=100, flush_interval=60)
+
+
+def test_permanent_failure_rejects_only_the_bad_order(store, tmp_path):
+    good = customer_dao.create_customer("Good", "good@x", 1, "Pune")
+    doomed = customer_dao.create_customer("Doomed", "doomed@x", 2, "Pune")
+    product = product_dao.create_product("Widget", "W-1", 10.0, 100)
+    queue = _queue(tmp_path)
+    try:
+        tickets = [queue.submit(good["cust_id"], [{"prod_id": product["prod_id"], "qty": 1}])["ticket"]
+                   for _ in range(3)]
+        bad = queue.submit(doomed["cust_id"], [{"prod_id": product["prod_id"], "qty": 1}])["ticket"]
+        tickets += [queue.submit(good["cust_id"], [{"prod_id": product["prod_id"], "qty": 1}])["ticket"]
+                    for _ in range(3)]
+        customer_dao.delete_customer(doomed["cust_id"])  # its order now fails the FK check
+
+        assert queue.flush(timeout=10)
+        assert queue.result(bad)["status"] == "REJECTED"
+        assert all(queue.result(t)["status"] == "PLACED" for t in tickets)
+        assert len(order_dao.list_orders_by_customer(good["cust_id"])) == 6
+        product_dao.clear_cache()
+        assert product_dao.get_product_by_id(product["prod_id"])["stock"] == 94
+        assert queue.metrics()["rejected"] == 1
+    finally:
+        queue.close()
+
+    # Rejected orders are marked done in the log and are not replayed.
+    reopened = _queue(tmp_path)
+    try:
+        assert reopened.metrics()["recovered"] == 0
+    finally:
+        reopened.close()
+
+
+def test_malformed_log_record_is_rejected_on_replay(store, tmp_path):
+    customer = customer_dao.create_customer("Good", "good@x", 1, "Pune")
+    product = product_dao.create_product("Widget", "W-1", 10.0, 100)
+    (tmp_path / "orders.log").write_text(json.dumps({"op": "order", "order_ref": "bad", "cust_id": 1}) + "\n")
+    queue = _queue(tmp_path)
+    try:
+        ticket = queue.submit(customer["cust_id"], [{"prod_id": product["prod_id"], "qty": 1}])["ticket"]
+        assert queue.flush(timeout=10)
+        assert queue.result("bad")["status"] == "REJECTED"
+        assert queue.result(ticket)["status"] == "PLACED"
+    finally:
+        queue.close()
+
+
+@pytest.mark.parametrize("error", [
+    ConnectionError("connection reset by peer"),
+    SqliteBackendError("Could not find the function public.place_orders", code="PGRST202"),
+    SqliteBackendError("JWT expired", code="PGRST301"),
+])
+def test_failure_not_tied_to_an_order_retries_the_group(store, tmp_path, monkeypatch, error):
+    customer = customer_dao.create_customer("Good", "good@x", 1, "Pune")
+    product = product_dao.create_product("Widget", "W-1", 10.0, 100)
+    place_orders, calls = order_dao.place_orders, []
+
+    def flaky(orders):
+        calls.append(len(orders))
+        if len(calls) <= 2:
+            raise error
+        return place_orders(orders)
+
+    monkeypatch.setattr(order_dao, "place_orders", flaky)
+    queue = _queue(tmp_path)
+    queue.flush_interval = 0.01
+    try:
+        tickets = [queue.submit(customer["cust_id"], [{"prod_id": product["prod_id"], "qty": 1}])["ticket"]
+                   for _ in range(2)]
+        assert queue.flush(timeout=10)
+        assert all(queue.result(t)["status"] == "PLACED" for t in tickets)
+        assert calls == [2, 2, 2]  # retried whole, never split or rejected
+        assert queue.metrics()["rejected"] == 0
+    finally:
+        queue.close()